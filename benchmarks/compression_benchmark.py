@@ -0,0 +1,82 @@
+"""Bytes versus latency of gzip / brotli levels on a realistic /poi/filter payload.
+
+The payload is built from the Paris POIs used by the driver tests, shaped like the
+``/poi/filter`` response. Transfer times assume the given link speeds, so the
+"total" column shows where spending CPU on a higher level stops paying off.
+
+    python benchmarks/compression_benchmark.py [--repeat 20]
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PARIS_CSV = Path(__file__).parents[1] / "tests" / "neo4j_driver_tests" / "data" / "paris.csv"
+LINKS_MBIT = {"LAN 1 Gbit/s": 1000, "WAN 50 Mbit/s": 50, "mobile 5 Mbit/s": 5}
+
+
+def load_payload() -> bytes:
+    with PARIS_CSV.open(encoding="utf-8") as file:
+        pois = [
+            {
+                "poiId": row["id"],
+                "label": row["label"],
+                "city": row["city"],
+                "latitude": float(row["lat"]),
+                "longitude": float(row["long"]),
+                "types": row["types"].split(","),
+            }
+            for row in csv.DictReader(file)
+        ]
+    return json.dumps({"pois": pois}, ensure_ascii=False).encode()
+
+
+def codecs() -> dict[str, Callable[[bytes], bytes]]:
+    candidates: dict[str, Callable[[bytes], bytes]] = {"identity": lambda data: data}
+    for level in (1, 6, 9):
+        candidates[f"gzip-{level}"] = lambda data, level=level: gzip.compress(data, compresslevel=level)
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            candidates[f"br-{quality}"] = lambda data, quality=quality: brotli.compress(data, quality=quality)
+    return candidates
+
+
+def measure(compress: Callable[[bytes], bytes], payload: bytes, repeat: int) -> tuple[int, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = compress(payload)
+        timings.append(time.perf_counter() - started)
+    return len(compressed), statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = load_payload()
+    print(f"Payload: {len(payload):,} bytes ({payload.count(b'poiId'):,} POIs)")
+    header = f"{'codec':<10} {'bytes':>10} {'ratio':>6} {'cpu ms':>7}" + "".join(f" {link:>16}" for link in LINKS_MBIT)
+    print(header)
+    print("-" * len(header))
+    for name, compress in codecs().items():
+        size, cpu_ms = measure(compress, payload, args.repeat)
+        totals = "".join(f" {cpu_ms + size * 8 / (mbit * 1000):>13.1f} ms" for mbit in LINKS_MBIT.values())
+        print(f"{name:<10} {size:>10,} {len(payload) / size:>6.1f} {cpu_ms:>7.2f}{totals}")
+    if brotli is None:
+        print("brotli not installed, brotli levels skipped.")
+
+
+if __name__ == "__main__":
+    main()
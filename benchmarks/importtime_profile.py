@@ -0,0 +1,78 @@
+"""Import-time profile of the API (``python -X importtime``).
+
+Imports ``neo4j_api`` in a fresh interpreter, prints the total and the most expensive
+modules, and compares them with the checked-in baseline
+``benchmarks/importtime_baseline.txt``. ``--write`` replaces the baseline; do that in
+the same commit as a change that moves imports around.
+
+    python benchmarks/importtime_profile.py [--top 15] [--write]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+BASELINE = Path(__file__).with_name("importtime_baseline.txt")
+MODULE = "neo4j_api"
+
+
+def profile(module: str = MODULE) -> str:
+    env = os.environ | {"PYTHONPATH": os.pathsep.join([str(ROOT / "src" / "backend"), str(ROOT / "src")])}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return "".join(line + "\n" for line in result.stderr.splitlines() if line.startswith("import time:"))
+
+
+def parse(text: str) -> dict[str, tuple[int, int]]:
+    """``{module: (self_us, cumulative_us)}`` of an ``-X importtime`` log."""
+    modules = {}
+    for line in text.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def top_level(modules: dict[str, tuple[int, int]]) -> dict[str, int]:
+    """Cumulative microseconds per top-level package."""
+    packages: dict[str, int] = {}
+    for name, (_, cumulative) in modules.items():
+        if "." not in name:
+            packages[name] = packages.get(name, 0) + cumulative
+    return packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--write", action="store_true", help="replace the checked-in baseline")
+    args = parser.parse_args()
+
+    text = profile()
+    current = parse(text)
+    baseline = parse(BASELINE.read_text()) if BASELINE.exists() else {}
+
+    total, base_total = current[MODULE][1], baseline.get(MODULE, (0, 0))[1]
+    print(f"import {MODULE}: {total / 1000:.0f} ms (baseline {base_total / 1000:.0f} ms)\n")
+    base_packages = top_level(baseline)
+    print(f"{'package':<30}{'ms':>10}{'baseline':>10}")
+    for name, cumulative in sorted(top_level(current).items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<30}{cumulative / 1000:>10.1f}{base_packages.get(name, 0) / 1000:>10.1f}")
+
+    if args.write:
+        BASELINE.write_text(text)
+        print(f"\nWrote {BASELINE.relative_to(ROOT)}.")
+
+
+if __name__ == "__main__":
+    main()
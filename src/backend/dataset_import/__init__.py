@@ -1,20 +1,39 @@
-from .cleanup import perform_cleanup_import
-from .handler import AuthenticatedClient, NoDataAvailable, check_download, perform_download
-from .neo4j_load import perform_import_data
-from .pipeline import perform_extract_data, unzip_data
-from .status_handler import ProcessLock, ProcessRunning, get_status_file, get_status_file_content
-
-__all__ = [
-    "AuthenticatedClient",
-    "check_download",
-    "get_status_file",
-    "get_status_file_content",
-    "NoDataAvailable",
-    "perform_cleanup_import",
-    "perform_download",
-    "perform_extract_data",
-    "perform_import_data",
-    "ProcessLock",
-    "ProcessRunning",
-    "unzip_data",
-]
+"""Download, extraction and import of the DATAtourisme dataset.
+
+The submodules pull in aiohttp, BeautifulSoup, pandas and tqdm, so they are only
+imported when one of their names is first accessed (PEP 562). Importing
+``get_import_version`` for the API therefore stays cheap.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "AuthenticatedClient": "handler",
+    "check_download": "handler",
+    "get_import_version": "status_handler",
+    "get_status_file": "status_handler",
+    "get_status_file_content": "status_handler",
+    "NoDataAvailable": "handler",
+    "perform_cleanup_import": "cleanup",
+    "perform_download": "handler",
+    "perform_extract_data": "pipeline",
+    "perform_import_data": "neo4j_load",
+    "ProcessLock": "status_handler",
+    "ProcessRunning": "status_handler",
+    "unzip_data": "pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
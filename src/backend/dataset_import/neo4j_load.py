@@ -37,11 +37,11 @@ def import_pois(driver, import_from_dir, import_version) -> dict:
     CALL apoc.periodic.iterate(
       "LOAD CSV WITH HEADERS FROM $file AS row RETURN row",
       "MERGE (t:POI {id: row['poiId:ID(POI)']})
-       SET t.label = row.label,
+       SET t.label = coalesce(row.label, ''),
            t.comment = row.comment,
            t.description = row.description,
            t.homepage = row.homepage,
-           t.city = row.city,
+           t.city = coalesce(row.city, ''),
            t.postal_code = row.postal_code,
            t.street = row.street,
            t.latitude = toFloat(row['latitude:FLOAT']),
@@ -130,7 +130,7 @@ def prepare_point_index(driver, import_version):
 def set_is_in_rels(driver, import_version):
     query = """
     CALL apoc.periodic.iterate(
-      "MATCH (p:POI {importVersion: $import_version}) WHERE p.city IS NOT NULL RETURN p",
+      "MATCH (p:POI {importVersion: $import_version}) WHERE p.city <> '' RETURN p",
       "MATCH (c:City {name: p.city})
        MERGE (p)-[r:IS_IN]->(c)
        SET r.importVersion = $import_version",
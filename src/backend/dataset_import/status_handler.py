@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 
 class ProcessRunning(RuntimeError):
@@ -39,3 +39,28 @@ def get_status_file_content(save_dir: Path | str, process: str) -> Dict[str, Any
 
     with status_file.open("r") as f:
         return json.load(f)
+
+
+_IMPORT_VERSIONS: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
+
+def get_import_version(save_dir: Path | str) -> str | None:
+    """Identifier of the data currently in the database, derived from last_import.json and last_cleanup.json.
+
+    Changes whenever an import finishes or is cleaned up. Returns None while an import or cleanup
+    is running, since the data is changing. The status file is only re-read when its mtime changes.
+    """
+    save_dir = Path(save_dir)
+    if any(ProcessLock(save_dir, process).lock_file.exists() for process in ("import", "cleanup")):
+        return None
+    files = (get_status_file(save_dir, "import"), get_status_file(save_dir, "cleanup"))
+    stamps = tuple(file.stat().st_mtime_ns if file.exists() else 0 for file in files)
+    if (cached := _IMPORT_VERSIONS.get(save_dir)) is not None and cached[0] == stamps:
+        return cached[1]
+
+    status: Dict[str, Any] = get_status_file_content(save_dir, "import") if stamps[0] else {}
+    if status.get("status") == "started":
+        return None
+    version = f"{status.get('import_version', 'initial')}-{status.get('status', 'none')}-{stamps[0]}-{stamps[1]}"
+    _IMPORT_VERSIONS[save_dir] = (stamps, version)
+    return version
@@ -0,0 +1,160 @@
+"""Admission control for the expensive endpoints.
+
+Every cost class has a fixed number of concurrent slots and a bounded FIFO wait
+queue. A request whose estimated cost exceeds the class budget, if one is set, is
+refused with 422 before any work starts, and a full queue (or a wait longer than
+``ADMISSION_QUEUE_TIMEOUT``) answers 503. With ``ADMISSION_PER_CLIENT`` set, a client
+that already holds that many slots gets 429. Clients are told apart by ``X-Client-Id``,
+else by address; the UI sends one id per browser session, since all its users share
+the Streamlit server's address. 429 and 503 carry ``Retry-After``, estimated from the
+recent holding time of a slot.
+
+Identical requests in flight share one slot: ``run_admitted`` joins a running flight
+before it queues for admission, so coalesced requests are never rejected for each other.
+"""
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from os import environ
+from time import perf_counter
+from typing import AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+
+from fastapi import HTTPException, Request
+from neo4j_driver.single_flight import SingleFlight
+
+from telemetry.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, ADMISSION_REJECTED
+
+ADMISSION_QUEUE_TIMEOUT = float(environ.get("ADMISSION_QUEUE_TIMEOUT", 10))
+# Concurrent slots per client of a cost class, 0 for no limit.
+ADMISSION_PER_CLIENT = int(environ.get("ADMISSION_PER_CLIENT", 0))
+# Held-Karp visits n² · 2ⁿ states, 0 for no budget (the default admits every request the routes accept).
+TSP_MAX_COST = int(environ.get("TSP_MAX_COST", 0))
+# Round trips enumerate about branching^max_hops paths, 0 for no budget.
+ROUNDTRIP_BRANCHING = float(environ.get("ROUNDTRIP_BRANCHING", 5))
+ROUNDTRIP_MAX_COST = int(environ.get("ROUNDTRIP_MAX_COST", 0))
+CLIENT_ID_HEADER = "x-client-id"
+
+T = TypeVar("T")
+
+
+def client_key(request: Request) -> str:
+    if client_id := request.headers.get(CLIENT_ID_HEADER):
+        return client_id
+    return request.client.host if request.client else "unknown"
+
+
+class CostClass:
+    """Concurrency slots with a bounded FIFO queue, shared by the endpoints of one cost class."""
+
+    def __init__(self, name: str, slots: int, max_queue: int, max_cost: float) -> None:
+        self.name = name
+        self.slots = slots
+        self.max_queue = max_queue
+        self.max_cost = max_cost
+        self.active = 0
+        self.waiters: deque[asyncio.Future[None]] = deque()
+        self.clients: dict[str, int] = {}
+        self.hold_time = 1.0  # moving average of seconds a slot is held
+        self.active_gauge = ADMISSION_ACTIVE.labels(name)
+        self.queued_gauge = ADMISSION_QUEUED.labels(name)
+
+    def retry_after(self) -> str:
+        return str(max(1, math.ceil(self.hold_time * (len(self.waiters) + 1) / self.slots)))
+
+    def reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        ADMISSION_REJECTED.labels(self.name, reason).inc()
+        headers = {"Retry-After": self.retry_after()} if status_code != 422 else None
+        return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
+    async def acquire(self) -> None:
+        if self.active < self.slots and not self.waiters:
+            self.active += 1
+            return
+        if len(self.waiters) >= self.max_queue:
+            raise self.reject(503, "queue_full", f"Too many {self.name} requests in progress, try again later.")
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queued_gauge.set(len(self.waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), ADMISSION_QUEUE_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+            if waiter.done():  # the slot was handed over just now
+                self.release()
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+            raise self.reject(503, "queue_timeout", f"Waited too long for a {self.name} slot, try again later.")
+        finally:
+            self.queued_gauge.set(len(self.waiters))
+
+    def release(self) -> None:
+        if self.waiters:
+            # Hand the slot straight to the next waiter so newcomers cannot overtake the queue.
+            self.waiters.popleft().set_result(None)
+        else:
+            self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self, request: Request, cost: float) -> AsyncIterator[None]:
+        if 0 < self.max_cost < cost:
+            raise self.reject(422, "too_expensive", f"Request too expensive (estimated cost {cost:.0f}).")
+        client = client_key(request)
+        if ADMISSION_PER_CLIENT > 0 and self.clients.get(client, 0) >= ADMISSION_PER_CLIENT:
+            raise self.reject(429, "per_client", f"At most {ADMISSION_PER_CLIENT} {self.name} requests per client.")
+        self.clients[client] = self.clients.get(client, 0) + 1
+        try:
+            await self.acquire()
+            self.active_gauge.set(self.active)
+            started = perf_counter()
+            try:
+                yield
+            finally:
+                self.hold_time = 0.8 * self.hold_time + 0.2 * (perf_counter() - started)
+                self.release()
+                self.active_gauge.set(self.active)
+        finally:
+            if (held := self.clients.pop(client) - 1) > 0:
+                self.clients[client] = held
+
+
+SOLVER = CostClass(
+    "solver",
+    slots=int(environ.get("ADMISSION_SOLVER_SLOTS", 2)),
+    max_queue=int(environ.get("ADMISSION_SOLVER_QUEUE", 8)),
+    max_cost=TSP_MAX_COST,
+)
+TRAVERSAL = CostClass(
+    "traversal",
+    slots=int(environ.get("ADMISSION_TRAVERSAL_SLOTS", 4)),
+    max_queue=int(environ.get("ADMISSION_TRAVERSAL_QUEUE", 16)),
+    max_cost=ROUNDTRIP_MAX_COST,
+)
+
+
+def tsp_cost(poi_ids: list[str]) -> float:
+    n = len(set(poi_ids))
+    return n**2 * 2**n
+
+
+def roundtrip_cost(max_hops: int) -> float:
+    return ROUNDTRIP_BRANCHING**max_hops
+
+
+# Requests sharing a flight key share one slot and one result.
+ADMITTED_FLIGHTS = SingleFlight("admission")
+
+
+async def run_admitted(
+    cost_class: CostClass, request: Request, cost: float, key: Hashable, call: Callable[[], Awaitable[T]]
+) -> T:
+    """Run ``call`` in a slot of ``cost_class``, or share the run of an identical request in flight."""
+
+    async def admitted() -> T:
+        async with cost_class.admit(request, cost):
+            return await call()
+
+    return await ADMITTED_FLIGHTS.run((cost_class.name, key), admitted)
@@ -0,0 +1,88 @@
+"""Cancel request handlers whose client went away or whose deadline passed.
+
+Starlette keeps running an endpoint after the client disconnects, so a closed browser
+tab would leave its Cypher transaction and solver run going. This middleware runs the
+app in a task and cancels it on ``http.disconnect``, or once the ``X-Request-Timeout``
+(seconds) sent by the client has elapsed, in which case it answers 504. Cancelling the
+task aborts the Bolt transaction and, through ``SingleFlight``, terminates a solver
+process nobody waits for any more.
+"""
+
+import asyncio
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from telemetry.metrics import CANCELLED_REQUESTS
+
+from .metrics import route_template
+
+TIMEOUT_HEADER = "x-request-timeout"
+
+
+def request_timeout(scope: Scope) -> float | None:
+    try:
+        timeout = float(Headers(scope=scope).get(TIMEOUT_HEADER, ""))
+    except ValueError:
+        return None
+    return timeout if timeout > 0 else None
+
+
+class CancellationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # The watcher is the only reader of ``receive``; the app gets the messages through a queue.
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_started = response_complete = False
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Servers report a disconnect once the response is complete, that one is not a cancellation.
+                response_complete = True
+            await send(message)
+
+        app = asyncio.create_task(self.app(scope, messages.get, send_wrapper))
+        watcher = asyncio.create_task(watch())
+        gone = asyncio.create_task(disconnected.wait())
+        try:
+            done, _ = await asyncio.wait({app, gone}, timeout=request_timeout(scope), return_when="FIRST_COMPLETED")
+        except asyncio.CancelledError:
+            app.cancel()
+            raise
+        finally:
+            watcher.cancel()
+            gone.cancel()
+        if app in done or response_complete:
+            await app  # re-raises the app's exception
+            return
+
+        reason = "disconnect" if disconnected.is_set() else "deadline"
+        logger.info(f"Cancelling {scope['method']} {scope['path']} ({reason}).")
+        CANCELLED_REQUESTS.labels(route_template(scope), reason).inc()
+        app.cancel()
+        try:
+            await app
+        except asyncio.CancelledError:
+            pass
+        if reason == "deadline" and not response_started:
+            await send({"type": "http.response.start", "status": 504, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"Request deadline exceeded."})
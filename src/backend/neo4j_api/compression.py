@@ -0,0 +1,154 @@
+"""gzip / brotli response compression.
+
+Unlike Starlette's ``GZipMiddleware`` this also negotiates brotli, and flushes the
+compressor after every body chunk so NDJSON streams still reach the client row batch
+by row batch. ``brotli`` is a dependency of the API; an environment without it only
+offers gzip and logs a warning on import.
+"""
+
+import zlib
+from os import environ
+from typing import Protocol
+
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .encoding import parse_qualities
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - declared in the neo4j_api group
+    brotli = None
+    logger.warning("brotli is not installed, responses are only compressed with gzip.")
+
+COMPRESSION_MIN_SIZE = int(environ.get("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(environ.get("BROTLI_QUALITY", 4))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "application/vnd.apache.arrow",
+    "text/",
+)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int = GZIP_LEVEL) -> None:
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int = BROTLI_QUALITY) -> None:
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+ENCODINGS = {"gzip": GzipCompressor} | ({"br": BrotliCompressor} if brotli is not None else {})
+PREFERENCE = ("br", "gzip")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best supported encoding of an ``Accept-Encoding`` header, honouring ``q=0``."""
+    accepted = parse_qualities(accept_encoding)
+
+    def quality_of(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    # max() keeps the first of equally weighted codings, i.e. the server preference.
+    best = max((coding for coding in PREFERENCE if coding in ENCODINGS), key=quality_of, default=None)
+    return best if best is not None and quality_of(best) > 0 else None
+
+
+class CompressionMiddleware:
+    """Compress JSON and NDJSON responses of at least ``minimum_size`` bytes.
+
+    Single-body responses below the threshold are sent as is, since the gzip/brotli
+    framing would outweigh the savings. Streamed responses are always compressed,
+    their length is not known upfront.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or (encoding := choose_encoding(Headers(scope=scope).get("accept-encoding", ""))) is None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: Compressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if compressor is None:
+                assert start is not None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = ENCODINGS[encoding]()
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+
+            chunk = compressor.compress(body) + (compressor.flush() if more_body else compressor.finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,178 @@
+"""``Accept`` header negotiation for the bulk POI and city endpoints.
+
+Results are serialized straight into a ``Response``, skipping FastAPI's
+``jsonable_encoder`` and response model validation. JSON goes through orjson, and
+MessagePack and Arrow IPC are offered through ``msgpack`` / ``pyarrow``, all
+dependencies of the API. An environment without one of them falls back to stdlib
+JSON or stops offering that format, and logs a warning on import. Arrow carries the
+result rows only, paging metadata stays in the ``X-Next-Cursor`` / ``X-Total-Count``
+headers.
+"""
+
+import io
+import json
+from os import environ
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from loguru import logger
+
+from .streaming import NDJSON_MEDIA_TYPE, encode_ndjson
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - declared in the neo4j_api group
+    orjson = None
+    logger.warning("orjson is not installed, JSON responses are encoded with the slower stdlib json.")
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - declared in the neo4j_api group
+    msgpack = None
+    logger.warning("msgpack is not installed, MessagePack responses are not offered.")
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - declared in the neo4j_api group
+    pa = None
+    logger.warning("pyarrow is not installed, Arrow IPC responses are not offered.")
+
+JSON = "application/json"
+NDJSON = NDJSON_MEDIA_TYPE
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+ARROW_BATCH_ROWS = int(environ.get("ARROW_BATCH_ROWS", 5000))
+MSGPACK_CHUNK_SIZE = 64 * 1024
+
+
+def parse_qualities(header: str) -> dict[str, float]:
+    """Map every entry of an ``Accept`` / ``Accept-Encoding`` header to its ``q`` value."""
+    qualities: dict[str, float] = {}
+    for part in header.lower().split(","):
+        value, *params = (item.strip() for item in part.split(";"))
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[value] = quality
+    return qualities
+
+
+def negotiate(accept: str, offered: list[str]) -> str:
+    """Pick the offered media type the client weights highest, ``offered[0]`` without an ``Accept`` header."""
+    if not accept.strip():
+        return offered[0]
+    qualities = parse_qualities(accept)
+
+    def quality_of(media_type: str) -> float:
+        family = media_type.split("/")[0]
+        return qualities.get(media_type, qualities.get(f"{family}/*", qualities.get("*/*", 0.0)))
+
+    best = max(offered, key=quality_of)
+    if quality_of(best) <= 0:
+        raise HTTPException(status_code=406, detail=f"Not acceptable. Available: {', '.join(offered)}.")
+    return best
+
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str)
+    return json.dumps(content, default=str, ensure_ascii=False).encode()
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=str, use_bin_type=True)
+
+
+def arrow_table(rows: list[dict[str, Any]], schema: "pa.Schema | None" = None) -> "pa.Table":
+    if schema is not None:
+        return pa.Table.from_pylist(rows, schema=schema)
+    table = pa.Table.from_pylist(rows)
+    # A column that is null in every row would otherwise be typed as null and reject later values.
+    return table.cast(pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]))
+
+
+def dumps_arrow(rows: list[dict[str, Any]]) -> bytes:
+    table = arrow_table(rows)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def available(media_types: list[str]) -> list[str]:
+    missing = {MSGPACK: msgpack is None, ARROW: pa is None}
+    return [media_type for media_type in media_types if not missing.get(media_type, False)]
+
+
+DOCUMENT_TYPES = available([JSON, MSGPACK, ARROW])
+STREAM_TYPES = available([NDJSON, MSGPACK, ARROW])
+
+
+def negotiated_response(
+    request: Request, content: dict[str, Any], rows_key: str, headers: Mapping[str, str] | None = None
+) -> Response:
+    """Serialize ``content`` in the negotiated format; Arrow encodes ``content[rows_key]``."""
+    media_type = negotiate(request.headers.get("accept", ""), DOCUMENT_TYPES)
+    encoders: dict[str, Callable[[], bytes]] = {
+        JSON: lambda: dumps_json(content),
+        MSGPACK: lambda: dumps_msgpack(content),
+        ARROW: lambda: dumps_arrow(content[rows_key]),
+    }
+    return Response(encoders[media_type](), media_type=media_type, headers=dict(headers or {}))
+
+
+async def batched(rows: AsyncIterator[dict[str, Any]], size: int) -> AsyncIterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def encode_msgpack_stream(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Concatenated MessagePack objects, one per row (read them with ``msgpack.Unpacker``)."""
+    buffer = bytearray()
+    async for row in rows:
+        buffer += dumps_msgpack(row)
+        if len(buffer) >= MSGPACK_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def encode_arrow_stream(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Arrow IPC stream with one record batch per ARROW_BATCH_ROWS rows, typed by the first batch."""
+    sink = io.BytesIO()
+    schema, writer = None, None
+    async for batch in batched(rows, ARROW_BATCH_ROWS):
+        table = arrow_table(batch, schema)
+        if writer is None:
+            schema = table.schema
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_table(table)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    if writer is None:
+        writer = pa.ipc.new_stream(sink, pa.schema([]))
+    writer.close()
+    yield sink.getvalue()
+
+
+def negotiated_stream(request: Request, rows: AsyncIterator[dict[str, Any]]) -> StreamingResponse:
+    """Stream ``rows`` as NDJSON, MessagePack or Arrow IPC depending on the ``Accept`` header."""
+    media_type = negotiate(request.headers.get("accept", ""), STREAM_TYPES)
+    encoders = {NDJSON: encode_ndjson, MSGPACK: encode_msgpack_stream, ARROW: encode_arrow_stream}
+    return StreamingResponse(encoders[media_type](rows), media_type=media_type)
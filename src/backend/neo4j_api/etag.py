@@ -0,0 +1,57 @@
+"""Conditional GET for endpoints whose result only changes with a new import.
+
+The ETag hashes the request (path, query, negotiated media type and content
+encoding) together with the current import version, so a matching
+``If-None-Match`` is answered with 304 from a file stat, without a Cypher query.
+"""
+
+from hashlib import sha1
+from os import getenv
+
+from dataset_import import get_import_version
+from fastapi import Request, Response
+
+from .compression import choose_encoding
+
+SAVE_DIR = getenv("DATATOURISME_SAVE_DIR", "./data/datatourisme")
+ETAG_MAX_AGE = int(getenv("ETAG_MAX_AGE", 0))
+
+
+def parse_if_none_match(header: str) -> set[str]:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+class ImportETag:
+    """FastAPI dependency, use ``matches`` / ``not_modified()`` before querying and ``headers`` on the response."""
+
+    def __init__(self, request: Request) -> None:
+        version = get_import_version(SAVE_DIR)
+        if version is None:
+            self.value = None
+            self.matches = False
+            return
+        key = "|".join(
+            (
+                request.url.path,
+                str(request.query_params),
+                request.headers.get("accept", ""),
+                choose_encoding(request.headers.get("accept-encoding", "")) or "identity",
+                version,
+            )
+        )
+        self.value = f'"{sha1(key.encode()).hexdigest()}"'
+        if_none_match = request.headers.get("if-none-match", "")
+        self.matches = if_none_match.strip() == "*" or self.value in parse_if_none_match(if_none_match)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        if self.value is None:
+            return {"Cache-Control": "no-store"}
+        return {
+            "ETag": self.value,
+            "Cache-Control": f"max-age={ETAG_MAX_AGE}, must-revalidate",
+            "Vary": "Accept, Accept-Encoding",
+        }
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
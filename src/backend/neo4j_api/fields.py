@@ -0,0 +1,25 @@
+from fastapi import HTTPException, Query
+from neo4j_driver.queries import CITY_FIELDS, POI_FIELDS
+
+
+def parse_fields(fields: str | None, allowed: frozenset[str]) -> list[str] | None:
+    """Split a comma separated ``fields`` parameter and reject properties outside ``allowed``."""
+    requested = [field.strip() for field in (fields or "").split(",") if field.strip()]
+    if unknown := set(requested) - allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}.",
+        )
+    return requested or None
+
+
+def poi_fields(
+    fields: str | None = Query(None, description="Comma separated POI properties to return, e.g. label,city.")
+) -> list[str] | None:
+    return parse_fields(fields, POI_FIELDS)
+
+
+def city_fields(
+    fields: str | None = Query(None, description="Comma separated city properties to return, e.g. name,population.")
+) -> list[str] | None:
+    return parse_fields(fields, CITY_FIELDS)
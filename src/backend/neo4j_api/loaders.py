@@ -0,0 +1,20 @@
+"""One batch loader scope per request, see ``neo4j_driver.batch_loader``.
+
+Lookups of a request are batched and memoized together, and never share values
+with other requests, which may be served after an import changed the data.
+"""
+
+from neo4j_driver.batch_loader import loader_scope
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class LoaderScopeMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with loader_scope():
+            await self.app(scope, receive, send)
@@ -1,19 +1,66 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from neo4j_driver.neo4j_driver import Neo4jDriver
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from neo4j.exceptions import ServiceUnavailable
+from neo4j_driver.neo4j_driver import AsyncNeo4jDriver
+from neo4j_driver.poi import PoisWithoutCity, UnknownPois
 
-from .routes import city, data_update, dijkstra, distance, poi, travel, tsp
+from logger import logger  # noqa: F401 - configures the shared loguru sinks
+
+from .cancellation import CancellationMiddleware
+from .compression import CompressionMiddleware
+from .loaders import LoaderScopeMiddleware
+from .metrics import MetricsMiddleware
+from .metrics import router as metrics_router
+from .profiling import ProfilingMiddleware
+from .response_cache import ResponseCacheMiddleware
+from .routes import city, data_update, debug, dijkstra, distance, health, poi, travel, tsp
+from .tracing import TracingMiddleware
+from .warmup import Warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.driver = Neo4jDriver()
+    # Creating the driver does not connect; waiting for Neo4j and the warmup run in
+    # the background so /health answers right away and /health/ready once warm.
+    app.state.driver = AsyncNeo4jDriver()
+    await app.state.driver.init_driver()
+    app.state.warmup = Warmup(app)
+    startup = asyncio.create_task(app.state.warmup.start())
     yield
+    startup.cancel()
     await app.state.driver.close()
+    if (import_driver := getattr(app.state, "import_driver", None)) is not None:
+        import_driver.close()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(LoaderScopeMiddleware)
+app.add_middleware(CancellationMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(UnknownPois)  # type: ignore[misc]
+async def unknown_pois_handler(request: Request, err: UnknownPois) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"detail": str(err), "missing": err.poi_ids})
+
+
+@app.exception_handler(PoisWithoutCity)  # type: ignore[misc]
+async def pois_without_city_handler(request: Request, err: PoisWithoutCity) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"detail": str(err), "without_city": err.poi_ids})
+
+
+@app.exception_handler(ServiceUnavailable)  # type: ignore[misc]
+async def service_unavailable_handler(request: Request, err: ServiceUnavailable) -> JSONResponse:
+    return JSONResponse(
+        status_code=503, content={"detail": "Neo4j is not available yet."}, headers={"Retry-After": "1"}
+    )
 
 
 app.include_router(travel.router, prefix="/travel", tags=["Travel"])
@@ -23,3 +70,6 @@ app.include_router(distance.router, prefix="/distance", tags=["Distance"])
 app.include_router(tsp.router, prefix="/tsp", tags=["TSP"])
 app.include_router(dijkstra.router, prefix="/dijkstra", tags=["DIJKSTRA"])
 app.include_router(data_update.router, prefix="/data", tags=["DATA"])
+app.include_router(debug.router, prefix="/debug", tags=["DEBUG"])
+app.include_router(health.router, prefix="/health", tags=["HEALTH"])
+app.include_router(metrics_router, prefix="/metrics")
@@ -0,0 +1,65 @@
+from time import perf_counter
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from telemetry.metrics import CONTENT_TYPE, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT, render
+
+router = APIRouter()
+
+
+# Set by the response cache on a hit, which never reaches the router.
+ROUTE_TEMPLATE = "route_template"
+
+
+def route_template(scope: Scope) -> str:
+    """Full path template of the matched route, e.g. ``/city/{city_id}``, or ``unmatched``."""
+    if (template := scope.get(ROUTE_TEMPLATE)) is not None:
+        return template  # type: ignore[no-any-return]
+    if (path_format := getattr(scope.get("route"), "path_format", None)) is None:
+        return "unmatched"
+    # FastAPI versions that resolve included routers lazily keep their prefixes in the include
+    # context of the matched router; older versions copy the routes with the prefix applied.
+    included = scope.get("fastapi", {}).get("included_router")
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "")
+    return f"{prefix}{path_format}"
+
+
+class MetricsMiddleware:
+    """Record latency per route template and the number of requests in flight.
+
+    The route template (``/city/{city_id}``) rather than the raw path is used as
+    label so the number of series stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = perf_counter()
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            histogram = HTTP_REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status))
+            histogram.observe(perf_counter() - started)
+
+
+@router.get("", include_in_schema=False)  # type: ignore[misc]
+async def metrics() -> Response:
+    return Response(render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,17 @@
+from typing import Any, Awaitable
+
+from fastapi import HTTPException, Response
+from neo4j_driver.pagination import InvalidCursor
+
+
+async def fetch_page(page: Awaitable[dict[str, Any]], response: Response) -> dict[str, Any]:
+    """Await a driver page and mirror its cursor and total in the X-Next-Cursor / X-Total-Count headers."""
+    try:
+        result = await page
+    except InvalidCursor as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    if result["next_cursor"] is not None:
+        response.headers["X-Next-Cursor"] = result["next_cursor"]
+    if result["total"] is not None:
+        response.headers["X-Total-Count"] = str(result["total"])
+    return result
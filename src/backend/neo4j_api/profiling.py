@@ -0,0 +1,190 @@
+"""Opt-in sampling profiler for single requests.
+
+A request with ``?profile=1`` (or ``X-Profile: 1``) and a valid ``X-Debug-Token`` is
+run while a background thread samples the Python stacks every ``PROFILE_INTERVAL_MS``.
+The stacks are stored in the folded format of flamegraph.pl / speedscope / inferno
+(``frame;frame;frame count``) under ``PROFILE_DIR`` and the response carries
+``X-Profile-Id`` to fetch it from ``/debug/profiles/{id}``. Without ``DEBUG_TOKEN``
+the flag is ignored and the ``/debug`` profiling endpoints answer 404.
+
+Samples are taken from the event loop thread, which also runs concurrent requests,
+and from busy worker threads such as the TSP solver thread; idle threads are skipped.
+While tracemalloc is tracing (see ``/debug/memory``), the profile also records the
+peak of traced memory above the level at the start of the request.
+"""
+
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from os import getenv
+from pathlib import Path
+from types import FrameType
+from typing import Any
+from urllib.parse import parse_qsl
+
+from fastapi import Header, HTTPException
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEBUG_TOKEN = getenv("DEBUG_TOKEN", "")
+PROFILE_DIR = Path(getenv("PROFILE_DIR", "./logs/profiles"))
+PROFILE_INTERVAL_MS = float(getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_KEEP = int(getenv("PROFILE_KEEP", 50))
+# Threads whose innermost frame is in one of these files are waiting for work.
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "futures/thread.py")
+# Background threads of the logger and the span exporter.
+IGNORED_THREADS = ("loguru-writer", "span-exporter")
+
+
+def token_valid(token: str | None) -> bool:
+    return bool(DEBUG_TOKEN) and token is not None and secrets.compare_digest(token, DEBUG_TOKEN)
+
+
+def require_debug_token(x_debug_token: str | None = Header(None)) -> None:
+    """Guard of the diagnostics endpoints; they do not exist without ``DEBUG_TOKEN``."""
+    if not DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_valid(x_debug_token):
+        raise HTTPException(status_code=403, detail="Invalid debug token.")
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = "/".join(Path(code.co_filename).parts[-2:])
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Counts the folded stacks of the given thread and of busy other threads."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_MS / 1000) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        self.samples += 1
+        ignored = {thread.ident for thread in threading.enumerate() if thread.name.startswith(IGNORED_THREADS)}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.thread.ident or thread_id in ignored:
+                continue
+            if thread_id != self.thread_id and frame.f_code.co_filename.endswith(IDLE_FILES):
+                continue
+            stack = []
+            current: FrameType | None = frame
+            while current is not None:
+                stack.append(frame_label(current))
+                current = current.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_requested(scope: Scope) -> bool:
+    if Headers(scope=scope).get("x-profile") == "1":
+        return True
+    return ("profile", "1") in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+
+
+def profile_path(profile_id: str, suffix: str) -> Path:
+    if not re.fullmatch(r"[0-9a-f]{16}", profile_id):
+        raise FileNotFoundError(profile_id)
+    return PROFILE_DIR / f"{profile_id}{suffix}"
+
+
+def save_profile(profile_id: str, sampler: StackSampler, meta: dict[str, Any]) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_path(profile_id, ".folded").write_text(sampler.folded())
+    profile_path(profile_id, ".json").write_text(json.dumps(meta))
+    profiles = sorted(PROFILE_DIR.glob("*.json"), key=os.path.getmtime)
+    for old in profiles[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = sorted(PROFILE_DIR.glob("*.json"), key=os.path.getmtime, reverse=True)
+    return [json.loads(path.read_text()) for path in profiles]
+
+
+def load_profile(profile_id: str) -> str:
+    return profile_path(profile_id, ".folded").read_text()
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it; they bypass the response cache."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not DEBUG_TOKEN or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not token_valid(Headers(scope=scope).get("x-debug-token")):
+            await send({"type": "http.response.start", "status": 403, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": b"Profiling needs a valid X-Debug-Token."})
+            return
+
+        profile_id = secrets.token_hex(8)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident())
+        if tracing_memory := tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            memory_started = tracemalloc.get_traced_memory()[0]
+        started, cpu_started = time.perf_counter(), time.process_time()
+        sampler.start()
+        try:
+            # Set in place: the outer middlewares read the matched route from the same scope.
+            scope["profile"] = profile_id
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "started": time.time() - (time.perf_counter() - started),
+                "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+                "process_cpu_ms": round((time.process_time() - cpu_started) * 1000, 2),
+                "samples": sampler.samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+            }
+            if tracing_memory and tracemalloc.is_tracing():
+                meta["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1] - memory_started
+            save_profile(profile_id, sampler, meta)
+            logger.info(f"Profiled {scope['method']} {scope['path']} as {profile_id} ({sampler.samples} samples).")
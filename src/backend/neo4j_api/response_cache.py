@@ -0,0 +1,224 @@
+"""In-process cache of whole GET responses for routes marked with ``@cache_response``.
+
+Entries are keyed by path, sorted query parameters, ``Accept``, the negotiated
+content encoding and the current import version, so a finished import makes
+every older entry unreachable (the cache is cleared when the version changes).
+The cache sits outside the compression middleware and stores compressed bodies.
+
+Within ``ttl`` an entry is served as is. Up to ``stale`` seconds after that it is
+still served, while a single background request per key refreshes it. The LRU is
+bounded by the total body size in bytes.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from os import getenv
+from threading import Lock
+from typing import Any, Callable, NamedTuple, TypeVar
+
+from dataset_import import get_import_version
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from telemetry.metrics import CACHE_BYTES, CACHE_EVICTIONS, CACHE_REQUESTS
+
+from .compression import choose_encoding
+from .etag import SAVE_DIR
+from .metrics import ROUTE_TEMPLATE, route_template
+
+RESPONSE_CACHE_MAX_BYTES = int(getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+RESPONSE_CACHE_TTL = float(getenv("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_STALE = float(getenv("RESPONSE_CACHE_STALE", 600))
+CACHE_NAME = "response"
+
+Endpoint = TypeVar("Endpoint", bound=Callable[..., Any])
+
+
+class CachePolicy(NamedTuple):
+    ttl: float
+    stale: float
+
+
+class CachedResponse(NamedTuple):
+    stored_at: float
+    policy: CachePolicy
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    route: str = "unmatched"
+
+
+def cache_response(
+    ttl: float = RESPONSE_CACHE_TTL, stale: float = RESPONSE_CACHE_STALE
+) -> Callable[[Endpoint], Endpoint]:
+    """Mark a GET endpoint as cacheable. Only apply it to routes whose result depends on the request and the dataset."""
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        endpoint.cache_policy = CachePolicy(ttl, stale)  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+class ResponseLRU:
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple[str, ...], CachedResponse] = OrderedDict()
+        self.size = 0
+        self.version: str | None = None
+        self.lock = Lock()
+        self.evictions = CACHE_EVICTIONS.labels(CACHE_NAME)
+        self.bytes = CACHE_BYTES.labels(CACHE_NAME)
+
+    def use_version(self, version: str) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def get(self, key: tuple[str, ...]) -> CachedResponse | None:
+        with self.lock:
+            if (entry := self.entries.get(key)) is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: tuple[str, ...], entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        with self.lock:
+            if (old := self.entries.pop(key, None)) is not None:
+                self.size -= len(old.body)
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions.inc()
+            self.bytes.set(self.size)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.bytes.set(0)
+
+
+RESPONSE_CACHE = ResponseLRU()
+
+
+def cache_key(scope: Scope, version: str) -> tuple[str, ...]:
+    headers = Headers(scope=scope)
+    query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+    encoding = choose_encoding(headers.get("accept-encoding", "")) or "identity"
+    return scope["path"], query, headers.get("accept", ""), encoding, version
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app: ASGIApp, cache: ResponseLRU = RESPONSE_CACHE) -> None:
+        self.app = app
+        self.cache = cache
+        self.refreshing: set[tuple[str, ...]] = set()
+        self.background_tasks: set[asyncio.Task[None]] = set()
+        self.hits = CACHE_REQUESTS.labels(CACHE_NAME, "hit")
+        self.stale_hits = CACHE_REQUESTS.labels(CACHE_NAME, "stale")
+        self.misses = CACHE_REQUESTS.labels(CACHE_NAME, "miss")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Conditional requests are answered by the ETag handling in the routes, which is already cheap,
+        # and profiled requests have to run.
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or "if-none-match" in Headers(scope=scope)
+            or scope.get("profile")
+        ):
+            await self.app(scope, receive, send)
+            return
+        if (version := get_import_version(SAVE_DIR)) is None:
+            await self.app(scope, receive, send)
+            return
+        self.cache.use_version(version)
+        key = cache_key(scope, version)
+
+        if (entry := self.cache.get(key)) is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < entry.policy.ttl:
+                self.hits.inc()
+                scope[ROUTE_TEMPLATE] = entry.route
+                await self.replay(entry, b"HIT", send)
+                return
+            if age < entry.policy.ttl + entry.policy.stale:
+                self.stale_hits.inc()
+                self.refresh(key, dict(scope))
+                scope[ROUTE_TEMPLATE] = entry.route
+                await self.replay(entry, b"STALE", send)
+                return
+        self.misses.inc()
+        await self.fetch(key, scope, receive, send)
+
+    async def fetch(self, key: tuple[str, ...], scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request and keep the response if the route is cacheable and it fits in a single body."""
+        start: Message | None = None
+        chunks: list[bytes] = []
+        streamed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, streamed
+            if message["type"] == "http.response.start":
+                start = message
+                message = {**message, "headers": [*message.get("headers", []), (b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body" and not streamed:
+                # Streamed responses are never cached, so stop buffering them.
+                streamed = message.get("more_body", False)
+                chunks[:] = [] if streamed else [*chunks, message.get("body", b"")]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        policy = getattr(scope.get("endpoint"), "cache_policy", None)
+        if policy is not None and start is not None and start["status"] == 200 and not streamed:
+            entry = CachedResponse(
+                time.monotonic(),
+                policy,
+                start["status"],
+                list(start["headers"]),
+                b"".join(chunks),
+                route_template(scope),
+            )
+            self.cache.set(key, entry)
+
+    def refresh(self, key: tuple[str, ...], scope: Scope) -> None:
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+
+        requested = False
+
+        async def receive() -> Message:
+            nonlocal requested
+            if requested:  # like a server, block until the request is over; nobody disconnects here
+                await asyncio.Future()
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def discard(message: Message) -> None:
+            pass
+
+        async def run() -> None:
+            try:
+                await self.fetch(key, scope, receive, discard)
+            except Exception as err:
+                logger.error(f"Refreshing cached response for {scope['path']} failed: {err}")
+            finally:
+                self.refreshing.discard(key)
+
+        task = asyncio.create_task(run())
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    @staticmethod
+    async def replay(entry: CachedResponse, status: bytes, send: Send) -> None:
+        await send(
+            {"type": "http.response.start", "status": entry.status, "headers": [*entry.headers, (b"x-cache", status)]}
+        )
+        await send({"type": "http.response.body", "body": entry.body})
@@ -1,46 +1,100 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from neo4j_driver.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+from ..encoding import negotiated_response
+from ..etag import ImportETag
+from ..fields import city_fields, poi_fields
+from ..pagination import fetch_page
+from ..response_cache import cache_response
+from ..streaming import ndjson_response
 
 router = APIRouter()
 
 
 @router.get("/all")  # type: ignore[misc]
-def get_cities(request: Request) -> dict[str, Any]:
+@cache_response()
+async def get_cities(request: Request, etag: ImportETag = Depends()) -> Response:
+    """All cities as JSON, MessagePack or Arrow IPC depending on the ``Accept`` header."""
+    if etag.matches:
+        return etag.not_modified()
+    driver = request.app.state.driver
+    cities = await driver.get_cities()  # type: ignore
+    return negotiated_response(request, cities, "cities", etag.headers)
+
+
+@router.get("/all/stream")  # type: ignore[misc]
+async def stream_cities(request: Request) -> StreamingResponse:
+    """Same cities as /all, one JSON object per line."""
     driver = request.app.state.driver
-    cities = driver.get_cities()  # type: ignore
-    return cities
+    return ndjson_response(driver.iter_cities())
 
 
 @router.get("/{city_id}")  # type: ignore[misc]
-def get_city(request: Request, city_id: str) -> dict[str, Any]:
+@cache_response()
+async def get_city(request: Request, city_id: str, fields: list[str] | None = Depends(city_fields)) -> dict[str, Any]:
     driver = request.app.state.driver
-    return driver.get_city(city_id)  # type: ignore
+    return await driver.get_city(city_id, fields)  # type: ignore
 
 
 @router.get("/{city_id}/pois")  # type: ignore[misc]
-def get_city_points(
-    request: Request, city_id: str, category: Optional[List[str]] = Query(None)
+@cache_response()
+async def get_city_points(
+    request: Request,
+    response: Response,
+    city_id: str,
+    category: Optional[List[str]] = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    with_total: bool = False,
+    fields: list[str] | None = Depends(poi_fields),
 ) -> List[dict[str, Any]]:
+    """With ``limit``/``cursor`` one page, the next cursor and total are returned as X-Next-Cursor / X-Total-Count."""
     driver = request.app.state.driver
-    return driver.get_poi_for_city(city_id, category)  # type: ignore
+    if limit is None and cursor is None:
+        return await driver.get_poi_for_city(city_id, category, fields)  # type: ignore
+    page = driver.get_poi_for_city_page(city_id, category, limit or DEFAULT_PAGE_SIZE, cursor, with_total, fields)
+    return (await fetch_page(page, response))["pois"]
 
 
 @router.get("/{city_id}/pois_nearby")  # type: ignore[misc]
-def get_nearby_city_points(
-    request: Request, city_id: str, category: Optional[List[str]] = Query(None)
+@cache_response()
+async def get_nearby_city_points(
+    request: Request,
+    response: Response,
+    city_id: str,
+    category: Optional[List[str]] = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    with_total: bool = False,
+    fields: list[str] | None = Depends(poi_fields),
 ) -> List[dict[str, Any]]:
+    """Ordered by distance; pages, like those of /{city_id}/pois, are ordered by (city, label, poiId) instead."""
     driver = request.app.state.driver
-    return driver.get_poi_near_city(city_id, category)  # type: ignore
+    if limit is None and cursor is None:
+        return await driver.get_poi_near_city(city_id, category, fields)  # type: ignore
+    page = driver.get_poi_near_city_page(city_id, category, limit or DEFAULT_PAGE_SIZE, cursor, with_total, fields)
+    return (await fetch_page(page, response))["pois"]
 
 
 @router.get("/{city_id}/poi_types")  # type: ignore[misc]
-def get_poi_types_for_city(request: Request, city_id: str) -> List[str]:
+@cache_response()
+async def get_poi_types_for_city(
+    request: Request, response: Response, city_id: str, etag: ImportETag = Depends()
+) -> Any:
+    if etag.matches:
+        return etag.not_modified()
+    response.headers.update(etag.headers)
     driver = request.app.state.driver
-    return driver.get_poi_types_for_city(city_id)  # type: ignore
+    return await driver.get_poi_types_for_city(city_id)
 
 
 @router.get("/{latitude}/{longitude}")
-def get_city_by_coordinates(request: Request, latitude: float, longitude: float) -> dict[str, Any]:
+@cache_response()
+async def get_city_by_coordinates(request: Request, latitude: float, longitude: float) -> dict[str, Any]:
     driver = request.app.state.driver
-    return driver.get_nearest_city_by_coordinates(latitude, longitude)
+    if (nearest := await driver.get_nearest_city_by_coordinates(latitude, longitude)) is None:
+        raise HTTPException(status_code=404, detail=f"No city found near ({latitude}, {longitude}).")
+    return nearest
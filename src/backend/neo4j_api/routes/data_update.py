@@ -2,34 +2,31 @@ import os
 from pathlib import Path
 from typing import Any, Dict, Literal, Union
 
-from dataset_import import (
-    AuthenticatedClient,
-    NoDataAvailable,
-    ProcessLock,
-    ProcessRunning,
-    check_download,
-    get_status_file,
-    get_status_file_content,
-    perform_cleanup_import,
-    perform_download,
-    perform_extract_data,
-    perform_import_data,
-    unzip_data,
-)
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+import dataset_import
+from dataset_import import ProcessLock, ProcessRunning, get_status_file, get_status_file_content
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from neo4j_driver.neo4j_driver import Neo4jDriver
 from starlette.status import HTTP_202_ACCEPTED
 
-SAVE_DIR = os.getenv("DATATOURISME_SAVE_DIR", "./data/datatourisme")
-if not os.path.exists(SAVE_DIR):
-    os.makedirs(SAVE_DIR, exist_ok=True)
-SAVE_DIR = Path(SAVE_DIR)
+# The download, extract and import steps (aiohttp, BeautifulSoup, pandas, tqdm) are
+# reached through ``dataset_import.<name>``, which imports them on first use.
+SAVE_DIR = Path(os.getenv("DATATOURISME_SAVE_DIR", "./data/datatourisme"))
+IMPORT_DIR = Path(os.getenv("DATATOURISME_IMPORT_DIR", "./data/import"))
 
-IMPORT_DIR = os.getenv("DATATOURISME_IMPORT_DIR", "./data/import")
-if not os.path.exists(IMPORT_DIR):
-    os.makedirs(IMPORT_DIR, exist_ok=True)
-IMPORT_DIR = Path(IMPORT_DIR)
 
-router = APIRouter()
+def create_data_dirs() -> None:
+    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def get_import_driver(request: Request) -> Neo4jDriver:
+    """The sync driver of the import jobs, connected when a data route first needs it."""
+    if getattr(request.app.state, "import_driver", None) is None:
+        request.app.state.import_driver = Neo4jDriver()
+    return request.app.state.import_driver
+
+
+router = APIRouter(dependencies=[Depends(create_data_dirs)])
 
 
 def raise_if_in_progress(save_dir, process):
@@ -69,13 +66,13 @@ async def trigger_download(bg_tasks: BackgroundTasks):
     """
     try:
         raise_if_in_progress(SAVE_DIR, "download")
-        auth_client = AuthenticatedClient()
+        auth_client = dataset_import.AuthenticatedClient()
         await auth_client.login()
-        await check_download(auth_client, SAVE_DIR)
-        bg_tasks.add_task(perform_download, SAVE_DIR, auth_client)
+        await dataset_import.check_download(auth_client, SAVE_DIR)
+        bg_tasks.add_task(dataset_import.perform_download, SAVE_DIR, auth_client)
     except ProcessRunning:
         raise HTTPException(status_code=409, detail="Download already in progress")
-    except NoDataAvailable:
+    except dataset_import.NoDataAvailable:
         raise HTTPException(status_code=404, detail="No new data available")
 
     return {"message": "Download triggered successfully", "check_status_at": "/status", "download_dir": str(SAVE_DIR)}
@@ -99,7 +96,7 @@ async def unzip_downloaded_data(bg_tasks: BackgroundTasks) -> Dict[str, str]:
         extract_to = SAVE_DIR / file_path.stem
         raise_if_file_exists(extract_to)
 
-        bg_tasks.add_task(unzip_data, file_path, SAVE_DIR, extract_to)
+        bg_tasks.add_task(dataset_import.unzip_data, file_path, SAVE_DIR, extract_to)
     except ProcessRunning as exc:
         status_code = 409
         detail = "Unzip already in progress"
@@ -128,7 +125,7 @@ async def extract_data(bg_tasks: BackgroundTasks) -> Dict[str, Any]:
         extracted_data_path = Path(unzip_status["filename"])
         raise_if_file_not_exists(extracted_data_path)
 
-        bg_tasks.add_task(perform_extract_data, extracted_data_path, SAVE_DIR, IMPORT_DIR)
+        bg_tasks.add_task(dataset_import.perform_extract_data, extracted_data_path, SAVE_DIR, IMPORT_DIR)
     except ProcessRunning:
         raise HTTPException(status_code=409, detail="Extract already in progress")
     except FileNotFoundError as exc:
@@ -150,7 +147,7 @@ async def import_data(request: Request, bg_tasks: BackgroundTasks) -> Dict[str,
         extracted_data_path = Path(extract_status["filename"])
         raise_if_file_not_exists(extracted_data_path)
 
-        bg_tasks.add_task(perform_import_data, SAVE_DIR, request.app.state.driver, extracted_data_path)
+        bg_tasks.add_task(dataset_import.perform_import_data, SAVE_DIR, get_import_driver(request), extracted_data_path)
     except ProcessRunning:
         raise HTTPException(status_code=409, detail="Import already in progress")
     except FileNotFoundError as exc:
@@ -184,12 +181,12 @@ async def process_cleanup(request: Request, bg_tasks: BackgroundTasks) -> Dict[s
         extracted_data_path = Path(extracted_status["filename"])
 
         bg_tasks.add_task(
-            perform_cleanup_import,
+            dataset_import.perform_cleanup_import,
             SAVE_DIR,
             zip_file_path,
             unzipped_data_path,
             extracted_data_path,
-            request.app.state.driver,
+            get_import_driver(request),
             import_version,
         )
     except ProcessRunning:
@@ -0,0 +1,94 @@
+import asyncio
+import tracemalloc
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from neo4j_driver.slow_queries import SLOW_QUERIES
+
+from ..profiling import list_profiles, load_profile, require_debug_token
+
+router = APIRouter()
+guarded = APIRouter(dependencies=[Depends(require_debug_token)])
+
+# Snapshot of the previous /debug/memory call, for ``compare=true``.
+_last_snapshot: tracemalloc.Snapshot | None = None
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+@guarded.get("/slow-queries")  # type: ignore[misc]
+async def get_slow_queries(limit: int = Query(20, ge=1, le=100)) -> dict[str, Any]:
+    """Slowest named queries since startup with their last captured PROFILE plan."""
+    return {"threshold_ms": SLOW_QUERIES.threshold_ms, "queries": SLOW_QUERIES.top(limit)}
+
+
+@guarded.get("/profiles")  # type: ignore[misc]
+async def get_profiles() -> dict[str, Any]:
+    """Stored request profiles, newest first. Profile a request with ``?profile=1``."""
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+
+@guarded.get("/profiles/{profile_id}", response_class=PlainTextResponse)  # type: ignore[misc]
+async def get_profile(profile_id: str) -> str:
+    """Folded stacks of a profile, for flamegraph.pl, speedscope or inferno."""
+    try:
+        return await asyncio.to_thread(load_profile, profile_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+
+
+@guarded.get("/memory")  # type: ignore[misc]
+async def get_memory(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    compare: bool = False,
+) -> dict[str, Any]:
+    """Top allocations traced by tracemalloc, or their growth since the previous call with ``compare=true``."""
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "detail": "Start tracing with POST /debug/memory/tracing."}
+    snapshot = await asyncio.to_thread(lambda: tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS))
+    current, peak = tracemalloc.get_traced_memory()
+    if compare and _last_snapshot is not None:
+        diffs = snapshot.compare_to(_last_snapshot, group_by)[:limit]
+        top = [
+            {
+                "size_bytes": diff.size,
+                "size_diff_bytes": diff.size_diff,
+                "count": diff.count,
+                "count_diff": diff.count_diff,
+                "traceback": diff.traceback.format(),
+            }
+            for diff in diffs
+        ]
+    else:
+        top = [
+            {"size_bytes": stat.size, "count": stat.count, "traceback": stat.traceback.format()}
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+    _last_snapshot = snapshot
+    return {"tracing": True, "current_bytes": current, "peak_bytes": peak, "top": top}
+
+
+@guarded.post("/memory/tracing")  # type: ignore[misc]
+async def start_memory_tracing(frames: int = Query(1, ge=1, le=50)) -> dict[str, Any]:
+    """Start tracemalloc with ``frames`` frames per traceback; tracing slows allocations down."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+
+@guarded.delete("/memory/tracing")  # type: ignore[misc]
+async def stop_memory_tracing() -> dict[str, Any]:
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+    return {"tracing": False}
+
+
+router.include_router(guarded)
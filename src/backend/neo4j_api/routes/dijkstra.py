@@ -4,13 +4,15 @@ router = APIRouter()
 
 
 @router.get("/")  # type: ignore[misc]
-def shortest_path_from_start_to_dest(request: Request, poi_ids: list[str] = Query(...)) -> dict[str, list[str] | float]:
+async def shortest_path_from_start_to_dest(
+    request: Request, poi_ids: list[str] = Query(...)
+) -> dict[str, list[str] | float]:
     driver = request.app.state.driver
-    return driver.calculate_shortest_path_from_start_to_dest(poi_ids)  # type: ignore[no-any-return]
+    return await driver.calculate_shortest_path_from_start_to_dest(poi_ids)  # type: ignore[no-any-return]
 
 
 @router.get("/create-roads")  # type: ignore[misc]
-def create_roads(request: Request) -> dict[str, str]:
+async def create_roads(request: Request) -> dict[str, str]:
     driver = request.app.state.driver
-    driver.create_roads()
+    await driver.create_roads()
     return {"status": "OK"}
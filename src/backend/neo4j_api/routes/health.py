@@ -0,0 +1,35 @@
+from typing import Any
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+def neo4j_state(request: Request) -> str:
+    driver = getattr(request.app.state, "driver", None)
+    return "ready" if getattr(driver, "ready", False) is True else "starting"
+
+
+@router.get("")  # type: ignore[misc]
+async def health(request: Request) -> dict[str, Any]:
+    """Answers as soon as the process serves HTTP; Neo4j readiness is reported, not awaited."""
+    return {"status": "ok", "neo4j": neo4j_state(request)}
+
+
+@router.get("/live")  # type: ignore[misc]
+async def live() -> dict[str, Any]:
+    """Liveness probe: the event loop answers."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")  # type: ignore[misc]
+async def ready(request: Request) -> JSONResponse:
+    """Readiness probe: Neo4j is online and the warmup ran at least once."""
+    warmup = getattr(request.app.state, "warmup", None)
+    warmup_status = warmup.status() if warmup is not None else {"warmed": False}
+    is_ready = neo4j_state(request) == "ready" and warmup_status["warmed"]
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "starting", "neo4j": neo4j_state(request), "warmup": warmup_status},
+    )
@@ -1,31 +1,105 @@
+from os import getenv
 from typing import Any
 
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from neo4j_driver.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pydantic import BaseModel, Field
+
+from ..encoding import ARROW, MSGPACK, negotiated_response, negotiated_stream
+from ..etag import ImportETag
+from ..fields import poi_fields
+from ..pagination import fetch_page
+from ..response_cache import cache_response
+from ..streaming import ndjson_response
+
+MAX_BATCH_SIZE = int(getenv("POI_BATCH_MAX_SIZE", 500))
 
 router = APIRouter()
 
 
+class PoiBatchRequest(BaseModel):
+    poi_ids: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 @router.get("/")  # type: ignore[misc]
-def get_poi(request: Request, poi_id: str) -> dict[str, Any]:
+@cache_response()
+async def get_poi(request: Request, poi_id: str, fields: list[str] | None = Depends(poi_fields)) -> dict[str, Any]:
+    driver = request.app.state.driver
+    return await driver.get_poi(poi_id, fields)  # type: ignore
+
+
+@router.post("/batch")  # type: ignore[misc]
+async def get_pois(
+    request: Request, body: PoiBatchRequest, fields: list[str] | None = Depends(poi_fields)
+) -> dict[str, Any]:
+    """POIs in the order of ``poi_ids`` in a single query; unknown ids are ``null`` and listed in ``missing``."""
     driver = request.app.state.driver
-    return driver.get_poi(poi_id)  # type: ignore
+    pois = await driver.get_pois(body.poi_ids, fields)
+    return {"pois": pois, "missing": [poi_id for poi_id, poi in zip(body.poi_ids, pois) if poi is None]}
 
 
 @router.get("/nearby")  # type: ignore[misc]
-def get_nearby_points(request: Request, poi_id: str, radius: float) -> dict[str, Any]:
+@cache_response()
+async def get_nearby_points(request: Request, poi_id: str, radius: float) -> dict[str, Any]:
     driver = request.app.state.driver
-    return driver.get_nearby_points(poi_id, radius)  # type: ignore
+    return await driver.get_nearby_points(poi_id, radius)  # type: ignore
 
 
 @router.get("/types")  # type: ignore[misc]
-def get_types(request: Request) -> dict[str, Any]:
+@cache_response()
+async def get_types(request: Request, response: Response, etag: ImportETag = Depends()) -> Any:
+    if etag.matches:
+        return etag.not_modified()
+    response.headers.update(etag.headers)
     driver = request.app.state.driver
-    return driver.get_types()  # type: ignore
+    return await driver.get_types()
 
 
 @router.get("/filter")  # type: ignore[misc]
-def get_filtered_pois(
+@cache_response()
+async def get_filtered_pois(
+    request: Request,
+    response: Response,
+    locations: list[str] = Query(...),
+    types: list[str] = Query(...),
+    radius: int = 0,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    with_total: bool = False,
+) -> Response:
+    """All matching POIs, or with ``limit``/``cursor`` one page ordered by (city, label, poiId)
+    together with ``next_cursor`` and, if ``with_total`` is set, the ``total``.
+
+    Encoded as JSON, MessagePack or Arrow IPC depending on the ``Accept`` header."""
+    driver = request.app.state.driver
+    if limit is None and cursor is None:
+        return negotiated_response(request, await driver.get_filtered_pois(locations, types, radius), "pois")
+    page = driver.get_filtered_pois_page(locations, types, radius, limit or DEFAULT_PAGE_SIZE, cursor, with_total)
+    return negotiated_response(request, await fetch_page(page, response), "pois", response.headers)
+
+
+@router.get("/filter/stream")  # type: ignore[misc]
+async def stream_filtered_pois(
     request: Request, locations: list[str] = Query(...), types: list[str] = Query(...), radius: int = 0
-) -> dict[str, Any]:
+) -> StreamingResponse:
+    """Same POIs as /filter, one JSON object per line, without materializing the full result set."""
+    driver = request.app.state.driver
+    return ndjson_response(driver.iter_filtered_pois(locations, types, radius))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, MSGPACK: {}, ARROW: {}}}},
+)  # type: ignore[misc]
+async def export_pois(
+    request: Request,
+    locations: list[str] | None = Query(None),
+    types: list[str] | None = Query(None),
+    radius: int = 0,
+) -> StreamingResponse:
+    """Bulk export of all POIs, optionally filtered like /filter, streamed as NDJSON (default),
+    concatenated MessagePack objects or an Arrow IPC stream depending on the ``Accept`` header."""
     driver = request.app.state.driver
-    return driver.get_filtered_pois(locations, types, radius)
+    return negotiated_stream(request, driver.iter_filtered_pois(locations, types, radius))
@@ -2,18 +2,28 @@ from typing import Any, Dict, List, Literal
 
 from fastapi import APIRouter, Query, Request
 
+from ..admission import TRAVERSAL, roundtrip_cost, run_admitted
+from ..response_cache import cache_response
+
 router = APIRouter()
 
 
 @router.get("/between/{start_city}/{end_city}")  # type: ignore[misc]
-def get_route_between_cities(request: Request, start_city: str, end_city: str) -> List[Dict[str, Any]]:
+@cache_response()
+async def get_route_between_cities(request: Request, start_city: str, end_city: str) -> List[Dict[str, Any]]:
     """returns shortest path from start_city to end_city"""
     driver = request.app.state.driver
-    return driver.get_route_between_cities(start_city, end_city)  # type: ignore
+    return await run_admitted(
+        TRAVERSAL,
+        request,
+        1,
+        ("between", start_city, end_city),
+        lambda: driver.get_route_between_cities(start_city, end_city),
+    )
 
 
 @router.get("/around/{city_id}")  # type: ignore[misc]
-def get_roundtrip(
+async def get_roundtrip(
     request: Request,
     city_id: str,
     distance: float,
@@ -22,4 +32,10 @@ def get_roundtrip(
     sort_distance: Literal["ASC", "DESC"] = "ASC",
 ) -> Dict[str, Any]:
     driver = request.app.state.driver
-    return driver.get_roundtrip(city_id, distance, distance_tol, max_hops, sort_distance)  # type: ignore
+    return await run_admitted(
+        TRAVERSAL,
+        request,
+        roundtrip_cost(max_hops),
+        ("around", city_id, distance, distance_tol, max_hops, sort_distance),
+        lambda: driver.get_roundtrip(city_id, distance, distance_tol, max_hops, sort_distance),
+    )
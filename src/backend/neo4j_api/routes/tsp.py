@@ -3,6 +3,9 @@ from typing import List
 from fastapi import APIRouter, Query, Request
 from pydantic import BaseModel
 
+from ..admission import SOLVER, run_admitted, tsp_cost
+
+# Every endpoint here runs the solver, so they share one admission cost class.
 router = APIRouter()
 
 
@@ -13,24 +16,42 @@ class TSPResponse(BaseModel):
 
 
 @router.get("/shortest-round-tour", response_model=TSPResponse)  # type: ignore[misc]
-def shortest_round_tour(
+async def shortest_round_tour(
     request: Request, poi_ids: list[str] = Query(...)
 ) -> dict[str, list[str] | float | list[list[float]]]:
     driver = request.app.state.driver
-    return driver.calculate_shortest_round_tour(poi_ids)  # type: ignore[no-any-return]
+    return await run_admitted(
+        SOLVER,
+        request,
+        tsp_cost(poi_ids),
+        ("shortest_round_tour", tuple(poi_ids)),
+        lambda: driver.calculate_shortest_round_tour(poi_ids),
+    )
 
 
 @router.get("/shortest-path-no-return", response_model=TSPResponse)  # type: ignore[misc]
-def shortest_path_no_return(
+async def shortest_path_no_return(
     request: Request, poi_ids: list[str] = Query(...)
 ) -> dict[str, list[str] | float | list[list[float]]]:
     driver = request.app.state.driver
-    return driver.calculate_shortest_path_no_return(poi_ids)  # type: ignore[no-any-return]
+    return await run_admitted(
+        SOLVER,
+        request,
+        tsp_cost(poi_ids),
+        ("shortest_path_no_return", tuple(poi_ids)),
+        lambda: driver.calculate_shortest_path_no_return(poi_ids),
+    )
 
 
 @router.get("/shortest-path-fixed-dest", response_model=TSPResponse)  # type: ignore[misc]
-def shortest_path_fixed_dest(
+async def shortest_path_fixed_dest(
     request: Request, poi_ids: list[str] = Query(...)
 ) -> dict[str, list[str] | float | list[list[float]]]:
     driver = request.app.state.driver
-    return driver.calculate_shortest_path_fixed_dest(poi_ids)  # type: ignore[no-any-return]
+    return await run_admitted(
+        SOLVER,
+        request,
+        tsp_cost(poi_ids),
+        ("shortest_path_fixed_dest", tuple(poi_ids)),
+        lambda: driver.calculate_shortest_path_fixed_dest(poi_ids),
+    )
@@ -0,0 +1,24 @@
+from json import dumps
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CHUNK_SIZE = 64 * 1024
+
+
+async def encode_ndjson(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode rows as newline delimited JSON, flushing roughly every CHUNK_SIZE bytes."""
+    buffer = bytearray()
+    async for row in rows:
+        buffer += dumps(row, default=str, ensure_ascii=False).encode()
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_response(rows: AsyncIterator[dict[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(encode_ndjson(rows), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,51 @@
+import secrets
+
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from telemetry.tracing import SERVER, STATUS_ERROR, start_span
+
+from .metrics import route_template
+
+
+class TracingMiddleware:
+    """Open a server span per request, continuing the caller's ``traceparent``.
+
+    The ``X-Request-ID`` sent by the frontend (or a new one) is returned with the response,
+    recorded on the span and bound to every log line written while handling the request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id") or secrets.token_hex(8)
+        status = 500
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"], "request.id": request_id}
+
+        with start_span(scope["method"], SERVER, headers.get("traceparent"), **attributes) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    response_headers = MutableHeaders(scope=message)
+                    response_headers["X-Request-ID"] = request_id
+                    response_headers["X-Trace-ID"] = span.trace_id
+                await send(message)
+
+            with logger.contextualize(request_id=request_id, trace_id=span.trace_id):
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    route = route_template(scope)
+                    span.name = f"{scope['method']} {route}"
+                    span.set(**{"http.route": route, "http.response.status_code": status})
+                    if status >= 500:
+                        span.status = STATUS_ERROR
@@ -0,0 +1,175 @@
+"""Warm Neo4j and the in-process caches before the API reports ready.
+
+After a restart or an import the first users would otherwise pay for a cold page
+cache and plan cache in Neo4j and empty response and leg caches here. The warmup
+runs the steps in ``WARMUP_STEPS`` once Neo4j is online, and ``/health/ready``
+only passes after it ran. It runs again whenever a new import version goes live;
+the API stays ready meanwhile, since warm replicas are better than none.
+
+- ``plans``: EXPLAIN every registered query
+- ``pages``: read the POI and city stores and their id indexes
+- ``datasets``: attach the shared city table of the import version, restored from its
+  snapshot on startup and rebuilt from Neo4j only for a new version
+- ``legs``: compute the ``WARMUP_CITY_LEGS`` and the most requested city legs
+- ``responses``: GET the ``WARMUP_PATHS`` through the app into the response cache
+"""
+
+import asyncio
+from os import getenv
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+from dataset_import import get_import_version
+from fastapi import FastAPI
+from loguru import logger
+from neo4j_driver.async_city import popular_legs
+from neo4j_driver.base import backoff_delays
+from neo4j_driver.shared_dataset import restore_snapshots
+from starlette.types import Message
+
+from .etag import SAVE_DIR
+
+
+def parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+WARMUP_STEPS = parse_list(getenv("WARMUP_STEPS", "plans,pages,datasets,legs,responses"))
+WARMUP_PATHS = parse_list(getenv("WARMUP_PATHS", "/city/all"))
+# "start:dest" city ids, e.g. WARMUP_CITY_LEGS="75056:69123,75056:13055".
+WARMUP_CITY_LEGS = [tuple(leg.split(":", 1)) for leg in parse_list(getenv("WARMUP_CITY_LEGS", "")) if ":" in leg]
+WARMUP_POPULAR_LEGS = int(getenv("WARMUP_POPULAR_LEGS", 50))
+WARMUP_POLL_INTERVAL = float(getenv("WARMUP_POLL_INTERVAL", 30))
+# The headers the frontend sends (requests' defaults), so the warmed entries match its cache keys.
+WARMUP_HEADERS = [(b"accept", b"*/*"), (b"accept-encoding", b"gzip, deflate")]
+
+
+async def warm_plans(app: FastAPI) -> None:
+    await app.state.driver.warmup_queries()
+
+
+async def warm_pages(app: FastAPI) -> None:
+    await app.state.driver.warmup_pages()
+
+
+async def warm_datasets(app: FastAPI) -> None:
+    if (version := get_import_version(SAVE_DIR)) is not None:
+        await app.state.driver.load_city_table(version)
+
+
+async def warm_legs(app: FastAPI) -> None:
+    await app.state.driver.warmup_city_legs([*WARMUP_CITY_LEGS, *popular_legs(WARMUP_POPULAR_LEGS)])
+
+
+async def warm_responses(app: FastAPI) -> None:
+    for target in WARMUP_PATHS:
+        status = await get(app, target)
+        if status != 200:
+            logger.warning(f"Warming up {target} returned {status}.")
+
+
+STEPS: dict[str, Callable[[FastAPI], Awaitable[None]]] = {
+    "plans": warm_plans,
+    "pages": warm_pages,
+    "datasets": warm_datasets,
+    "legs": warm_legs,
+    "responses": warm_responses,
+}
+
+
+async def get(app: FastAPI, target: str) -> int | None:
+    """GET ``target`` through the whole middleware stack and return the status code."""
+    path, _, query = target.partition("?")
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": WARMUP_HEADERS,
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    status = None
+    requested = False
+
+    async def receive() -> Message:
+        nonlocal requested
+        if requested:  # like a server, block until the request is over
+            await asyncio.Future()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+class Warmup:
+    def __init__(self, app: FastAPI, steps: list[str] = WARMUP_STEPS) -> None:
+        unknown = set(steps) - set(STEPS)
+        if unknown:
+            raise ValueError(f"Unknown warmup steps: {', '.join(sorted(unknown))}")
+        self.app = app
+        self.steps = steps
+        self.version: str | None = None
+        self.warmed = False
+        self.running = False
+        self.durations: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    async def run(self) -> None:
+        """Run every step; a failing step is logged and does not hold back readiness."""
+        self.running = True
+        self.version = get_import_version(SAVE_DIR)
+        logger.info(f"Warming up {', '.join(self.steps)} for import version {self.version}...")
+        try:
+            for step in self.steps:
+                started = perf_counter()
+                try:
+                    await STEPS[step](self.app)
+                    self.errors.pop(step, None)
+                except Exception as err:
+                    logger.warning(f"Warmup step {step} failed: {err}")
+                    self.errors[step] = str(err)
+                self.durations[step] = round(perf_counter() - started, 3)
+        finally:
+            self.running = False
+        self.warmed = True
+        logger.success(f"Warmed up in {sum(self.durations.values()):.1f}s.")
+
+    async def start(self) -> None:
+        """Restore snapshots, wait for Neo4j, warm up, then warm up again whenever the import version changes."""
+        if (version := get_import_version(SAVE_DIR)) is not None and (restored := restore_snapshots(version)):
+            logger.info(f"Restored {', '.join(restored)} of import version {version} from snapshots.")
+        driver = self.app.state.driver
+        delays = backoff_delays()
+        await driver.start()
+        while not driver.ready:
+            delay = next(delays)
+            logger.warning(f"Neo4j is not online, retrying in {delay:.0f}s before warming up.")
+            await asyncio.sleep(delay)
+            await driver.start()
+        await self.run()
+        while True:
+            await asyncio.sleep(WARMUP_POLL_INTERVAL)
+            # None while an import is replacing the data, the warmup waits for its version.
+            if (version := get_import_version(SAVE_DIR)) is not None and version != self.version:
+                await self.run()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "warmed": self.warmed,
+            "running": self.running,
+            "import_version": self.version,
+            "durations": self.durations,
+            "errors": self.errors,
+        }
@@ -1,3 +1,3 @@
-from .neo4j_driver import Neo4jDriver
+from .neo4j_driver import AsyncNeo4jDriver, Neo4jDriver
 
-__all__ = ["Neo4jDriver"]
+__all__ = ["AsyncNeo4jDriver", "Neo4jDriver"]
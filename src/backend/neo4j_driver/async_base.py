@@ -0,0 +1,242 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import partial
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from loguru import logger
+from neo4j import READ_ACCESS, AsyncGraphDatabase, AsyncManagedTransaction, AsyncSession, Query, unit_of_work
+from neo4j.exceptions import Neo4jError
+
+from telemetry.metrics import POOL_MAX_SIZE, QUERY_DURATION, QUERY_ERRORS, QUERY_ROWS, SESSIONS_ACTIVE
+from telemetry.tracing import CLIENT, new_span, start_span
+
+from .base import backoff_delays, get_connection_settings, get_driver_config
+from .cache import make_key
+from .columns import ColumnBuilder, ColumnDtypes, row_count
+from .queries import PAGE_WARMUP_QUERY, QUERIES, NamedQuery, resolve
+from .single_flight import SingleFlight
+from .slow_queries import SLOW_QUERIES
+
+# An AsyncSession must not run two transactions at once, so coroutines gathered
+# inside one session_scope take turns via the lock.
+_scoped_session: ContextVar[tuple[AsyncSession, asyncio.Lock] | None] = ContextVar("async_scoped_session", default=None)
+# Strong references to fire-and-forget tasks, the event loop only keeps weak ones.
+_background_tasks: set[asyncio.Task[None]] = set()
+# Identical queries issued while one is running share its records.
+QUERY_FLIGHTS = SingleFlight("query")
+
+
+class AsyncBase:
+    async def init_driver(self) -> None:
+        """Create the driver without connecting; ``start`` waits for the database in the background."""
+        logger.info("Initializing AsyncNeo4jDriver...")
+        uri, auth = get_connection_settings()
+        config = get_driver_config()
+        self.driver = AsyncGraphDatabase.driver(uri, auth=auth, **config)
+        self.ready = False
+        POOL_MAX_SIZE.labels("async").set(config["max_connection_pool_size"])
+        logger.info(f"Setup AsyncGraphDatabase driver with {config}.")
+
+    async def start(self) -> None:
+        """Wait until Neo4j is online and mark the driver ready."""
+        try:
+            await self.wait_for_neo4j()
+        except RuntimeError as err:
+            logger.error(err)
+            logger.info("Could not initialize AsyncNeo4jDriver.")
+            return
+        self.ready = True
+        logger.success("Intitalized AsyncNeo4jDriver.")
+
+    async def wait_for_neo4j(self, timeout: int = 600) -> None:
+        logger.info("Waiting until neo4j database is ONLINE...")
+        start = time.time()
+        delays = backoff_delays()
+
+        while True:
+            try:
+                async with self.driver.session(database="system") as session:
+                    result = await session.run(
+                        """
+                        SHOW DATABASE neo4j
+                        YIELD currentStatus
+                        WHERE currentStatus = 'online'
+                        RETURN 1
+                    """
+                    )
+                    if await result.single():
+                        logger.success("Neo4j database is ONLINE")
+                        return
+            except Exception:
+                pass
+
+            elapsed = time.time() - start
+            if elapsed > timeout:
+                raise RuntimeError("Neo4j database did not become online in time")
+
+            logger.debug("Time until termination {}s.", timeout - elapsed)
+            await asyncio.sleep(min(next(delays), timeout - elapsed))
+
+    async def execute_query(self, query: NamedQuery | str, **kwargs: Any) -> list[dict[Any, Any]] | None:
+        """Run ``query`` in a managed read transaction, retrying transient errors.
+
+        Concurrent calls with the same statement and parameters are coalesced into one
+        transaction; the returned records are shared and must not be mutated.
+        """
+        query = resolve(query)
+        return await QUERY_FLIGHTS.run(
+            make_key(query.text, kwargs), lambda: self.run_query(query, kwargs, self.read_records, len)
+        )
+
+    async def execute_query_columns(
+        self, query: NamedQuery | str, dtypes: ColumnDtypes, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Run ``query`` like ``execute_query``, but return one typed array per column in ``dtypes``.
+
+        Coalesced like ``execute_query``; the returned arrays are shared and must not be mutated.
+        """
+        query = resolve(query)
+        key = (make_key(query.text, kwargs), tuple((column, str(dtype)) for column, dtype in dtypes.items()))
+        return await QUERY_FLIGHTS.run(
+            key, lambda: self.run_query(query, kwargs, partial(self.read_columns, dtypes=dtypes), row_count)
+        )
+
+    async def run_query(
+        self,
+        query: NamedQuery,
+        kwargs: dict[str, Any],
+        transaction_function: Callable[[AsyncManagedTransaction, str, dict[str, Any]], Awaitable[Any]],
+        rows: Callable[[Any], int],
+    ) -> Any:
+        logger.debug("Executing query {}.", query.name)
+        logger.debug("Query: {}\nKwargs:{}.", query.text, kwargs)
+        work = unit_of_work(metadata={"query_name": query.name}, timeout=query.timeout)(transaction_function)
+        started = perf_counter()
+        with start_span(
+            f"neo4j {query.name}", CLIENT, **{"db.system": "neo4j", "db.operation.name": query.name}
+        ) as span:
+            try:
+                if (scoped := _scoped_session.get()) is not None:
+                    session, lock = scoped
+                    async with lock:
+                        records = await session.execute_read(work, query.text, kwargs)
+                else:
+                    async with self.driver.session() as session:
+                        with SESSIONS_ACTIVE.labels("async").track_inprogress():
+                            records = await session.execute_read(work, query.text, kwargs)
+            except Exception:
+                QUERY_ERRORS.labels(query.name).inc()
+                raise
+            finally:
+                elapsed = perf_counter() - started
+                QUERY_DURATION.labels(query.name).observe(elapsed)
+            span.set(**{"db.response.returned_rows": rows(records)})
+        QUERY_ROWS.labels(query.name).inc(rows(records))
+        if SLOW_QUERIES.is_slow(elapsed * 1000):
+            self.handle_slow_query(query, kwargs, elapsed * 1000)
+        return records
+
+    async def execute_query_iter(self, query: NamedQuery | str, **kwargs: Any) -> AsyncIterator[dict[Any, Any]]:
+        """Yield records one by one while Bolt pulls them in fetch_size batches."""
+        query = resolve(query)
+        logger.debug("Streaming query {}.", query.name)
+        logger.debug("Query: {}\nKwargs:{}.", query.text, kwargs)
+        rows = 0
+        # Not made the current span: the context would leak to the consumer between yields.
+        span = new_span(f"neo4j {query.name}", CLIENT, **{"db.system": "neo4j", "db.operation.name": query.name})
+        try:
+            async with self.driver.session(default_access_mode=READ_ACCESS) as session:
+                with SESSIONS_ACTIVE.labels("async").track_inprogress(), QUERY_DURATION.labels(query.name).time():
+                    result = await session.run(
+                        Query(query.text, metadata={"query_name": query.name}, timeout=query.timeout), **kwargs
+                    )
+                    async for record in result:
+                        rows += 1
+                        yield record.data()
+        except BaseException as err:
+            span.record_error(err)
+            raise
+        finally:
+            span.set(**{"db.response.returned_rows": rows})
+            span.finish()
+        QUERY_ROWS.labels(query.name).inc(rows)
+
+    async def warmup_queries(self) -> None:
+        """EXPLAIN every registered query so its plan is cached before the first request."""
+        logger.info(f"Warming up plan cache for {len(QUERIES)} queries...")
+        async with self.driver.session() as session:
+            for query in QUERIES.values():
+                try:
+                    result = await session.run(f"EXPLAIN {query.text}", **query.params)
+                    await result.consume()
+                except Neo4jError as err:
+                    logger.warning(f"Could not warm up query {query.name}: {err}")
+        logger.success("Warmed up plan cache.")
+
+    async def warmup_pages(self) -> None:
+        """Read the POI and city stores and their id indexes once, so they are in Neo4j's page cache."""
+        result = await self.execute_query(PAGE_WARMUP_QUERY)
+        logger.success("Warmed up page cache: {}", result[0] if result else {})
+
+    def handle_slow_query(self, query: NamedQuery, kwargs: dict[str, Any], duration_ms: float) -> None:
+        if SLOW_QUERIES.should_profile(query.name):
+            task = asyncio.create_task(self.profile_slow_query(query, kwargs, duration_ms))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        else:
+            SLOW_QUERIES.record(query.name, query.text, duration_ms, kwargs)
+
+    async def profile_slow_query(self, query: NamedQuery, kwargs: dict[str, Any], duration_ms: float) -> None:
+        """Re-run ``query`` with PROFILE and add its plan to the slow query log."""
+        try:
+            async with self.driver.session(default_access_mode=READ_ACCESS) as session:
+                result = await session.run(f"PROFILE {query.text}", **kwargs)
+                compute_millis = [
+                    record["computeMillis"] async for record in result if "computeMillis" in record.keys()
+                ]
+                profile = (await result.consume()).profile
+        except Neo4jError as err:
+            logger.warning(f"Could not profile slow query {query.name}: {err}")
+            SLOW_QUERIES.record(query.name, query.text, duration_ms, kwargs)
+            return
+        SLOW_QUERIES.record(
+            query.name, query.text, duration_ms, kwargs, profile, sum(compute_millis) if compute_millis else None
+        )
+
+    @staticmethod
+    async def read_records(tx: AsyncManagedTransaction, query: str, kwargs: dict[str, Any]) -> list[dict[Any, Any]]:
+        result = await tx.run(query, **kwargs)
+        return await result.data()
+
+    @staticmethod
+    async def read_columns(
+        tx: AsyncManagedTransaction, query: str, kwargs: dict[str, Any], dtypes: ColumnDtypes
+    ) -> dict[str, Any]:
+        result = await tx.run(query, **kwargs)
+        builder = ColumnBuilder(dtypes, result.keys())
+        async for record in result:
+            builder.append(record)
+        return builder.finish()
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Reuse one session (and pooled connection) for every execute_query issued inside the block."""
+        if (scoped := _scoped_session.get()) is not None:
+            yield scoped[0]
+            return
+        async with self.driver.session() as session:
+            with SESSIONS_ACTIVE.labels("async").track_inprogress():
+                token = _scoped_session.set((session, asyncio.Lock()))
+                try:
+                    yield session
+                finally:
+                    _scoped_session.reset(token)
+
+    async def close(self) -> None:
+        logger.info("Closing neo4j ...")
+        if self.driver:
+            await self.driver.close()
+            logger.success("Closed neo4j driver.")
@@ -0,0 +1,199 @@
+import asyncio
+from collections import Counter
+from os import environ
+from typing import Any, AsyncIterator, Dict, Iterable, List, Literal
+
+import numpy as np
+from loguru import logger
+
+from telemetry.tracing import start_span
+
+from .batch_loader import get_loader, loader_scope
+from .cache import TTLCache
+from .city import ROUTE_CITY_FIELDS, ROUTE_POI_FIELDS, City
+from .city_poi import CityPois, group_by_city
+from .poi import PoisWithoutCity, raise_for_missing
+from .queries import (
+    CITIES_BY_ID_QUERY,
+    CITIES_QUERY,
+    CITY_TABLE_QUERY,
+    NEAREST_CITIES_QUERY,
+    ROUTE_BETWEEN_CITIES_QUERY,
+    ROUTE_QUERY,
+    TOTAL_DISTANCE_QUERY,
+    projected,
+    projection_key,
+    roundtrip_query,
+)
+from .shared_dataset import shared_dataset
+
+# Road distances between two cities ("legs") only change with an import, and the TSP
+# matrix already treats them as symmetric, so both directions share one entry.
+LEG_CACHE = TTLCache(
+    "city_leg",
+    ttl=float(environ.get("CITY_LEG_CACHE_TTL", 3600)),
+    max_entries=int(environ.get("CITY_LEG_CACHE_SIZE", 10000)),
+)
+LEG_REQUESTS_MAX = 10000
+# How often each leg was requested since startup, to re-warm the popular ones after an import.
+LEG_REQUESTS: Counter[tuple[str, str]] = Counter()
+
+
+# City ids and coordinates, mapped by every worker from the files one of them published.
+CITY_TABLE = shared_dataset("city_table")
+CITY_TABLE_DTYPES = {"cityId": str, "latitude": np.float64, "longitude": np.float64}
+# Radius Neo4j uses for point.distance on WGS-84 points.
+EARTH_RADIUS_KM = 6378.14
+
+
+def nearest_city(table: dict[str, np.ndarray], lat: float, lon: float) -> tuple[int, float]:
+    """Index and haversine distance in km of the city in ``table`` closest to ``lat`` / ``lon``."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(table["latitude"]), np.radians(table["longitude"])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    index = int(np.argmin(a))
+    return index, float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a[index])))
+
+
+def leg_key(start: str, dest: str) -> tuple[str, str]:
+    return (start, dest) if start <= dest else (dest, start)
+
+
+def count_leg(leg: tuple[str, str]) -> None:
+    LEG_REQUESTS[leg] += 1
+    if len(LEG_REQUESTS) > LEG_REQUESTS_MAX:
+        kept = LEG_REQUESTS.most_common(LEG_REQUESTS_MAX // 2)
+        LEG_REQUESTS.clear()
+        LEG_REQUESTS.update(dict(kept))
+
+
+def popular_legs(limit: int) -> list[tuple[str, str]]:
+    return [leg for leg, _ in LEG_REQUESTS.most_common(limit)]
+
+
+class AsyncCity:
+    get_city_route = City.get_city_route
+
+    async def get_total_distance_between_cities(self, start: str, dest: str) -> float:
+        leg = leg_key(start, dest)
+        count_leg(leg)
+        if (distance := LEG_CACHE.get(leg)) is None:
+            distance = await self.query_total_distance(*leg)
+            LEG_CACHE.set(leg, distance)
+        return distance
+
+    async def query_total_distance(self, start: str, dest: str) -> float:
+        logger.info(f"Calculating distance between {start} and {dest}.")
+        result = await self.execute_query(TOTAL_DISTANCE_QUERY, start=start, dest=dest)  # type: ignore[attr-defined]
+        logger.debug("Result: {}", result)
+        logger.info("Calculated distance.")
+        return result[0]["distance"] if result else np.inf
+
+    async def warmup_city_legs(self, legs: Iterable[tuple[str, str]]) -> None:
+        """Drop the cached legs of the previous import and compute ``legs`` again."""
+        LEG_CACHE.clear()
+        legs = list(dict.fromkeys(leg_key(start, dest) for start, dest in legs))
+        distances = await asyncio.gather(*(self.query_total_distance(*leg) for leg in legs))
+        for leg, distance in zip(legs, distances):
+            LEG_CACHE.set(leg, distance)
+        logger.success("Warmed up {} city legs.", len(legs))
+
+    async def get_poi_city(self, poi: dict[str, Any], city: dict[str, Any]) -> dict[str, Any] | None:
+        """``city`` of the POI, or the nearest one if its city property does not match a City node."""
+        if city:
+            return city
+        nearest = await self.get_nearest_city_by_coordinates(poi["latitude"], poi["longitude"])
+        return nearest["city"] if nearest else None
+
+    async def get_city_pois(self, poi_ids: list[str]) -> list[CityPois]:
+        logger.info(f"Getting cities for poiIds {poi_ids}")
+        with start_span("tsp.city_pois", pois=len(poi_ids)), loader_scope():
+            async with self.session_scope():  # type: ignore[attr-defined]
+                pois = await self.get_pois(poi_ids, ROUTE_POI_FIELDS)  # type: ignore[attr-defined]
+                pois = raise_for_missing(poi_ids, pois)
+                city_ids = list(dict.fromkeys(poi["city"] for poi in pois))
+                found = await asyncio.gather(*(self.get_city(city_id, ROUTE_CITY_FIELDS) for city_id in city_ids))
+                cities = dict(zip(city_ids, found))
+                poi_cities = await asyncio.gather(*(self.get_poi_city(poi, cities[poi["city"]]) for poi in pois))
+        if without_city := [poi["poiId"] for poi, city in zip(pois, poi_cities) if city is None]:
+            raise PoisWithoutCity(without_city)
+        city_pois = group_by_city(pois, poi_cities)  # type: ignore[arg-type]
+        logger.debug("Cities: {}", city_pois)
+        return city_pois
+
+    async def get_route(self, start: str, dest: str) -> list[dict[str, float]]:
+        result = await self.execute_query(ROUTE_QUERY, start=start, dest=dest)  # type: ignore[attr-defined]
+        logger.debug("(Start/Dest) = Result: ({}/{}) = {}", start, dest, result)
+        return result[0]["coords"] if result else [{}]
+
+    async def get_city(self, city_id: str, fields: list[str] | None = None) -> dict[str, Any]:
+        """The city ``city_id``, loaded in one batch with the other cities requested in the same tick."""
+        logger.info(f"Get city {city_id} from database.")
+        loader = get_loader("city", lambda city_ids: self.get_cities_by_id(city_ids, fields), projection_key(fields))
+        return await loader.load(city_id) or {}
+
+    async def get_cities_by_id(
+        self, city_ids: list[str], fields: list[str] | None = None
+    ) -> list[dict[str, Any] | None]:
+        """Cities in the order of ``city_ids``, ``None`` where an id is unknown."""
+        records = await self.execute_query(  # type: ignore[attr-defined]
+            projected(CITIES_BY_ID_QUERY, fields), city_ids=city_ids
+        )
+        found = {record["c"]["cityId"]: record["c"] for record in records}
+        return [found.get(city_id) for city_id in city_ids]
+
+    async def get_cities(self) -> dict[str, Any]:
+        logger.info("Get all cities from database.")
+        cities = await self.execute_query(CITIES_QUERY)  # type: ignore[attr-defined]
+
+        return {"cities": [c for c in cities] if cities else []}
+
+    async def iter_cities(self) -> AsyncIterator[dict[str, Any]]:
+        logger.info("Stream all cities from database.")
+        async for city in self.execute_query_iter(CITIES_QUERY):  # type: ignore[attr-defined]
+            yield city
+
+    async def get_nearest_city_by_coordinates(self, lat: float, lon: float) -> dict[str, Any] | None:
+        """Nearest city and its distance, None if there is no city to compare with."""
+        logger.info(f"Get nearest city by coordinates (lat/lon):({lat}/{lon}).")
+        if (table := CITY_TABLE.current) is not None and len(table.arrays["cityId"]):
+            index, distance = nearest_city(table.arrays, lat, lon)
+            if city := await self.get_city(str(table.arrays["cityId"][index])):
+                return {"city": city, "distance_km": round(distance, 2)}
+        return await get_loader("city.nearest", self.get_nearest_cities).load((lat, lon))
+
+    async def get_nearest_cities(self, points: list[tuple[float, float]]) -> list[dict[str, Any] | None]:
+        """Nearest city and its distance for every (lat, lon) point, in the order of ``points``, or None."""
+        records = await self.execute_query(  # type: ignore[attr-defined]
+            NEAREST_CITIES_QUERY, points=[{"latitude": lat, "longitude": lon} for lat, lon in points]
+        )
+        found = {record["i"]: {"city": record["city"], "distance_km": record["distance_km"]} for record in records}
+        return [found.get(i) for i in range(len(points))]
+
+    async def load_city_table(self, version: str) -> None:
+        """Attach the shared city table of import ``version``, building it if no worker has yet."""
+
+        async def build() -> dict[str, np.ndarray]:
+            return await self.execute_query_columns(CITY_TABLE_QUERY, CITY_TABLE_DTYPES)  # type: ignore[attr-defined]
+
+        await CITY_TABLE.publish(version, build)
+
+    async def get_route_between_cities(self, start_city: str, end_city: str) -> List[Dict[str, Any]]:
+        logger.info(f"Get route between cities {start_city} and {end_city}.")
+        result = await self.execute_query(  # type: ignore[attr-defined]
+            ROUTE_BETWEEN_CITIES_QUERY, start_city=start_city, end_city=end_city
+        )
+        return result
+
+    async def get_roundtrip(
+        self, city_id: str, distance: float, distance_tol: float, max_hops: int, sort_distance: Literal["ASC", "DESC"]
+    ) -> Dict[str, Any]:
+        """quite limited round trip search"""
+        result = await self.execute_query(  # type: ignore[attr-defined]
+            roundtrip_query(max_hops),
+            city_id=city_id,
+            min_distance=distance - distance_tol,
+            max_distance=distance + distance_tol,
+            descending=sort_distance == "DESC",
+        )
+        return result[0]
@@ -0,0 +1,174 @@
+from typing import Any, AsyncIterator, List
+
+from loguru import logger
+
+from .batch_loader import get_loader
+from .pagination import COUNT_CACHE, FIRST_PAGE, count_key, make_page, page_kwargs
+from .poi import POI, city_poi_rows, nearby_poi_rows, order_pois
+from .queries import (
+    FILTERED_POI_ROWS_QUERY,
+    FILTERED_POI_ROWS_RADIUS_QUERY,
+    FILTERED_POIS_COUNT_QUERY,
+    FILTERED_POIS_COUNT_RADIUS_QUERY,
+    FILTERED_POIS_PAGE_QUERY,
+    FILTERED_POIS_PAGE_RADIUS_QUERY,
+    FILTERED_POIS_QUERY,
+    FILTERED_POIS_RADIUS_QUERY,
+    NEARBY_POINTS_QUERY,
+    POI_TYPES_FOR_CITY_QUERY,
+    POIS_BY_ID_QUERY,
+    POIS_FOR_CITY_COUNT_QUERY,
+    POIS_FOR_CITY_PAGE_QUERY,
+    POIS_FOR_CITY_QUERY,
+    POIS_NEAR_CITY_COUNT_QUERY,
+    POIS_NEAR_CITY_PAGE_QUERY,
+    POIS_NEAR_CITY_QUERY,
+    TYPES_QUERY,
+    NamedQuery,
+    projected,
+    projection_key,
+)
+
+
+class AsyncPOI:
+    filter_kwargs = POI.filter_kwargs
+    normalize_param = POI.normalize_param
+
+    async def get_poi(self, poi_id: str, fields: list[str] | None = None) -> dict[Any, Any]:
+        """The POI ``poi_id``, loaded in one batch with the other POIs requested in the same tick."""
+        logger.info(f"Get POI {poi_id}")
+        loader = get_loader("poi", lambda poi_ids: self.get_pois(poi_ids, fields), projection_key(fields))
+        return await loader.load(poi_id) or {}
+
+    async def get_pois(self, poi_ids: list[str], fields: list[str] | None = None) -> list[dict[Any, Any] | None]:
+        """POIs in the order of ``poi_ids``, ``None`` where an id is unknown."""
+        logger.info(f"Get {len(poi_ids)} POIs")
+        records = await self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_BY_ID_QUERY, fields), poi_ids=list(dict.fromkeys(poi_ids))
+        )
+        return order_pois(poi_ids, records)
+
+    async def get_types(self) -> dict[str, Any]:
+        logger.info("Get all possible types.")
+        types = await self.execute_query(TYPES_QUERY)  # type: ignore[attr-defined]
+
+        return {"types": [t["typeId"] for t in types] if types else []}
+
+    async def get_poi_for_city(
+        self, city_id: str, categories: List | None = None, fields: list[str] | None = None
+    ) -> List[dict[str, Any]]:
+        logger.info(f"Get all pois in city {city_id}.")
+        pois = await self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_FOR_CITY_QUERY, fields), city_id=city_id, categories=categories
+        )
+        return city_poi_rows(pois) if pois else [{}]
+
+    async def get_poi_near_city(
+        self, city_id: str, categories: List | None = None, fields: list[str] | None = None
+    ) -> List[dict[str, Any]]:
+        logger.info(f"Get all pois near city {city_id}.")
+        pois = await self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_NEAR_CITY_QUERY, fields), city_id=city_id, categories=categories
+        )
+        return nearby_poi_rows(pois) if pois else [{}]
+
+    async def get_poi_for_city_page(
+        self,
+        city_id: str,
+        categories: List | None,
+        limit: int,
+        cursor: str | None = None,
+        with_total: bool = False,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        logger.info(f"Get page of pois in city {city_id}.")
+        kwargs = {"city_id": city_id, "categories": categories}
+        pois = await self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_FOR_CITY_PAGE_QUERY, fields), **kwargs, **page_kwargs(cursor, limit)
+        )
+        return make_page(
+            city_poi_rows(pois),
+            limit,
+            await self.count_pois(POIS_FOR_CITY_COUNT_QUERY, **kwargs) if with_total else None,
+        )
+
+    async def get_poi_near_city_page(
+        self,
+        city_id: str,
+        categories: List | None,
+        limit: int,
+        cursor: str | None = None,
+        with_total: bool = False,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        logger.info(f"Get page of pois near city {city_id}.")
+        kwargs = {"city_id": city_id, "categories": categories}
+        pois = await self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_NEAR_CITY_PAGE_QUERY, fields), **kwargs, **page_kwargs(cursor, limit)
+        )
+        return make_page(
+            nearby_poi_rows(pois),
+            limit,
+            await self.count_pois(POIS_NEAR_CITY_COUNT_QUERY, **kwargs) if with_total else None,
+        )
+
+    async def get_poi_types_for_city(self, city_id: str, categories: List | None = None) -> List[str]:
+        logger.info(f"Get POI types for city {city_id}.")
+        result = await self.execute_query(POI_TYPES_FOR_CITY_QUERY, city_id=city_id)  # type: ignore[attr-defined]
+        return result[0]["types"]
+
+    async def get_filtered_pois(
+        self, locations: list[str] | None, types: list[str] | None, radius: int
+    ) -> dict[str, Any]:
+        logger.info("Get POIs for ui.")
+        kwargs = self.filter_kwargs(locations, types, radius)
+        query = FILTERED_POIS_RADIUS_QUERY if radius > 0 else FILTERED_POIS_QUERY
+
+        result = await self.execute_query(query, **kwargs)  # type: ignore[attr-defined]
+        return result[0] if result else []  # type: ignore
+
+    async def get_filtered_pois_page(
+        self,
+        locations: list[str] | None,
+        types: list[str] | None,
+        radius: int,
+        limit: int,
+        cursor: str | None = None,
+        with_total: bool = False,
+    ) -> dict[str, Any]:
+        logger.info("Get page of POIs for ui.")
+        kwargs = self.filter_kwargs(locations, types, radius)
+        if radius > 0:
+            query, count_query = FILTERED_POIS_PAGE_RADIUS_QUERY, FILTERED_POIS_COUNT_RADIUS_QUERY
+        else:
+            query, count_query = FILTERED_POIS_PAGE_QUERY, FILTERED_POIS_COUNT_QUERY
+
+        pois = await self.execute_query(query, **kwargs, **page_kwargs(cursor, limit))  # type: ignore[attr-defined]
+        return make_page(
+            [p["poi"] for p in pois], limit, await self.count_pois(count_query, **kwargs) if with_total else None
+        )
+
+    async def count_pois(self, query: NamedQuery, **kwargs: Any) -> int:
+        key = count_key(query.name, kwargs)
+        if key is None or (total := COUNT_CACHE.get(key)) is None:
+            result = await self.execute_query(query, **kwargs, **FIRST_PAGE)  # type: ignore[attr-defined]
+            total = result[0]["total"] if result else 0
+            if key is not None:
+                COUNT_CACHE.set(key, total)
+        return total
+
+    async def iter_filtered_pois(
+        self, locations: list[str] | None, types: list[str] | None, radius: int
+    ) -> AsyncIterator[dict[str, Any]]:
+        logger.info("Stream POIs for ui.")
+        kwargs = self.filter_kwargs(locations, types, radius)
+        query = FILTERED_POI_ROWS_RADIUS_QUERY if radius > 0 else FILTERED_POI_ROWS_QUERY
+        async for record in self.execute_query_iter(query, **kwargs):  # type: ignore[attr-defined]
+            yield record["poi"]
+
+    async def get_nearby_points(self, poi_id: str, radius: float) -> dict[str, list[dict[Any, Any]]]:
+        logger.info(f"Get POI around POI {poi_id} in a radius of {radius}.")
+        records = await self.execute_query(  # type: ignore[attr-defined]
+            NEARBY_POINTS_QUERY, poi_id=poi_id, radius=radius
+        )
+        return {"nearby": records if records else []}
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+from telemetry.metrics import TSP_PHASE_DURATION
+from telemetry.tracing import start_span
+
+from .city_poi import CityPois
+from .single_flight import SingleFlight
+from .solver import solve_tsp
+from .tsp import TSP
+
+# Identical itineraries requested at the same time share one matrix build and solver run.
+TSP_FLIGHTS = SingleFlight("tsp")
+
+
+class AsyncTSP:
+    get_poi_order = TSP.get_poi_order
+
+    async def create_weight_matrix(self, cities: list[CityPois]) -> np.ndarray[Any, Any]:
+        logger.info("Creating weight matrix...")
+        logger.debug("Cities: {}", cities)
+        with TSP_PHASE_DURATION.labels("matrix").time(), start_span("tsp.matrix", cities=len(cities)) as span:
+            n = len(cities)
+            weights = np.full((n, n), np.inf)
+            pairs = [
+                (i, j)
+                for i in range(0, n)
+                for j in range(i + 1, n)
+                if cities[i].city["cityId"] != cities[j].city["cityId"]
+            ]
+            distances = await asyncio.gather(
+                *(
+                    self.get_total_distance_between_cities(  # type: ignore[attr-defined]
+                        start=cities[i].city["cityId"], dest=cities[j].city["cityId"]
+                    )
+                    for i, j in pairs
+                )
+            )
+            for (i, j), distance in zip(pairs, distances):
+                weights[i][j] = distance
+                weights[j][i] = distance
+            span.set(queries=len(pairs))
+        logger.info("Created weight matrix.")
+        logger.debug("Matrix: {}.", weights)
+        return weights
+
+    async def calculate_tsp(
+        self, weights: np.ndarray[Any, Any], cities: list[CityPois]
+    ) -> dict[str, list[str] | float | list[list[float]]]:
+        logger.info("Calculated tsp...")
+        with TSP_PHASE_DURATION.labels("solve").time(), start_span("tsp.solve", cities=len(weights)):
+            permutation, distance = await solve_tsp(weights)
+        logger.debug("Permuation: {}, distance: {}", permutation, distance)
+        return {
+            "poi_order": self.get_poi_order(cities, permutation),
+            "total_distance": distance,
+            "route": self.get_city_route(cities),  # type: ignore[attr-defined]
+        }
+
+    async def calculate_shortest_round_tour(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
+        return await TSP_FLIGHTS.run(("round_tour", tuple(poi_ids)), lambda: self.solve_round_tour(poi_ids))
+
+    async def solve_round_tour(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
+        logger.info("Calculating round tour...")
+        cities = await self.get_city_pois(poi_ids)  # type: ignore[attr-defined]
+        weights = await self.create_weight_matrix(cities)
+        return await self.calculate_tsp(weights, cities)  # type: ignore[return-value]
+
+    async def calculate_shortest_path_no_return(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
+        return await TSP_FLIGHTS.run(("no_return", tuple(poi_ids)), lambda: self.solve_path_no_return(poi_ids))
+
+    async def solve_path_no_return(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
+        logger.info("Calculating round tour with no return and fixed start...")
+        cities = await self.get_city_pois(poi_ids)  # type: ignore[attr-defined]
+        weights = await self.create_weight_matrix(cities)
+        weights[:, 0] = 0
+        return await self.calculate_tsp(weights, cities)  # type: ignore[return-value]
+
+    async def calculate_shortest_path_fixed_dest(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
+        logger.info("Calculating round tour with no return and fixed destination...")
+        logger.debug("dest: {}", poi_ids[-1])
+        # The no-return result may be shared with concurrent callers, so neither it nor poi_ids is mutated.
+        tsp_result = await self.calculate_shortest_path_no_return([poi_ids[-1], *poi_ids[:-1]])
+        return tsp_result | {
+            "poi_order": list(reversed(tsp_result["poi_order"])),  # type: ignore[arg-type]
+            "route": list(reversed(tsp_result["route"])),  # type: ignore[arg-type, typeddict-item]
+        }
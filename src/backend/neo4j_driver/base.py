@@ -1,21 +1,67 @@
 import sys
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 from os import environ
 from signal import SIGINT, SIGTERM, signal
-from typing import Any
+from threading import Thread
+from time import perf_counter
+from typing import Any, Callable, Iterator
 
 from loguru import logger
-from neo4j import GraphDatabase
+from neo4j import READ_ACCESS, GraphDatabase, ManagedTransaction, Query, Session, unit_of_work
+from neo4j.exceptions import Neo4jError
+
+from telemetry.metrics import POOL_MAX_SIZE, QUERY_DURATION, QUERY_ERRORS, QUERY_ROWS, SESSIONS_ACTIVE
+from telemetry.tracing import CLIENT, start_span
+
+from .columns import ColumnBuilder, ColumnDtypes, row_count
+from .queries import NamedQuery, resolve
+from .slow_queries import SLOW_QUERIES
+
+_scoped_session: ContextVar[Session | None] = ContextVar("scoped_session", default=None)
+
+NEO4J_READY_INITIAL_DELAY = float(environ.get("NEO4J_READY_INITIAL_DELAY", 0.5))
+NEO4J_READY_MAX_DELAY = float(environ.get("NEO4J_READY_MAX_DELAY", 10))
+
+
+def get_connection_settings() -> tuple[str, tuple[str, str]]:
+    uri = environ.get("NEO4J_URI", "bolt://neo4j:7687")
+    username = environ.get("NEO4J_USER", "neo4j")
+    passphrase = environ.get("NEO4J_PASSPHRASE", "")
+    return uri, (username, passphrase)
+
+
+def get_driver_config() -> dict[str, Any]:
+    """Connection pool and fetch settings shared by the sync and async driver."""
+    return {
+        "max_connection_pool_size": int(environ.get("NEO4J_MAX_CONNECTION_POOL_SIZE", 100)),
+        "connection_acquisition_timeout": float(environ.get("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", 60)),
+        "max_connection_lifetime": float(environ.get("NEO4J_MAX_CONNECTION_LIFETIME", 3600)),
+        "max_transaction_retry_time": float(environ.get("NEO4J_MAX_TRANSACTION_RETRY_TIME", 30)),
+        "fetch_size": int(environ.get("NEO4J_FETCH_SIZE", 1000)),
+    }
+
+
+def backoff_delays(
+    initial: float = NEO4J_READY_INITIAL_DELAY, maximum: float = NEO4J_READY_MAX_DELAY
+) -> Iterator[float]:
+    """Seconds to wait between readiness checks: doubling from ``initial`` up to ``maximum``."""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * 2, maximum)
 
 
 class Base:
     def init_driver(self) -> None:
         logger.info("Initializing Neo4jDriver...")
-        uri = environ.get("NEO4J_URI", "bolt://neo4j:7687")
-        username = environ.get("NEO4J_USER", "neo4j")
-        passphrase = environ.get("NEO4J_PASSPHRASE", "")
-        self.driver = GraphDatabase.driver(uri, auth=(username, passphrase))
-        logger.info("Setup GraphDatabase driver.")
+        uri, auth = get_connection_settings()
+        config = get_driver_config()
+        self.driver = GraphDatabase.driver(uri, auth=auth, **config)
+        POOL_MAX_SIZE.labels("sync").set(config["max_connection_pool_size"])
+        logger.info(f"Setup GraphDatabase driver with {config}.")
 
         signal(SIGINT, self.handle_exit_signal)
         signal(SIGTERM, self.handle_exit_signal)
@@ -31,6 +77,7 @@ class Base:
     def wait_for_neo4j(self, timeout=600):
         logger.info("Waiting until neo4j database is ONLINE...")
         start = time.time()
+        delays = backoff_delays()
 
         while True:
             try:
@@ -49,18 +96,112 @@ class Base:
             except Exception:
                 pass
 
-            if time.time() - start > timeout:
+            elapsed = time.time() - start
+            if elapsed > timeout:
                 raise RuntimeError("Neo4j database did not become online in time")
 
-            logger.debug(f"Time until termination {timeout-(time.time() - start)}s.")
-            time.sleep(10)
+            logger.debug("Time until termination {}s.", timeout - elapsed)
+            time.sleep(min(next(delays), timeout - elapsed))
+
+    def execute_query(self, query: NamedQuery | str, **kwargs: Any) -> list[dict[Any, Any]] | None:
+        """Run ``query`` in a managed read transaction, retrying transient errors."""
+        return self.read(resolve(query), kwargs, self.read_records, len)
 
-    def execute_query(self, query: str, **kwargs: Any) -> list[dict[Any, Any]] | None:
-        logger.info("Executing query.")
-        logger.debug(f"Query: {query}\nKwargs:{kwargs}.")
-        with self.driver.session() as session:
-            records = session.run(query, **kwargs)
-            return [record.data() for record in records]
+    def execute_query_columns(self, query: NamedQuery | str, dtypes: ColumnDtypes, **kwargs: Any) -> dict[str, Any]:
+        """Run ``query`` like ``execute_query``, but return one typed array per column in ``dtypes``."""
+        return self.read(resolve(query), kwargs, partial(self.read_columns, dtypes=dtypes), row_count)
+
+    def read(
+        self,
+        query: NamedQuery,
+        kwargs: dict[str, Any],
+        transaction_function: Callable[[ManagedTransaction, str, dict[str, Any]], Any],
+        rows: Callable[[Any], int],
+    ) -> Any:
+        logger.debug("Executing query {}.", query.name)
+        logger.debug("Query: {}\nKwargs:{}.", query.text, kwargs)
+        work = unit_of_work(metadata={"query_name": query.name}, timeout=query.timeout)(transaction_function)
+        started = perf_counter()
+        with start_span(
+            f"neo4j {query.name}", CLIENT, **{"db.system": "neo4j", "db.operation.name": query.name}
+        ) as span:
+            try:
+                if (session := _scoped_session.get()) is not None:
+                    result = session.execute_read(work, query.text, kwargs)
+                else:
+                    with self.driver.session() as session, SESSIONS_ACTIVE.labels("sync").track_inprogress():
+                        result = session.execute_read(work, query.text, kwargs)
+            except Exception:
+                QUERY_ERRORS.labels(query.name).inc()
+                raise
+            finally:
+                elapsed = perf_counter() - started
+                QUERY_DURATION.labels(query.name).observe(elapsed)
+            span.set(**{"db.response.returned_rows": rows(result)})
+        QUERY_ROWS.labels(query.name).inc(rows(result))
+        if SLOW_QUERIES.is_slow(elapsed * 1000):
+            self.handle_slow_query(query, kwargs, elapsed * 1000)
+        return result
+
+    def execute_query_iter(self, query: NamedQuery | str, **kwargs: Any) -> Iterator[dict[Any, Any]]:
+        """Yield records one by one while Bolt pulls them in fetch_size batches."""
+        query = resolve(query)
+        logger.debug("Streaming query {}.", query.name)
+        logger.debug("Query: {}\nKwargs:{}.", query.text, kwargs)
+        rows = 0
+        with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            with SESSIONS_ACTIVE.labels("sync").track_inprogress(), QUERY_DURATION.labels(query.name).time():
+                for record in session.run(
+                    Query(query.text, metadata={"query_name": query.name}, timeout=query.timeout), **kwargs
+                ):
+                    rows += 1
+                    yield record.data()
+        QUERY_ROWS.labels(query.name).inc(rows)
+
+    def handle_slow_query(self, query: NamedQuery, kwargs: dict[str, Any], duration_ms: float) -> None:
+        if SLOW_QUERIES.should_profile(query.name):
+            Thread(target=self.profile_slow_query, args=(query, kwargs, duration_ms), daemon=True).start()
+        else:
+            SLOW_QUERIES.record(query.name, query.text, duration_ms, kwargs)
+
+    def profile_slow_query(self, query: NamedQuery, kwargs: dict[str, Any], duration_ms: float) -> None:
+        """Re-run ``query`` with PROFILE and add its plan to the slow query log."""
+        try:
+            with self.driver.session(default_access_mode=READ_ACCESS) as session:
+                result = session.run(f"PROFILE {query.text}", **kwargs)
+                compute_millis = [record["computeMillis"] for record in result if "computeMillis" in record.keys()]
+                profile = result.consume().profile
+        except Neo4jError as err:
+            logger.warning(f"Could not profile slow query {query.name}: {err}")
+            SLOW_QUERIES.record(query.name, query.text, duration_ms, kwargs)
+            return
+        SLOW_QUERIES.record(
+            query.name, query.text, duration_ms, kwargs, profile, sum(compute_millis) if compute_millis else None
+        )
+
+    @staticmethod
+    def read_records(tx: ManagedTransaction, query: str, kwargs: dict[str, Any]) -> list[dict[Any, Any]]:
+        return tx.run(query, **kwargs).data()
+
+    @staticmethod
+    def read_columns(
+        tx: ManagedTransaction, query: str, kwargs: dict[str, Any], dtypes: ColumnDtypes
+    ) -> dict[str, Any]:
+        result = tx.run(query, **kwargs)
+        return ColumnBuilder(dtypes, result.keys()).extend(result).finish()
+
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """Reuse one session for every execute_query issued inside the block."""
+        if (session := _scoped_session.get()) is not None:
+            yield session
+            return
+        with self.driver.session() as session, SESSIONS_ACTIVE.labels("sync").track_inprogress():
+            token = _scoped_session.set(session)
+            try:
+                yield session
+            finally:
+                _scoped_session.reset(token)
 
     def close(self) -> None:
         logger.info("Closing neo4j ...")
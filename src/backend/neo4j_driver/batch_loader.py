@@ -0,0 +1,101 @@
+"""Request-scoped batching of single-entity lookups (the DataLoader pattern).
+
+A lookup like ``get_city`` asks the loader of its entity for one key instead of
+running its own query. Keys asked for during the same event loop tick, e.g. by
+coroutines gathered in a loop, are collected, deduplicated and loaded with one
+``UNWIND`` query, and within a ``loader_scope`` every key is loaded at most once.
+The API opens a scope per request; outside a scope every lookup gets its own
+loader, so nothing is memoized across requests.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterator, TypeVar
+
+from telemetry.metrics import LOADER_BATCHES, LOADER_KEYS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_loaders: ContextVar[dict[Hashable, "BatchLoader[Any, Any]"] | None] = ContextVar("batch_loaders", default=None)
+
+
+class BatchLoader(Generic[K, V]):
+    """Loads the keys requested during one event loop tick with a single ``load_batch`` call.
+
+    ``load_batch`` gets the distinct keys in request order and returns one value per key in
+    the same order. Values are memoized for the lifetime of the loader and shared by every
+    caller, so they must be treated as read-only. A failed batch is not memoized.
+    """
+
+    def __init__(self, name: str, load_batch: Callable[[list[K]], Awaitable[list[V]]]) -> None:
+        self.name = name
+        self.load_batch = load_batch
+        self.futures: dict[K, asyncio.Future[V]] = {}
+        self.pending: list[K] = []
+        # Strong references to running batches, the event loop only keeps weak ones.
+        self.batches: set[asyncio.Task[None]] = set()
+
+    async def load(self, key: K) -> V:
+        if (future := self.futures.get(key)) is None:
+            loop = asyncio.get_running_loop()
+            future = self.futures[key] = loop.create_future()
+            if not self.pending:
+                # Runs after the coroutines that are already scheduled had their turn to add keys.
+                loop.call_soon(self.dispatch)
+            self.pending.append(key)
+            LOADER_KEYS.labels(self.name, "batched").inc()
+        else:
+            LOADER_KEYS.labels(self.name, "memoized").inc()
+        # A cancelled caller must not cancel the value for the other callers.
+        return await asyncio.shield(future)
+
+    def dispatch(self) -> None:
+        keys, self.pending = self.pending, []
+        batch = asyncio.ensure_future(self.run_batch(keys))
+        self.batches.add(batch)
+        batch.add_done_callback(self.batches.discard)
+
+    async def run_batch(self, keys: list[K]) -> None:
+        LOADER_BATCHES.labels(self.name).inc()
+        try:
+            values = await self.load_batch(keys)
+            if len(values) != len(keys):
+                raise ValueError(f"Loader {self.name} returned {len(values)} values for {len(keys)} keys.")
+        except BaseException as err:
+            for key in keys:
+                future = self.futures.pop(key)
+                if isinstance(err, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(err)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+            return
+        for key, value in zip(keys, values):
+            self.futures[key].set_result(value)
+
+
+@contextmanager
+def loader_scope() -> Iterator[None]:
+    """Lookups inside the block share their loaders, and so their batches and values."""
+    if _loaders.get() is not None:
+        yield
+        return
+    token = _loaders.set({})
+    try:
+        yield
+    finally:
+        _loaders.reset(token)
+
+
+def get_loader(
+    name: str, load_batch: Callable[[list[K]], Awaitable[list[V]]], variant: Hashable = None
+) -> BatchLoader[K, V]:
+    """The loader ``name`` of the current scope; ``variant`` separates e.g. different field projections."""
+    if (loaders := _loaders.get()) is None:
+        return BatchLoader(name, load_batch)
+    if (loader := loaders.get((name, variant))) is None:
+        loader = loaders[(name, variant)] = BatchLoader(name, load_batch)
+    return loader
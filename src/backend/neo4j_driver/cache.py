@@ -0,0 +1,46 @@
+import time
+from threading import Lock
+from typing import Any, Hashable, Mapping
+
+from telemetry.metrics import CACHE_REQUESTS
+
+
+def make_key(name: str, kwargs: Mapping[str, Any]) -> Hashable:
+    """Hashable key for a query name and its parameters (lists become tuples)."""
+    return name, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in kwargs.items()))
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire after ``ttl`` seconds.
+
+    Once ``max_entries`` is reached the oldest entry is evicted. Hits and misses are
+    counted in the ``cache_requests`` metric under ``name``.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1024) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: dict[Hashable, tuple[float, Any]] = {}
+        self.lock = Lock()
+        self.hits = CACHE_REQUESTS.labels(name, "hit")
+        self.misses = CACHE_REQUESTS.labels(name, "miss")
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            if len(self.entries) >= self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -1,6 +1,4 @@
-from typing import Any
-
-from loguru import logger
+from typing import Any, Iterable
 
 
 class CityPois:
@@ -12,8 +10,19 @@ class CityPois:
         self.pois = [poi]
 
     def append(self, city: dict[str, Any], poi: dict[str, Any]) -> bool:
-        logger.info("Trying to append poi to CityPois Instance.")
         if self.city["cityId"] == city["cityId"]:
             self.pois.append(poi)
             return True
         return False
+
+
+def group_by_city(pois: Iterable[dict[str, Any]], cities: Iterable[dict[str, Any]]) -> list[CityPois]:
+    """Group the POIs by their city, paired by position, keeping the order in which cities first appear."""
+    city_pois: list[CityPois] = []
+    for poi, city in zip(pois, cities):
+        for city_poi in city_pois:
+            if city_poi.append(city, poi):
+                break
+        else:
+            city_pois.append(CityPois(city, poi))
+    return city_pois
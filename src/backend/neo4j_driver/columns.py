@@ -0,0 +1,97 @@
+"""Columnar query results: one typed array per returned column instead of a dict per row.
+
+``ColumnBuilder`` is fed the Bolt records of a result as they arrive and writes each
+value straight into a preallocated NumPy array of the column's dtype. The arrays grow
+by doubling and are trimmed to the row count at the end, so a large numeric result
+costs a few array allocations instead of one dict and one boxed float per value.
+
+A column's dtype is anything ``np.dtype`` accepts, plus:
+
+- ``str``: the values are kept in a list and become one fixed-width NumPy string
+  array at the end, whose width is only known then
+- ``"arrow"``: a ``pyarrow`` string array, with nulls, if pyarrow is importable, else
+  as ``str``
+
+``null`` becomes NaN in float columns; the other numeric columns reject it, so queries
+filling them must filter nulls.
+"""
+
+from os import environ
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+COLUMN_INITIAL_ROWS = int(environ.get("COLUMN_INITIAL_ROWS", 1024))
+ARROW = "arrow"
+
+ColumnDtypes = Mapping[str, Any]
+
+
+def is_string(dtype: Any) -> bool:
+    return dtype is str or (isinstance(dtype, str) and dtype == ARROW)
+
+
+def row_count(columns: Mapping[str, Any]) -> int:
+    return len(next(iter(columns.values()), ()))
+
+
+class ColumnBuilder:
+    def __init__(self, dtypes: ColumnDtypes, keys: Sequence[str], capacity: int = COLUMN_INITIAL_ROWS) -> None:
+        missing = [column for column in dtypes if column not in keys]
+        if missing:
+            raise KeyError(f"Columns {', '.join(missing)} are not returned by the query, it returns {list(keys)}.")
+        self.dtypes = dtypes
+        self.rows = 0
+        self.capacity = max(capacity, 1)
+        # (column, record index, target) per column; the target is an array or, for strings, a list.
+        self.columns: list[tuple[str, int, Any]] = [
+            (column, list(keys).index(column), [] if is_string(dtype) else np.empty(self.capacity, dtype=dtype))
+            for column, dtype in dtypes.items()
+        ]
+
+    def grow(self) -> None:
+        self.capacity *= 2
+        for index, (column, position, target) in enumerate(self.columns):
+            if isinstance(target, np.ndarray):
+                grown = np.empty(self.capacity, dtype=target.dtype)
+                grown[: self.rows] = target[: self.rows]
+                self.columns[index] = (column, position, grown)
+
+    def append(self, record: Sequence[Any]) -> None:
+        if self.rows == self.capacity:
+            self.grow()
+        row = self.rows
+        for column, position, target in self.columns:
+            value = record[position]
+            if isinstance(target, list):
+                target.append(value)
+            elif value is not None:
+                target[row] = value
+            elif target.dtype.kind == "f":
+                target[row] = np.nan
+            else:
+                raise ValueError(f"Column {column} of dtype {target.dtype} got null in row {row}.")
+        self.rows += 1
+
+    def extend(self, records: Iterable[Sequence[Any]]) -> "ColumnBuilder":
+        for record in records:
+            self.append(record)
+        return self
+
+    def finish(self) -> dict[str, Any]:
+        arrays: dict[str, Any] = {}
+        for column, _, target in self.columns:
+            dtype = self.dtypes[column]
+            if is_string(dtype) and dtype is not str and pa is not None:
+                arrays[column] = pa.array(target, type=pa.string())
+            elif is_string(dtype):
+                arrays[column] = np.array(target, dtype=str)
+            else:
+                # Copied when trimmed, so the unused capacity is freed.
+                arrays[column] = target if self.rows == self.capacity else target[: self.rows].copy()
+        return arrays
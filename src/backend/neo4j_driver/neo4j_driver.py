@@ -1,3 +1,7 @@
+from .async_base import AsyncBase
+from .async_city import AsyncCity
+from .async_poi import AsyncPOI
+from .async_tsp import AsyncTSP
 from .base import Base
 from .city import City
 from .poi import POI
@@ -7,3 +11,11 @@ from .tsp import TSP
 class Neo4jDriver(Base, City, POI, TSP):
     def __init__(self) -> None:
         self.init_driver()
+
+
+class AsyncNeo4jDriver(AsyncBase, AsyncCity, AsyncPOI, AsyncTSP):
+    """Async counterpart of Neo4jDriver.
+
+    Call ``await init_driver()`` before use and run ``start()`` in the background;
+    ``ready`` turns true once the database is online.
+    """
@@ -0,0 +1,71 @@
+"""Keyset pagination for POI listings ordered by ``(city, label, poiId)``.
+
+The cursor is the sort key of the last POI of a page, JSON encoded and base64url
+wrapped so clients treat it as opaque. Fetching the page after it is a range
+seek on the ``poi_city_label_id`` index, so deep pages cost the same as the first.
+The import stores a missing city or label as ``""``; a ``null`` in a cursor is read
+the same way.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from os import environ
+from typing import Any
+
+from dataset_import import get_import_version
+
+from .cache import TTLCache, make_key
+
+DEFAULT_PAGE_SIZE = int(environ.get("POI_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(environ.get("POI_MAX_PAGE_SIZE", 1000))
+
+FIRST_PAGE: dict[str, str] = {"after_city": "", "after_label": "", "after_id": ""}
+
+COUNT_CACHE = TTLCache("poi_count", ttl=float(environ.get("POI_COUNT_CACHE_TTL", 300)))
+SAVE_DIR = environ.get("DATATOURISME_SAVE_DIR", "./data/datatourisme")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(poi: dict[str, Any]) -> str:
+    key = json.dumps([poi.get("city"), poi.get("label"), poi["poiId"]], ensure_ascii=False)
+    return urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> dict[str, str]:
+    if not cursor:
+        return dict(FIRST_PAGE)
+    try:
+        key = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as err:
+        raise InvalidCursor("Invalid cursor.") from err
+    if (
+        not isinstance(key, list)
+        or len(key) != 3
+        or not all(part is None or isinstance(part, str) for part in key[:2])
+        or not isinstance(key[2], str)
+    ):
+        raise InvalidCursor("Invalid cursor.")
+    return dict(zip(FIRST_PAGE, [key[0] or "", key[1] or "", key[2]]))
+
+
+def page_kwargs(cursor: str | None, limit: int) -> dict[str, Any]:
+    return decode_cursor(cursor) | {"limit": limit}
+
+
+def next_cursor(pois: list[dict[str, Any]], limit: int) -> str | None:
+    """A full page may be followed by another one, a short page is the last."""
+    return encode_cursor(pois[-1]) if len(pois) == limit else None
+
+
+def count_key(query_name: str, kwargs: dict[str, Any]) -> tuple[str, Any] | None:
+    """Key of a listing total in ``COUNT_CACHE``, per import version; None while an import is running."""
+    if (version := get_import_version(SAVE_DIR)) is None:
+        return None
+    return version, make_key(query_name, kwargs)
+
+
+def make_page(pois: list[dict[str, Any]], limit: int, total: int | None) -> dict[str, Any]:
+    return {"pois": pois, "next_cursor": next_cursor(pois, limit), "total": total}
@@ -1,60 +1,120 @@
-from typing import Any, List
+from typing import Any, Iterator, List
 
 from loguru import logger
 
+from .queries import (
+    FILTERED_POI_ROWS_QUERY,
+    FILTERED_POI_ROWS_RADIUS_QUERY,
+    FILTERED_POIS_QUERY,
+    FILTERED_POIS_RADIUS_QUERY,
+    NEARBY_POINTS_QUERY,
+    POI_QUERY,
+    POI_TYPES_FOR_CITY_QUERY,
+    POIS_BY_ID_QUERY,
+    POIS_FOR_CITY_QUERY,
+    POIS_NEAR_CITY_QUERY,
+    TYPES_QUERY,
+    projected,
+)
+
+
+class UnknownPois(LookupError):
+    def __init__(self, poi_ids: list[str]) -> None:
+        self.poi_ids = poi_ids
+        super().__init__(f"Unknown poiIds: {', '.join(poi_ids)}.")
+
+
+class PoisWithoutCity(LookupError):
+    """The POIs can not be placed on a tour, no City node matches or is near them."""
+
+    def __init__(self, poi_ids: list[str]) -> None:
+        self.poi_ids = poi_ids
+        super().__init__(f"No city found for poiIds: {', '.join(poi_ids)}.")
+
+
+def order_pois(poi_ids: list[str], records: list[dict[str, Any]]) -> list[dict[Any, Any] | None]:
+    found = {record["p"]["poiId"]: record["p"] for record in records}
+    return [found.get(poi_id) for poi_id in poi_ids]
+
+
+def raise_for_missing(poi_ids: list[str], pois: list[dict[Any, Any] | None]) -> list[dict[Any, Any]]:
+    if missing := [poi_id for poi_id, poi in zip(poi_ids, pois) if poi is None]:
+        raise UnknownPois(missing)
+    return pois  # type: ignore[return-value]
+
+
+def city_poi_rows(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Rows of the POIs of a city: the projected POI with its types."""
+    return [record["p"] | {"types": record["types"]} for record in records]
+
+
+def nearby_poi_rows(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Rows of the POIs near a city: the projected POI with its distance and types."""
+    return [record["p"] | {"distance_km": record["distance_km"], "types": record["types"]} for record in records]
+
 
 class POI:
 
-    def get_poi(self, poi_id: str) -> dict[Any, Any]:
+    def get_poi(self, poi_id: str, fields: list[str] | None = None) -> dict[Any, Any]:
         logger.info(f"Get POI {poi_id}")
-        query = """
-            MATCH (p:POI {poiId: $poi_id})
-            RETURN p
-            LIMIT 1
-        """
-        poi = self.execute_query(query, poi_id=poi_id)  # type: ignore[attr-defined]
+        poi = self.execute_query(projected(POI_QUERY, fields), poi_id=poi_id)  # type: ignore[attr-defined]
         return poi[0]["p"] if poi else {}
 
+    def get_pois(self, poi_ids: list[str], fields: list[str] | None = None) -> list[dict[Any, Any] | None]:
+        """POIs in the order of ``poi_ids``, ``None`` where an id is unknown."""
+        logger.info(f"Get {len(poi_ids)} POIs")
+        records = self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_BY_ID_QUERY, fields), poi_ids=list(dict.fromkeys(poi_ids))
+        )
+        return order_pois(poi_ids, records)
+
     def get_types(self) -> dict[str, Any]:
         logger.info("Get all possible types.")
-        query = "MATCH (t:Type) RETURN t.typeId AS typeId"
-        types = self.execute_query(query)  # type: ignore[attr-defined]
+        types = self.execute_query(TYPES_QUERY)  # type: ignore[attr-defined]
 
         return {"types": [t["typeId"] for t in types] if types else []}
 
-    def get_poi_for_city(self, city_id: str, categories: List | None = None) -> List[dict[str, Any]]:
+    def get_poi_for_city(
+        self, city_id: str, categories: List | None = None, fields: list[str] | None = None
+    ) -> List[dict[str, Any]]:
         logger.info(f"Get all pois in city {city_id}.")
-        query = """
-        MATCH (c:City {cityId: $city_id}) <- [r:IS_IN] - (p:POI) - [is_a:IS_A] -> (t:POIType)
-        WHERE $categories IS NULL or t.typeId in $categories
-        RETURN p, collect(distinct t.typeId) as types
-        """
-        pois = self.execute_query(query, city_id=city_id, categories=categories)  # type: ignore[attr-defined]
-        return [p["p"] | {"types": p["types"]} for p in pois] if pois else [{}]
-
-    def get_poi_near_city(self, city_id: str, categories: List | None = None) -> List[dict[str, Any]]:
+        pois = self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_FOR_CITY_QUERY, fields), city_id=city_id, categories=categories
+        )
+        return city_poi_rows(pois) if pois else [{}]
+
+    def get_poi_near_city(
+        self, city_id: str, categories: List | None = None, fields: list[str] | None = None
+    ) -> List[dict[str, Any]]:
         logger.info(f"Get all pois near city {city_id}.")
-        query = """
-        MATCH (c:City {cityId: $city_id}) <- [r:IS_NEARBY] - (p:POI) - [is_a:IS_A] -> (t:POIType)
-        WHERE $categories IS NULL or t.typeId in $categories
-        RETURN p, r.km as distance_km, collect(distinct t.typeId) as types
-        ORDER BY distance_km ASC
-        """
-        pois = self.execute_query(query, city_id=city_id, categories=categories)  # type: ignore[attr-defined]
-        return [p["p"] | {"distance_km": p["distance_km"], "types": p["types"]} for p in pois] if pois else [{}]
+        pois = self.execute_query(  # type: ignore[attr-defined]
+            projected(POIS_NEAR_CITY_QUERY, fields), city_id=city_id, categories=categories
+        )
+        return nearby_poi_rows(pois) if pois else [{}]
 
     def get_poi_types_for_city(self, city_id: str, categories: List | None = None) -> List[str]:
         logger.info(f"Get POI types for city {city_id}.")
-        query = """
-        MATCH (c:City {cityId: $city_id}) <- [r:IS_IN] - (p:POI) - [is_a:IS_A] -> (t:POIType)
-        RETURN collect(distinct t.typeId) as types
-        """
-        result = self.execute_query(query, city_id=city_id)  # type: ignore[attr-defined]
+        result = self.execute_query(POI_TYPES_FOR_CITY_QUERY, city_id=city_id)  # type: ignore[attr-defined]
         return result[0]["types"]
 
     def get_filtered_pois(self, locations: list[str] | None, types: list[str] | None, radius: int) -> dict[str, Any]:
         logger.info("Get POIs for ui.")
+        kwargs = self.filter_kwargs(locations, types, radius)
+        query = FILTERED_POIS_RADIUS_QUERY if radius > 0 else FILTERED_POIS_QUERY
 
+        result = self.execute_query(query, **kwargs)  # type: ignore[attr-defined]
+        return result[0] if result else []  # type: ignore
+
+    def iter_filtered_pois(
+        self, locations: list[str] | None, types: list[str] | None, radius: int
+    ) -> Iterator[dict[str, Any]]:
+        logger.info("Stream POIs for ui.")
+        kwargs = self.filter_kwargs(locations, types, radius)
+        query = FILTERED_POI_ROWS_RADIUS_QUERY if radius > 0 else FILTERED_POI_ROWS_QUERY
+        for record in self.execute_query_iter(query, **kwargs):  # type: ignore[attr-defined]
+            yield record["poi"]
+
+    def filter_kwargs(self, locations: list[str] | None, types: list[str] | None, radius: int) -> dict[str, Any]:
         locations = self.normalize_param(locations)
         types = self.normalize_param(types)
 
@@ -64,47 +124,8 @@ class POI:
             "radius": radius,
         }
 
-        logger.debug(f"POI filters: {kwargs}")
-
-        if radius > 0:
-            query = """
-                CALL {
-                    MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
-                    WHERE ($locations IS NULL OR n.city IN $locations)
-                        AND ($types IS NULL OR tFilter.typeId IN $types)
-                    RETURN n
-
-                    UNION
-
-                    MATCH (c:City)
-                    WHERE c.name IN $locations
-                    WITH point({latitude: c.latitude, longitude: c.longitude}) AS cityPoint
-                    MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
-                    WHERE point.distance(
-                            cityPoint,
-                            point({latitude: n.latitude, longitude: n.longitude})
-                          ) <= $radius
-                        AND ($types IS NULL OR tFilter.typeId IN $types)
-                    RETURN n
-                }
-                WITH DISTINCT n
-                ORDER BY n.city, n.label
-                MATCH (n)-[:IS_A]->(tAll:POIType)
-                WITH n, collect(DISTINCT tAll.typeId) AS poiTypes
-                RETURN collect(n { .*, types: apoc.text.join(poiTypes, ", ") }) AS pois
-            """
-        else:
-            query = """
-                MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
-                WHERE ($locations IS NULL OR n.city IN $locations)
-                    AND ($types IS NULL OR tFilter.typeId IN $types)
-                MATCH (n)-[:IS_A]->(tAll:POIType)
-                WITH n, collect(DISTINCT tAll.typeId) AS poiTypes
-                RETURN collect(n { .*, types: apoc.text.join(poiTypes, ", ") }) AS pois
-            """
-
-        result = self.execute_query(query, **kwargs)  # type: ignore[attr-defined]
-        return result[0] if result else []  # type: ignore
+        logger.debug("POI filters: {}", kwargs)
+        return kwargs
 
     def normalize_param(self, values: list[str] | None) -> list[str] | None:
         if not values:
@@ -114,24 +135,5 @@ class POI:
 
     def get_nearby_points(self, poi_id: str, radius: float) -> dict[str, list[dict[Any, Any]]]:
         logger.info(f"Get POI around POI {poi_id} in a radius of {radius}.")
-        query = """
-            MATCH (p1:POI {poiId: $poi_id})
-            MATCH (p2:POI)
-            WHERE p1 <> p2
-                AND point.distance(p1.location, p2.location) <= $radius
-            RETURN
-                p2.poiId AS poiId,
-                p2.label AS label,
-                p2.comment AS comment,
-                p2.description AS description,
-                p2.types AS types,
-                p2.homepage AS homepage,
-                p2.city AS city,
-                p2.postal_code AS postal_code,
-                p2.street AS street,
-                p2.location.latitude AS lat,
-                p2.location.longitude AS lon,
-                p2.additional_information AS additional_information
-        """
-        records = self.execute_query(query, poi_id=poi_id, radius=radius)  # type: ignore[attr-defined]
+        records = self.execute_query(NEARBY_POINTS_QUERY, poi_id=poi_id, radius=radius)  # type: ignore[attr-defined]
         return {"nearby": records if records else []}
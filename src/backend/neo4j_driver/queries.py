@@ -0,0 +1,611 @@
+from functools import lru_cache
+from os import environ
+from typing import Any, Iterable, Mapping, NamedTuple
+
+# Transaction timeout in seconds for registered queries; NEO4J_QUERY_TIMEOUTS overrides single
+# queries by name, e.g. "city.roundtrip.10=120,poi.filter=10".
+QUERY_TIMEOUT = float(environ.get("NEO4J_QUERY_TIMEOUT", 30))
+QUERY_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (item.partition("=") for item in environ.get("NEO4J_QUERY_TIMEOUTS", "").split(","))
+    if seconds
+}
+
+
+class NamedQuery(NamedTuple):
+    """A parameterized Cypher statement registered under a stable name.
+
+    ``params`` holds representative parameter values; they are only used to EXPLAIN the
+    statement at startup so the plan cache is warm before the first request. ``timeout`` is
+    the transaction timeout in seconds, ``None`` leaves it to the server configuration.
+    """
+
+    name: str
+    text: str
+    params: Mapping[str, Any] = {}
+    timeout: float | None = None
+
+
+QUERIES: dict[str, NamedQuery] = {}
+
+
+def register(name: str, text: str, *, timeout: float = QUERY_TIMEOUT, **params: Any) -> NamedQuery:
+    if name in QUERIES:
+        raise ValueError(f"Query {name} is already registered.")
+    QUERIES[name] = query = NamedQuery(name, text, params, QUERY_TIMEOUTS.get(name, timeout))
+    return query
+
+
+def resolve(query: NamedQuery | str) -> NamedQuery:
+    """Ad hoc query strings are still accepted and reported under the name ``adhoc``."""
+    return query if isinstance(query, NamedQuery) else NamedQuery("adhoc", query)
+
+
+# --- Projections --------------------------------------------------------------------------------------------------
+
+POI_FIELDS = frozenset(
+    {
+        "poiId",
+        "label",
+        "comment",
+        "description",
+        "homepage",
+        "city",
+        "postal_code",
+        "street",
+        "latitude",
+        "longitude",
+        "additional_information",
+    }
+)
+CITY_FIELDS = frozenset(
+    {"cityId", "name", "administration", "population", "population_proper", "latitude", "longitude"}
+)
+
+
+class Projection(NamedTuple):
+    """Template of a query returning whole nodes and how to narrow it to a set of properties.
+
+    ``template`` has a literal ``{projection}`` placeholder where the node is returned. ``required``
+    fields are always projected, e.g. ids that results are grouped by or that cursors are built from.
+    """
+
+    template: str
+    variable: str
+    allowed: frozenset[str]
+    required: frozenset[str]
+
+
+PROJECTIONS: dict[str, Projection] = {}
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def register_projection(
+    name: str,
+    template: str,
+    variable: str,
+    allowed: frozenset[str],
+    required: Iterable[str],
+    *,
+    timeout: float = QUERY_TIMEOUT,
+    **params: Any,
+) -> NamedQuery:
+    """Register ``template`` returning the whole node under ``name``; see ``projected`` for narrowed variants."""
+    PROJECTIONS[name] = Projection(template, variable, allowed, frozenset(required))
+    return register(name, template.replace("{projection}", variable), timeout=timeout, **params)
+
+
+def projected(query: NamedQuery, fields: Iterable[str] | None) -> NamedQuery:
+    """Variant of ``query`` that only reads ``fields`` via a map projection (``p {.label, .city}``)."""
+    if not fields:
+        return query
+    projection = PROJECTIONS[query.name]
+    if unknown := set(fields) - projection.allowed:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return compile_projection(query.name, tuple(sorted(projection.required.union(fields))))
+
+
+def projection_key(fields: Iterable[str] | None) -> tuple[str, ...] | None:
+    """Equal for every ``fields`` that ``projected`` turns into the same query variant."""
+    return tuple(sorted(set(fields))) if fields else None
+
+
+@lru_cache(maxsize=512)
+def compile_projection(name: str, fields: tuple[str, ...]) -> NamedQuery:
+    # Keeps the name of the full query so metrics and the slow query log aggregate over all variants.
+    projection = PROJECTIONS[name]
+    properties = ", ".join(f".{field}" for field in fields)
+    text = projection.template.replace("{projection}", f"{projection.variable} {{{properties}}}")
+    return NamedQuery(name, text, QUERIES[name].params, QUERIES[name].timeout)
+
+
+# --- City ---------------------------------------------------------------------------------------------------------
+
+TOTAL_DISTANCE_QUERY = register(
+    "city.total_distance",
+    """
+MATCH (s:City {cityId: $start})
+MATCH (t:City {cityId: $dest})
+
+CALL gds.shortestPath.dijkstra.stream(
+    'city-road-graph',
+    {
+        sourceNode: id(s),
+        targetNode: id(t),
+        relationshipWeightProperty: 'km'
+    }
+)
+YIELD totalCost
+RETURN totalCost AS distance;
+""",
+    start="",
+    dest="",
+)
+
+ROUTE_QUERY = register(
+    "city.route",
+    """
+MATCH (s:City {cityId: $start})
+MATCH (t:City {cityId: $dest})
+CALL gds.shortestPath.dijkstra.stream(
+    'city-road-graph',
+    {
+        sourceNode: id(s),
+        targetNode: id(t),
+        relationshipWeightProperty: 'km'
+    }
+)
+YIELD nodeIds
+
+RETURN [nodeId IN nodeIds |
+    [
+        gds.util.asNode(nodeId).longitude,
+        gds.util.asNode(nodeId).latitude
+    ]
+] AS coords
+""",
+    start="",
+    dest="",
+)
+
+CITY_QUERY = register_projection(
+    "city.get",
+    """
+MATCH (c:City {cityId: $city_id})
+RETURN {projection} AS c
+LIMIT 1
+""",
+    "c",
+    CITY_FIELDS,
+    ["cityId"],
+    city_id="",
+)
+
+# Many cities in one round trip, for the request-scoped city loader; unknown ids yield no row.
+CITIES_BY_ID_QUERY = register_projection(
+    "city.batch",
+    """
+UNWIND $city_ids AS city_id
+MATCH (c:City {cityId: city_id})
+RETURN {projection} AS c
+""",
+    "c",
+    CITY_FIELDS,
+    ["cityId"],
+    city_ids=[""],
+)
+
+CITIES_QUERY = register(
+    "city.all",
+    """
+MATCH (n:City)
+RETURN n.name as name, n.population as population, n.latitude as latitude, n.longitude as longitude""",
+)
+
+CITY_TABLE_QUERY = register(
+    "city.table",
+    """
+MATCH (c:City)
+WHERE c.latitude IS NOT NULL AND c.longitude IS NOT NULL
+RETURN c.cityId AS cityId, c.latitude AS latitude, c.longitude AS longitude
+ORDER BY cityId""",
+)
+
+NEAREST_CITY_QUERY = register(
+    "city.nearest",
+    """
+MATCH (c:City)
+WITH
+    c,
+    point({latitude: $latitude, longitude: $longitude}) as p,
+    point({latitude: c.latitude, longitude: c.longitude}) as cp
+RETURN c as city, round(point.distance(p, cp)/1000, 2) as distance_km
+ORDER BY distance_km ASC
+LIMIT 1
+""",
+    latitude=0.0,
+    longitude=0.0,
+)
+
+# The nearest city of every point, in the order of $points.
+NEAREST_CITIES_QUERY = register(
+    "city.nearest_batch",
+    """
+UNWIND range(0, size($points) - 1) AS i
+CALL (i) {
+    WITH point({latitude: $points[i].latitude, longitude: $points[i].longitude}) AS p
+    MATCH (c:City)
+    WITH c, round(point.distance(p, point({latitude: c.latitude, longitude: c.longitude}))/1000, 2) AS distance_km
+    ORDER BY distance_km ASC
+    LIMIT 1
+    RETURN c AS city, distance_km
+}
+RETURN i, city, distance_km
+ORDER BY i
+""",
+    points=[{"latitude": 0.0, "longitude": 0.0}],
+)
+
+ROUTE_BETWEEN_CITIES_QUERY = register(
+    "city.route_between",
+    """
+MATCH (s:City {cityId: $start_city})
+MATCH (t:City {cityId: $end_city})
+
+CALL gds.shortestPath.dijkstra.stream('city-road-graph', {
+    sourceNode: s,
+    targetNode: t,
+    relationshipWeightProperty: 'km'
+})
+YIELD totalCost, path
+WITH
+    totalCost,
+    relationships(path) AS roads
+UNWIND range(0, size(roads) - 1) AS i
+WITH
+    totalCost,
+    startNode(roads[i]).name AS From_City,
+    endNode(roads[i]).name AS To_City,
+    round(roads[i].cost, 2) AS Distance_km
+RETURN
+    From_City,
+    To_City,
+    Distance_km
+""",
+    start_city="",
+    end_city="",
+)
+
+ROUNDTRIP_HOPS = range(3, 11)
+
+# The upper bound of a variable length pattern has to be a literal, so there is one statement per
+# supported max_hops. The sort direction is a parameter instead of a second set of variants.
+ROUNDTRIP_TEMPLATE = """
+MATCH path = (start:City {{cityId: $city_id}}) - [:ROAD_TO*3..{max_hops}]-> (start)
+WHERE all(n IN nodes(path)[1..-1] WHERE single(m IN nodes(path) WHERE m = n))
+WITH path,
+     reduce(total = 0, r IN relationships(path) | total + r.km) AS totalDistance
+WHERE $min_distance <= totalDistance <= $max_distance
+RETURN
+    [node IN nodes(path) | node.cityId] AS cities_in_order,
+    totalDistance,
+    length(path) AS number_of_hops
+ORDER BY CASE WHEN $descending THEN -totalDistance ELSE totalDistance END
+LIMIT 1;
+"""
+
+ROUNDTRIP_QUERIES = {
+    max_hops: register(
+        f"city.roundtrip.{max_hops}",
+        ROUNDTRIP_TEMPLATE.format(max_hops=max_hops),
+        city_id="",
+        min_distance=0.0,
+        max_distance=0.0,
+        descending=False,
+    )
+    for max_hops in ROUNDTRIP_HOPS
+}
+
+
+def roundtrip_query(max_hops: int) -> NamedQuery:
+    if max_hops not in ROUNDTRIP_QUERIES:
+        raise ValueError(f"max_hops has to be in [{ROUNDTRIP_HOPS.start}, {ROUNDTRIP_HOPS.stop - 1}].")
+    return ROUNDTRIP_QUERIES[max_hops]
+
+
+# --- POI ----------------------------------------------------------------------------------------------------------
+
+POI_QUERY = register_projection(
+    "poi.get",
+    """
+MATCH (p:POI {poiId: $poi_id})
+RETURN {projection} AS p
+LIMIT 1
+""",
+    "p",
+    POI_FIELDS,
+    ["poiId"],
+    poi_id="",
+)
+
+# Many POIs in one round trip, each resolved on the poi_poi_id uniqueness constraint. Unknown ids
+# yield no row; the driver restores the input order and reports them as misses.
+POIS_BY_ID_QUERY = register_projection(
+    "poi.batch",
+    """
+UNWIND $poi_ids AS poi_id
+MATCH (p:POI {poiId: poi_id})
+RETURN {projection} AS p
+""",
+    "p",
+    POI_FIELDS,
+    ["poiId"],
+    poi_ids=[""],
+)
+
+TYPES_QUERY = register("poi.types", "MATCH (t:Type) RETURN t.typeId AS typeId")
+
+# poiId is required in both projections, otherwise POIs with equal projected values would be grouped together.
+POIS_FOR_CITY_QUERY = register_projection(
+    "poi.for_city",
+    """
+MATCH (c:City {cityId: $city_id}) <- [r:IS_IN] - (p:POI) - [is_a:IS_A] -> (t:POIType)
+WHERE $categories IS NULL or t.typeId in $categories
+RETURN {projection} AS p, collect(distinct t.typeId) as types
+""",
+    "p",
+    POI_FIELDS,
+    ["poiId"],
+    city_id="",
+    categories=[""],
+)
+
+POIS_NEAR_CITY_QUERY = register_projection(
+    "poi.near_city",
+    """
+MATCH (c:City {cityId: $city_id}) <- [r:IS_NEARBY] - (p:POI) - [is_a:IS_A] -> (t:POIType)
+WHERE $categories IS NULL or t.typeId in $categories
+RETURN {projection} AS p, r.km as distance_km, collect(distinct t.typeId) as types
+ORDER BY distance_km ASC
+""",
+    "p",
+    POI_FIELDS,
+    ["poiId"],
+    city_id="",
+    categories=[""],
+)
+
+POI_TYPES_FOR_CITY_QUERY = register(
+    "poi.types_for_city",
+    """
+MATCH (c:City {cityId: $city_id}) <- [r:IS_IN] - (p:POI) - [is_a:IS_A] -> (t:POIType)
+RETURN collect(distinct t.typeId) as types
+""",
+    city_id="",
+)
+
+FILTERED_POIS_RADIUS_MATCH = """
+CALL {
+    MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
+    WHERE ($locations IS NULL OR n.city IN $locations)
+        AND ($types IS NULL OR tFilter.typeId IN $types)
+    RETURN n
+
+    UNION
+
+    MATCH (c:City)
+    WHERE c.name IN $locations
+    WITH point({latitude: c.latitude, longitude: c.longitude}) AS cityPoint
+    MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
+    WHERE point.distance(
+            cityPoint,
+            point({latitude: n.latitude, longitude: n.longitude})
+          ) <= $radius
+        AND ($types IS NULL OR tFilter.typeId IN $types)
+    RETURN n
+}
+WITH DISTINCT n
+ORDER BY n.city, n.label
+MATCH (n)-[:IS_A]->(tAll:POIType)
+WITH n, collect(DISTINCT tAll.typeId) AS poiTypes
+"""
+
+FILTERED_POIS_MATCH = """
+MATCH (n:POI)-[:IS_A]->(tFilter:POIType)
+WHERE ($locations IS NULL OR n.city IN $locations)
+    AND ($types IS NULL OR tFilter.typeId IN $types)
+MATCH (n)-[:IS_A]->(tAll:POIType)
+WITH n, collect(DISTINCT tAll.typeId) AS poiTypes
+"""
+
+COLLECT_POIS = """RETURN collect(n { .*, types: apoc.text.join(poiTypes, ", ") }) AS pois
+"""
+
+POI_ROWS = """RETURN n { .*, types: apoc.text.join(poiTypes, ", ") } AS poi
+"""
+
+FILTER_PARAMS: dict[str, Any] = {"locations": [""], "types": [""], "radius": 0}
+
+FILTERED_POIS_RADIUS_QUERY = register("poi.filter.radius", FILTERED_POIS_RADIUS_MATCH + COLLECT_POIS, **FILTER_PARAMS)
+FILTERED_POIS_QUERY = register("poi.filter", FILTERED_POIS_MATCH + COLLECT_POIS, **FILTER_PARAMS)
+
+# Row-per-POI variants used by the streaming endpoints. An export of the whole dataset legitimately
+# runs for minutes, so they get a longer timeout.
+EXPORT_TIMEOUT = float(environ.get("NEO4J_EXPORT_TIMEOUT", 600))
+FILTERED_POI_ROWS_RADIUS_QUERY = register(
+    "poi.filter.rows.radius", FILTERED_POIS_RADIUS_MATCH + POI_ROWS, timeout=EXPORT_TIMEOUT, **FILTER_PARAMS
+)
+FILTERED_POI_ROWS_QUERY = register(
+    "poi.filter.rows", FILTERED_POIS_MATCH + POI_ROWS, timeout=EXPORT_TIMEOUT, **FILTER_PARAMS
+)
+
+# --- POI pages ----------------------------------------------------------------------------------------------------
+
+# Keyset predicate for pages ordered by (city, label, poiId), see pagination.py. The redundant
+# `n.city >= $after_city` is a range predicate on the first property of the poi_city_label_id
+# index, so the planner seeks to the cursor instead of scanning from the start. It compares the
+# raw properties, so the index also provides the order; the import stores a missing city or
+# label as "" so that no POI falls out of the index.
+POI_KEYSET = """n.city >= $after_city
+    AND (n.city > $after_city OR n.label > $after_label OR (n.label = $after_label AND n.poiId > $after_id))"""
+
+POI_PAGE_ORDER = """WITH n
+ORDER BY n.city, n.label, n.poiId
+LIMIT $limit
+"""
+
+POI_TYPES = """COLLECT { MATCH (n)-[:IS_A]->(t:POIType) RETURN DISTINCT t.typeId }"""
+
+COUNT_POIS = """RETURN count(n) AS total
+"""
+
+PAGE_PARAMS: dict[str, Any] = {"after_city": "", "after_label": "", "after_id": "", "limit": 1}
+
+FILTERED_POIS_PAGE_MATCH = f"""
+MATCH (n:POI)
+WHERE ($locations IS NULL OR n.city IN $locations)
+    AND EXISTS {{ (n)-[:IS_A]->(t:POIType) WHERE $types IS NULL OR t.typeId IN $types }}
+    AND {POI_KEYSET}
+"""
+
+FILTERED_POIS_PAGE_RADIUS_MATCH = f"""
+CALL {{
+    MATCH (n:POI)
+    WHERE ($locations IS NULL OR n.city IN $locations)
+        AND EXISTS {{ (n)-[:IS_A]->(t:POIType) WHERE $types IS NULL OR t.typeId IN $types }}
+        AND {POI_KEYSET}
+    RETURN n
+
+    UNION
+
+    MATCH (c:City)
+    WHERE c.name IN $locations
+    WITH point({{latitude: c.latitude, longitude: c.longitude}}) AS cityPoint
+    MATCH (n:POI)
+    WHERE point.distance(
+            cityPoint,
+            point({{latitude: n.latitude, longitude: n.longitude}})
+          ) <= $radius
+        AND EXISTS {{ (n)-[:IS_A]->(t:POIType) WHERE $types IS NULL OR t.typeId IN $types }}
+        AND {POI_KEYSET}
+    RETURN n
+}}
+"""
+
+POI_PAGE_ROWS = f"""RETURN n {{ .*, types: apoc.text.join({POI_TYPES}, ", ") }} AS poi
+"""
+
+FILTERED_POIS_PAGE_QUERY = register(
+    "poi.filter.page", FILTERED_POIS_PAGE_MATCH + POI_PAGE_ORDER + POI_PAGE_ROWS, **FILTER_PARAMS, **PAGE_PARAMS
+)
+FILTERED_POIS_PAGE_RADIUS_QUERY = register(
+    "poi.filter.page.radius",
+    FILTERED_POIS_PAGE_RADIUS_MATCH + POI_PAGE_ORDER + POI_PAGE_ROWS,
+    **FILTER_PARAMS,
+    **PAGE_PARAMS,
+)
+
+# Counts reuse the page MATCH with the first page cursor, so they cover exactly the POIs that can be paged through.
+FILTERED_POIS_COUNT_QUERY = register(
+    "poi.filter.count", FILTERED_POIS_PAGE_MATCH + COUNT_POIS, **FILTER_PARAMS, **PAGE_PARAMS
+)
+FILTERED_POIS_COUNT_RADIUS_QUERY = register(
+    "poi.filter.count.radius", FILTERED_POIS_PAGE_RADIUS_MATCH + COUNT_POIS, **FILTER_PARAMS, **PAGE_PARAMS
+)
+
+POIS_FOR_CITY_PAGE_MATCH = f"""
+MATCH (c:City {{cityId: $city_id}}) <- [:IS_IN] - (n:POI)
+WHERE EXISTS {{ (n)-[:IS_A]->(t:POIType) WHERE $categories IS NULL OR t.typeId IN $categories }}
+    AND {POI_KEYSET}
+"""
+
+POIS_NEAR_CITY_PAGE_MATCH = f"""
+MATCH (c:City {{cityId: $city_id}}) <- [r:IS_NEARBY] - (n:POI)
+WHERE EXISTS {{ (n)-[:IS_A]->(t:POIType) WHERE $categories IS NULL OR t.typeId IN $categories }}
+    AND {POI_KEYSET}
+"""
+
+CITY_PARAMS: dict[str, Any] = {"city_id": "", "categories": [""]}
+
+# city and label are required since the next cursor is built from them.
+POIS_FOR_CITY_PAGE_QUERY = register_projection(
+    "poi.for_city.page",
+    POIS_FOR_CITY_PAGE_MATCH
+    + POI_PAGE_ORDER
+    + f"""RETURN {{projection}} AS p, {POI_TYPES} AS types
+""",
+    "n",
+    POI_FIELDS,
+    ["poiId", "city", "label"],
+    **CITY_PARAMS,
+    **PAGE_PARAMS,
+)
+POIS_FOR_CITY_COUNT_QUERY = register(
+    "poi.for_city.count", POIS_FOR_CITY_PAGE_MATCH + COUNT_POIS, **CITY_PARAMS, **PAGE_PARAMS
+)
+
+POIS_NEAR_CITY_PAGE_QUERY = register_projection(
+    "poi.near_city.page",
+    POIS_NEAR_CITY_PAGE_MATCH
+    + """WITH n, r
+ORDER BY n.city, n.label, n.poiId
+LIMIT $limit
+"""
+    + f"""RETURN {{projection}} AS p, r.km AS distance_km, {POI_TYPES} AS types
+""",
+    "n",
+    POI_FIELDS,
+    ["poiId", "city", "label"],
+    **CITY_PARAMS,
+    **PAGE_PARAMS,
+)
+POIS_NEAR_CITY_COUNT_QUERY = register(
+    "poi.near_city.count", POIS_NEAR_CITY_PAGE_MATCH + COUNT_POIS, **CITY_PARAMS, **PAGE_PARAMS
+)
+
+NEARBY_POINTS_QUERY = register(
+    "poi.nearby",
+    """
+MATCH (p1:POI {poiId: $poi_id})
+MATCH (p2:POI)
+WHERE p1 <> p2
+    AND point.distance(p1.location, p2.location) <= $radius
+RETURN
+    p2.poiId AS poiId,
+    p2.label AS label,
+    p2.comment AS comment,
+    p2.description AS description,
+    p2.types AS types,
+    p2.homepage AS homepage,
+    p2.city AS city,
+    p2.postal_code AS postal_code,
+    p2.street AS street,
+    p2.location.latitude AS lat,
+    p2.location.longitude AS lon,
+    p2.additional_information AS additional_information
+""",
+    poi_id="",
+    radius=0.0,
+)
+
+# Touches the id indexes and the node and relationship stores once, so that the
+# first requests after a restart or an import find them in Neo4j's page cache.
+PAGE_WARMUP_QUERY = register(
+    "warmup.pages",
+    """
+CALL {
+    MATCH (p:POI) WHERE p.poiId IS NOT NULL
+    RETURN count(p) AS pois
+}
+CALL {
+    MATCH (c:City) WHERE c.cityId IS NOT NULL
+    OPTIONAL MATCH (c)-[r]-()
+    RETURN count(DISTINCT c) AS cities, count(r) AS relationships
+}
+RETURN pois, cities, relationships
+""",
+    timeout=EXPORT_TIMEOUT,
+)
@@ -0,0 +1,168 @@
+"""NumPy datasets shared by all uvicorn workers of a host and kept across restarts.
+
+Each dataset is published once per import version as a snapshot in
+``SHARED_DATA_DIR/<name>/<version>/``: one ``.npy`` file per array and a
+``manifest.json`` with the snapshot format, the import version and the shape,
+dtype and SHA-256 of every file. Workers memory-map the files read-only, so every
+worker reads the same pages from the OS page cache instead of building its own
+copy, and a restarted API attaches the snapshot of the current import version
+before Neo4j is even reachable. A snapshot of another format or version, or one
+whose checksums do not match, is rebuilt from Neo4j.
+
+One worker builds a version: the one that gets the ``flock`` on ``<name>/.lock``.
+It writes into a temporary directory and renames it into place, so a version
+directory is complete as soon as it exists. The other workers poll until it
+appears; if the builder dies, its lock is released and the next waiter builds
+instead. The builder then removes older versions. Workers that still map their
+files keep reading them, because unlinked files stay valid while mapped.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from os import environ
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple
+
+import numpy as np
+from loguru import logger
+
+SHARED_DATA_DIR = Path(environ.get("SHARED_DATA_DIR", "./data/shared"))
+SHARED_DATA_VERIFY = environ.get("SHARED_DATA_VERIFY", "true").lower() == "true"
+SHARED_DATA_POLL = 0.5
+SNAPSHOT_FORMAT = 1
+MANIFEST = "manifest.json"
+
+# The datasets of the process by name, for restoring them all on startup.
+DATASETS: dict[str, "SharedDataset"] = {}
+
+
+class Attached(NamedTuple):
+    version: str
+    arrays: dict[str, np.ndarray]
+
+
+class InvalidSnapshot(Exception):
+    pass
+
+
+def sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SharedDataset:
+    def __init__(self, name: str, root: Path = SHARED_DATA_DIR, verify: bool = SHARED_DATA_VERIFY) -> None:
+        self.name = name
+        self.root = root / name
+        self.verify = verify
+        # Replaced as a whole, so a reader that took it once sees one consistent version.
+        self.current: Attached | None = None
+
+    def path(self, version: str) -> Path:
+        return self.root / re.sub(r"[^\w.-]", "_", version)
+
+    def load(self, version: str) -> dict[str, np.ndarray]:
+        """Memory-map the snapshot of ``version``; raises FileNotFoundError or InvalidSnapshot."""
+        directory = self.path(version)
+        manifest = json.loads((directory / MANIFEST).read_text())
+        if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("import_version") != version:
+            raise InvalidSnapshot(f"{directory} is not a format {SNAPSHOT_FORMAT} snapshot of version {version}")
+        arrays = {}
+        for name, entry in manifest["arrays"].items():
+            path = directory / entry["file"]
+            if self.verify and sha256(path) != entry["sha256"]:
+                raise InvalidSnapshot(f"Checksum mismatch of {path}")
+            array = np.load(path, mmap_mode="r")
+            if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+                raise InvalidSnapshot(f"{path} does not match its manifest")
+            arrays[name] = array
+        return arrays
+
+    def attach(self, version: str) -> bool:
+        """Map the snapshot of ``version`` if a valid one has been published."""
+        started = time.perf_counter()
+        try:
+            arrays = self.load(version)
+        except FileNotFoundError:
+            return False
+        except (InvalidSnapshot, ValueError, KeyError) as err:
+            logger.warning(f"Ignoring snapshot of shared dataset {self.name}: {err}")
+            return False
+        self.current = Attached(version, arrays)
+        duration = (time.perf_counter() - started) * 1000
+        logger.info(f"Attached shared dataset {self.name} version {version} in {duration:.1f}ms.")
+        return True
+
+    async def publish(self, version: str, build: Callable[[], Awaitable[dict[str, np.ndarray]]]) -> None:
+        """Attach ``version``, building it first if no other worker has or is about to."""
+        if self.current is not None and self.current.version == version:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        while not self.attach(version):
+            with (self.root / ".lock").open("a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    pass  # another worker builds this version
+                else:
+                    if not self.attach(version):
+                        # A directory that does not attach holds an outdated or damaged snapshot.
+                        shutil.rmtree(self.path(version), ignore_errors=True)
+                        self.write(version, await build())
+                        self.cleanup(version)
+                    continue
+            await asyncio.sleep(SHARED_DATA_POLL)
+
+    def write(self, version: str, arrays: dict[str, np.ndarray]) -> None:
+        started = time.perf_counter()
+        directory = Path(tempfile.mkdtemp(prefix=".build-", dir=self.root))
+        entries: dict[str, dict[str, Any]] = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(directory / f"{name}.npy", array)
+            entries[name] = {
+                "file": f"{name}.npy",
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "sha256": sha256(directory / f"{name}.npy"),
+            }
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "dataset": self.name,
+            "import_version": version,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "arrays": entries,
+        }
+        (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        directory.rename(self.path(version))
+        size = sum(array.nbytes for array in arrays.values())
+        duration = time.perf_counter() - started
+        logger.success(f"Published shared dataset {self.name} version {version} ({size} bytes) in {duration:.2f}s.")
+
+    def cleanup(self, version: str) -> None:
+        """Remove every other version and leftovers of interrupted builds; only call it holding the lock."""
+        keep = self.path(version)
+        for path in self.root.iterdir():
+            if path.is_dir() and path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def shared_dataset(name: str) -> SharedDataset:
+    """The process-wide dataset ``name``, restored by ``restore_snapshots``."""
+    DATASETS[name] = dataset = SharedDataset(name)
+    return dataset
+
+
+def restore_snapshots(version: str) -> list[str]:
+    """Attach the snapshot of ``version`` of every dataset that has one; returns their names."""
+    return [name for name, dataset in DATASETS.items() if dataset.attach(version)]
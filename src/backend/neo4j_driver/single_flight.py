@@ -0,0 +1,56 @@
+import asyncio
+import contextvars
+from typing import Any, Callable, Coroutine, Hashable, TypeVar
+
+from telemetry.metrics import COALESCED_CALLS
+
+T = TypeVar("T")
+
+
+class Flight:
+    def __init__(self, future: asyncio.Future[Any]) -> None:
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Concurrent calls with an equal key share one in-flight computation.
+
+    The first caller starts it and later callers await the same future until it finishes, so they
+    all get its result (or exception). Results are shared and must be treated as read-only. A
+    cancelled caller does not cancel the computation for the others, but once every caller is gone
+    it is cancelled too, so an abandoned request stops its query or solver run. The computation
+    runs in an empty context rather than the leader's, so it never uses request-scoped state such
+    as a session opened by the leader's ``session_scope``, which is closed if the leader goes away.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.in_flight: dict[Hashable, Flight] = {}
+        self.leaders = COALESCED_CALLS.labels(name, "leader")
+        self.followers = COALESCED_CALLS.labels(name, "follower")
+
+    async def run(self, key: Hashable, call: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        try:
+            flight = self.in_flight.get(key)
+        except TypeError:  # unhashable parameters, e.g. nested lists
+            return await call()
+        if flight is None:
+            self.leaders.inc()
+            flight = self.in_flight[key] = Flight(asyncio.create_task(call(), context=contextvars.Context()))
+            flight.future.add_done_callback(lambda _: self.forget(key, flight))
+        else:
+            self.followers.inc()
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.future)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.future.done():
+                # Forgotten before it finishes cancelling, so a new caller starts a fresh flight.
+                self.forget(key, flight)
+                flight.future.cancel()
+
+    def forget(self, key: Hashable, flight: Flight) -> None:
+        """Remove ``flight``, but not a newer flight registered under the same key."""
+        if self.in_flight.get(key) is flight:
+            del self.in_flight[key]
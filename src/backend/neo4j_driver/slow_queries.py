@@ -0,0 +1,148 @@
+import json
+import logging
+import random
+import time
+from logging.handlers import RotatingFileHandler
+from os import environ
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+from loguru import logger
+
+from telemetry.metrics import SLOW_QUERIES_TOTAL
+
+# Plan operators that usually point at a missing index or an accidental cross join.
+FLAGGED_OPERATORS = ("NodeByLabelScan", "AllNodesScan", "CartesianProduct")
+MAX_PARAM_LENGTH = 200
+
+
+def summarize_plan(plan: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a raw PROFILE plan to operator, details, db hits, rows and time per node."""
+    args = plan.get("args", {})
+    return {
+        "operator": plan.get("operatorType", "").split("@")[0],
+        "details": args.get("Details"),
+        "db_hits": plan.get("dbHits", args.get("DbHits", 0)),
+        "rows": plan.get("rows", args.get("Rows", 0)),
+        "time_ms": plan.get("time", args.get("Time", 0)) / 1_000_000,
+        "children": [summarize_plan(child) for child in plan.get("children", [])],
+    }
+
+
+def walk_plan(node: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    yield node
+    for child in node["children"]:
+        yield from walk_plan(child)
+
+
+def compact_params(params: dict[str, Any]) -> dict[str, str]:
+    """Stringify and truncate parameters so large id lists do not bloat the log."""
+    compact = {}
+    for key, value in params.items():
+        text = repr(value)
+        compact[key] = text if len(text) <= MAX_PARAM_LENGTH else f"{text[:MAX_PARAM_LENGTH]}... ({len(text)} chars)"
+    return compact
+
+
+class SlowQueryLog:
+    """Queries slower than ``threshold_ms``, kept as per-query aggregates and appended to a rotating JSONL file.
+
+    A slow query is re-run with ``PROFILE`` at most once per ``profile_interval`` seconds and query name, and
+    only for a ``sample_rate`` share of the slow executions, so the profiling load stays bounded.
+    """
+
+    def __init__(self) -> None:
+        self.threshold_ms = float(environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+        self.sample_rate = float(environ.get("SLOW_QUERY_SAMPLE_RATE", 1.0))
+        self.profile_interval = float(environ.get("SLOW_QUERY_PROFILE_INTERVAL", 60))
+        self.path = Path(environ.get("SLOW_QUERY_LOG", "./logs/slow_queries.jsonl"))
+        self.max_bytes = int(environ.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+        self.backup_count = int(environ.get("SLOW_QUERY_LOG_BACKUPS", 3))
+        self.offenders: dict[str, dict[str, Any]] = {}
+        self.last_profiled: dict[str, float] = {}
+        self.lock = Lock()
+        self.file_logger: logging.Logger | None = None
+
+    def is_slow(self, duration_ms: float) -> bool:
+        return duration_ms >= self.threshold_ms
+
+    def should_profile(self, name: str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_profiled.get(name, -self.profile_interval) < self.profile_interval:
+                return False
+            if random.random() >= self.sample_rate:
+                return False
+            self.last_profiled[name] = now
+            return True
+
+    def record(
+        self,
+        name: str,
+        text: str,
+        duration_ms: float,
+        params: dict[str, Any],
+        plan: dict[str, Any] | None = None,
+        compute_millis: int | None = None,
+    ) -> dict[str, Any]:
+        entry: dict[str, Any] = {
+            "timestamp": time.time(),
+            "query": name,
+            "duration_ms": round(duration_ms, 3),
+            "params": compact_params(params),
+        }
+        if plan is not None:
+            summary = summarize_plan(plan)
+            nodes = list(walk_plan(summary))
+            entry["db_hits"] = sum(node["db_hits"] for node in nodes)
+            entry["rows"] = summary["rows"]
+            entry["flags"] = sorted({node["operator"] for node in nodes if node["operator"] in FLAGGED_OPERATORS})
+            # GDS stream procedures do not yield computeMillis, the ProcedureCall time is the closest equivalent.
+            procedures = [node for node in nodes if node["operator"] == "ProcedureCall"]
+            entry["gds_compute_millis"] = (
+                compute_millis if compute_millis is not None else sum(node["time_ms"] for node in procedures) or None
+            )
+            entry["plan"] = summary
+
+        SLOW_QUERIES_TOTAL.labels(name).inc()
+        logger.warning(f"Slow query {name} took {duration_ms:.0f}ms (threshold {self.threshold_ms:.0f}ms).")
+        with self.lock:
+            offender = self.offenders.setdefault(
+                name, {"query": name, "text": text, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "last": None}
+            )
+            offender["count"] += 1
+            offender["total_ms"] += duration_ms
+            offender["max_ms"] = max(offender["max_ms"], duration_ms)
+            if plan is not None or offender["last"] is None or "plan" not in offender["last"]:
+                offender["last"] = entry
+        self.write(entry)
+        return entry
+
+    def write(self, entry: dict[str, Any]) -> None:
+        try:
+            if self.file_logger is None:
+                self.file_logger = self.open_file_logger()
+            self.file_logger.info(json.dumps(entry, default=str))
+        except OSError as err:
+            logger.error(f"Could not write slow query log {self.path}: {err}")
+
+    def open_file_logger(self) -> logging.Logger:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_logger = logging.getLogger("neo4j_driver.slow_queries")
+        file_logger.handlers = [handler]
+        file_logger.setLevel(logging.INFO)
+        file_logger.propagate = False
+        return file_logger
+
+    def top(self, limit: int = 20) -> list[dict[str, Any]]:
+        with self.lock:
+            offenders = sorted(self.offenders.values(), key=lambda o: o["max_ms"], reverse=True)[:limit]
+            return [o | {"avg_ms": round(o["total_ms"] / o["count"], 3)} for o in offenders]
+
+
+SLOW_QUERIES = SlowQueryLog()
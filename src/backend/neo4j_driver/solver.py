@@ -0,0 +1,52 @@
+"""Exact TSP solves that can be stopped when the request is cancelled.
+
+A worker thread cannot be interrupted, so a cancelled request would keep a core busy
+until python_tsp returns. Matrices of at least ``SOLVER_PROCESS_MIN_SIZE`` cities are
+solved in a child process that is terminated on cancellation; smaller ones finish in
+milliseconds and stay in a thread, which avoids the process start-up.
+"""
+
+import asyncio
+import multiprocessing
+from multiprocessing.connection import Connection
+from os import environ
+from typing import Any
+
+import numpy as np
+from python_tsp.exact import solve_tsp_dynamic_programming
+
+SOLVER_PROCESS_MIN_SIZE = int(environ.get("SOLVER_PROCESS_MIN_SIZE", 9))
+# forkserver children do not inherit the event loop, driver connections or threads of the API.
+CONTEXT = multiprocessing.get_context("forkserver")
+# Imported once by the fork server, so a solver process starts without importing numpy again.
+CONTEXT.set_forkserver_preload([__name__])
+
+
+def solve_in_child(weights: np.ndarray[Any, Any], sender: Connection) -> None:
+    try:
+        sender.send((None, solve_tsp_dynamic_programming(weights)))
+    except Exception as err:
+        sender.send((err, None))
+    finally:
+        sender.close()
+
+
+async def solve_tsp(weights: np.ndarray[Any, Any]) -> tuple[list[int], float]:
+    if len(weights) < SOLVER_PROCESS_MIN_SIZE:
+        return await asyncio.to_thread(solve_tsp_dynamic_programming, weights)  # type: ignore[no-any-return]
+    receiver, sender = CONTEXT.Pipe(duplex=False)
+    process = CONTEXT.Process(target=solve_in_child, args=(weights, sender), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        error, result = await asyncio.to_thread(receiver.recv)
+    except EOFError as err:
+        raise RuntimeError(f"TSP solver process exited with code {process.exitcode}.") from err
+    finally:
+        if process.is_alive():
+            # Also unblocks the receiving thread with an EOFError once the pipe closes.
+            process.terminate()
+        asyncio.get_running_loop().run_in_executor(None, process.join)
+    if error is not None:
+        raise error
+    return result  # type: ignore[no-any-return]
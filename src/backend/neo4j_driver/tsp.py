@@ -4,27 +4,30 @@ import numpy as np
 from loguru import logger
 from python_tsp.exact import solve_tsp_dynamic_programming
 
+from telemetry.metrics import TSP_PHASE_DURATION
+
 from .city_poi import CityPois
 
 
 class TSP:
     def create_weight_matrix(self, cities: list[CityPois]) -> np.ndarray[Any, Any]:
         logger.info("Creating weight matrix...")
-        logger.debug(f"Cities: {cities}")
-        n = len(cities)
-        weights: list[list[float]] = np.full((n, n), np.inf)
-        for i in range(0, n):
-            start = cities[i].city["cityId"]
-            for j in range(i + 1, n):
-                dest = cities[j].city["cityId"]
-                if start == dest:
-                    continue
-                weights[i][j] = self.get_total_distance_between_cities(  # type: ignore[attr-defined]
-                    start=start, dest=dest
-                )
-                weights[j][i] = weights[i][j]
+        logger.debug("Cities: {}", cities)
+        with TSP_PHASE_DURATION.labels("matrix").time():
+            n = len(cities)
+            weights: list[list[float]] = np.full((n, n), np.inf)
+            for i in range(0, n):
+                start = cities[i].city["cityId"]
+                for j in range(i + 1, n):
+                    dest = cities[j].city["cityId"]
+                    if start == dest:
+                        continue
+                    weights[i][j] = self.get_total_distance_between_cities(  # type: ignore[attr-defined]
+                        start=start, dest=dest
+                    )
+                    weights[j][i] = weights[i][j]
         logger.info("Created weight matrix.")
-        logger.debug(f"Matrix: {weights}.")
+        logger.debug("Matrix: {}.", weights)
         return weights
 
     def get_poi_order(self, cities: list[CityPois], permutation: list[int]) -> list[str]:
@@ -38,8 +41,9 @@ class TSP:
         self, weights: np.ndarray[Any, Any], cities: list[CityPois]
     ) -> dict[str, list[str] | float | list[list[float]]]:
         logger.info("Calculated tsp...")
-        permutation, distance = solve_tsp_dynamic_programming(weights)
-        logger.debug(f"Permuation: {permutation}, distance: {distance}")
+        with TSP_PHASE_DURATION.labels("solve").time():
+            permutation, distance = solve_tsp_dynamic_programming(weights)
+        logger.debug("Permuation: {}, distance: {}", permutation, distance)
         return {
             "poi_order": self.get_poi_order(cities, permutation),
             "total_distance": distance,
@@ -62,7 +66,7 @@ class TSP:
     def calculate_shortest_path_fixed_dest(self, poi_ids: list[str]) -> dict[str, list[str] | float]:
         logger.info("Calculating round tour with no return and fixed destination...")
         dest = poi_ids.pop()
-        logger.debug(f"dest: {dest}")
+        logger.debug("dest: {}", dest)
         poi_ids.insert(0, dest)
         tsp_result = self.calculate_shortest_path_no_return(poi_ids)
         tsp_result["poi_order"] = list(reversed(tsp_result["poi_order"]))  # type: ignore[arg-type]
@@ -12,3 +12,6 @@ POI_COLUMNS: list[str] = [
     "poiId",
     "types",
 ]
+
+# POIs fetched per request from /poi/filter, further pages are loaded on demand.
+POI_PAGE_SIZE: int = 200
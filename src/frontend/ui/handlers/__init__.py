@@ -1,6 +1,6 @@
 from .add_poi import AddPoi
 from .delete_poi import DeletePoi
-from .get_request import get_request
+from .get_request import get_dataframe, get_request
 from .itinerary import Itinerary
 from .utils import remove_poi
 from .validators import has_attr, is_column
@@ -10,4 +10,4 @@ class Handler(AddPoi, DeletePoi, Itinerary):
     pass
 
 
-__all__ = ["get_request", "remove_poi", "has_attr", "is_column", "Handler"]
+__all__ = ["get_request", "get_dataframe", "remove_poi", "has_attr", "is_column", "Handler"]
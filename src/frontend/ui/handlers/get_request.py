@@ -1,32 +1,133 @@
+import secrets
 import sys
+from collections import OrderedDict
+from io import BytesIO
 from json import loads
 from os import getenv
+from threading import Lock
 from typing import Any
+from urllib.parse import urlencode
 
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
 from loguru import logger
 from requests import get
-from requests.models import HTTPError
+from requests.models import CaseInsensitiveDict, HTTPError
+
+from telemetry.tracing import CLIENT, Span, start_span
 
 URL = getenv("API_URL")
+# Bytes of response bodies kept for If-None-Match revalidation, shared by all sessions.
+ETAG_CACHE_MAX_BYTES = int(getenv("ETAG_CACHE_MAX_BYTES", 8 * 2**20))
 
 if not URL:
     logger.error("Need the env variable 'API_URL'. Exit now.")
     sys.exit(1)
 
 
+def trace_headers(span: Span) -> dict[str, str]:
+    """Propagate the trace to the API and tag the request with an id that shows up in the API logs.
+
+    ``X-Client-Id`` identifies the browser session, for the API's per-client admission limit.
+    """
+    request_id = secrets.token_hex(8)
+    span.set(**{"request.id": request_id})
+    client_id = st.session_state.setdefault("client_id", secrets.token_hex(8))
+    return {"traceparent": span.traceparent, "X-Request-ID": request_id, "X-Client-Id": client_id}
+
+
+class EtagCache:
+    """Last response per request URL for endpoints that send an ETag, revalidated with If-None-Match.
+
+    The Streamlit sessions of all users share it, so it is an LRU holding at most ``max_bytes`` of
+    response bodies; a body larger than that is not kept.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[str, Any, int]] = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+
+    def get(self, key: str) -> tuple[str, Any] | None:
+        with self.lock:
+            if (entry := self.entries.get(key)) is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key: str, etag: str, content: Any, size: int) -> None:
+        with self.lock:
+            if (old := self.entries.pop(key, None)) is not None:
+                self.size -= old[2]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (etag, content, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self.size -= self.entries.popitem(last=False)[1][2]
+
+
+ETAG_CACHE = EtagCache(ETAG_CACHE_MAX_BYTES)
+
+
 def get_request(target: str, query_params: dict[str, str] | None = None) -> dict[str, Any]:
     logger.info(f"Sending GET request to http://neo4j_api:8080{target} with params: {query_params}")
+    key = f"{target}?{urlencode(query_params or {}, doseq=True)}"
+    cached = ETAG_CACHE.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
     try:
-        response = get(f"{URL}{target}", params=query_params)
+        with start_span(f"GET {target}", CLIENT, **{"url.path": target}) as span:
+            response = get(f"{URL}{target}", params=query_params, headers=headers | trace_headers(span))
+            span.set(**{"http.response.status_code": response.status_code})
         logger.debug(f"Received response returned status code {response.status_code}")
 
         match response.status_code:
             case 200:
                 logger.success(f"GET request to http://neo4j_api:8080{target} succeeded")
-                return loads(response.text)
+                content = loads(response.text)
+                if etag := response.headers.get("ETag"):
+                    ETAG_CACHE.set(key, etag, content, len(response.content))
+                return content
+            case 304 if cached:
+                logger.success(f"GET request to http://neo4j_api:8080{target} not modified, using cached response")
+                return cached[1]
             case _:
                 logger.warning(f"GET request to {target} returned {response.status_code}")
                 raise HTTPError(f"Request did not return 200. It returned {response.status_code}.")
     except Exception as err:
         logger.error(f"GET request to http://neo4j_api:8080{target} failed: {err}")
         raise
+
+
+ARROW = "application/vnd.apache.arrow.stream"
+
+
+def get_dataframe(
+    target: str, query_params: dict[str, Any] | None, rows_key: str
+) -> tuple[pd.DataFrame, CaseInsensitiveDict]:
+    """GET the ``rows_key`` rows of ``target`` as a DataFrame, preferably as an Arrow IPC stream.
+
+    Arrow is loaded without parsing JSON rows; an API without pyarrow answers with JSON instead. The
+    response headers are returned as well, paged endpoints carry X-Next-Cursor / X-Total-Count there.
+    """
+    logger.info(f"Sending GET request to http://neo4j_api:8080{target} with params: {query_params}")
+    try:
+        headers = {"Accept": f"{ARROW}, application/json;q=0.5"}
+        with start_span(f"GET {target}", CLIENT, **{"url.path": target}) as span:
+            response = get(f"{URL}{target}", params=query_params, headers=headers | trace_headers(span))
+            span.set(**{"http.response.status_code": response.status_code})
+        logger.debug(f"Received response returned status code {response.status_code}")
+        if response.status_code != 200:
+            logger.warning(f"GET request to {target} returned {response.status_code}")
+            raise HTTPError(f"Request did not return 200. It returned {response.status_code}.")
+        if response.headers.get("Content-Type", "").startswith(ARROW):
+            df = pa.ipc.open_stream(BytesIO(response.content)).read_pandas()
+        else:
+            df = pd.DataFrame(loads(response.text)[rows_key])
+        logger.success(f"GET request to http://neo4j_api:8080{target} succeeded")
+        return df, response.headers
+    except Exception as err:
+        logger.error(f"GET request to http://neo4j_api:8080{target} failed: {err}")
+        raise
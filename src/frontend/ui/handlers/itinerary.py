@@ -54,7 +54,7 @@ class Itinerary:
     ) -> tuple[pd.DataFrame, float, list[list[float]]]:
         pois = pois.drop_duplicates(subset=["poiId", "label"], keep="first")
         params = self.prepare_params(pois, start, end)
-        logger.warning(params)
+        logger.debug("Fixed destination itinerary params: {}", params)
         itinerary = get_request("/tsp/shortest-path-fixed-dest", params)
         return itinerary["poi_order"], itinerary["total_distance"], itinerary["route"]
 
@@ -20,6 +20,8 @@ STATES: list[StateSpec] = [
     StateSpec("add_point", None),
     StateSpec("route", init_empty_df()),
     StateSpec("old_params", {}),
+    StateSpec("next_cursor", None),
+    StateSpec("pois_total", None),
     StateSpec("itinerary_type", ""),
     StateSpec("start_city", ""),
     StateSpec("dest_city", ""),
@@ -69,7 +69,7 @@ class Map:
         )
 
     def create_route_edges(self) -> pdk.Layer:
-        logger.warning(st.session_state.route_coords)
+        logger.debug("Route with {} coordinates.", len(st.session_state.route_coords))
         route = pdk.Layer(
             "PathLayer",
             id="route-edges",
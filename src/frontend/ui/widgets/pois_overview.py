@@ -1,8 +1,8 @@
 import pandas as pd
 import streamlit as st
 from loguru import logger
-from ui.config import POI_COLUMNS
-from ui.handlers import get_request
+from ui.config import POI_COLUMNS, POI_PAGE_SIZE
+from ui.handlers import get_dataframe
 from ui.utils import init_empty_df, select_overview_df
 
 
@@ -15,16 +15,10 @@ class PoisOverview:
                 "types": st.session_state.categories or "",
                 "radius": st.session_state.radius * 1000,
             }
-            if params != st.session_state.old_params:
-                try:
-                    pois = get_request("/poi/filter", params).get("pois", {})
-                    logger.warning(pois)
-                    st.session_state.overview = pd.DataFrame(pois, columns=POI_COLUMNS) if pois else init_empty_df()
-                    st.session_state.overview.fillna("", inplace=True)
-                    st.session_state.old_params = params
-                    logger.info("Initalized poi overview.")
-                except Exception:
-                    logger.error("Failed to get '/poi/filter' form the server.")
+            if params != st.session_state.old_params and (pois := self.load_page(params)) is not None:
+                st.session_state.overview = pois
+                st.session_state.old_params = params
+                logger.info("Initalized poi overview.")
 
         key = "overview-pois"
         _ = st.dataframe(
@@ -58,3 +52,30 @@ class PoisOverview:
             selection_mode="single-row",
             placeholder="-",
         )
+        if st.session_state.next_cursor:
+            st.caption(f"Showing {len(st.session_state.overview)} of {st.session_state.pois_total} POIs.")
+            st.button("Load more", key="overview-load-more", on_click=self.load_more)
+
+    def load_page(self, params: dict, cursor: str | None = None) -> pd.DataFrame | None:
+        """Fetch one page of /poi/filter (Arrow if the API offers it), the total only comes with the first page."""
+        page_params = params | {
+            "limit": POI_PAGE_SIZE,
+            "cursor": cursor,
+            "with_total": "true" if cursor is None else None,
+        }
+        try:
+            pois, headers = get_dataframe("/poi/filter", page_params, "pois")
+        except Exception:
+            logger.error("Failed to get '/poi/filter' form the server.")
+            return None
+        logger.debug(f"Received {len(pois)} POIs.")
+        st.session_state.next_cursor = headers.get("X-Next-Cursor")
+        if (total := headers.get("X-Total-Count")) is not None:
+            st.session_state.pois_total = int(total)
+        df = pois.reindex(columns=POI_COLUMNS) if len(pois) else init_empty_df()
+        df.fillna("", inplace=True)
+        return df
+
+    def load_more(self) -> None:
+        if (pois := self.load_page(st.session_state.old_params, st.session_state.next_cursor)) is not None:
+            st.session_state.overview = pd.concat([st.session_state.overview, pois], ignore_index=True)
@@ -1,16 +1,157 @@
+"""Shared loguru configuration.
+
+Records are written by loguru's background thread (``enqueue=True``), in the coloured
+text format or as one JSON object per line (``LOG_FORMAT=json``). Levels can be set
+per module prefix, high-frequency debug call sites can be rate limited and whole levels
+can be sampled, so the cost of logging stays flat under load. Pass values as
+arguments (``logger.debug("Matrix: {}", weights)``) rather than f-strings: loguru
+only formats them when a record can be emitted.
+"""
+
 import inspect
+import json
 import logging
+import random
 import sys
+import traceback
 from os import getenv
+from threading import Lock
+from time import monotonic
+from typing import Any
 
 from loguru import logger
 
-logger.level("WARN", no=30, color="<yellow>")
-logger.level("PASS", no=20, color="<green>")
+for name, no, color in (("WARN", 30, "<yellow>"), ("PASS", 20, "<green>")):
+    try:
+        logger.level(name)
+    except ValueError:  # not registered yet
+        logger.level(name, no=no, color=color)
 
 logger.warning = lambda msg, *args, **kwargs: logger.opt(depth=1).log("WARN", msg, *args, **kwargs)
 logger.success = lambda msg, *args, **kwargs: logger.opt(depth=1).log("PASS", msg, *args, **kwargs)
 
+LOG_FORMAT = getenv("LOG_FORMAT", "text")
+LOG_LEVEL = getenv("LOG_LEVEL", "INFO")
+# Records per DEBUG/TRACE call site and window, 0 (the default) for no limit.
+LOG_RATE_LIMIT = int(getenv("LOG_RATE_LIMIT", 0))
+LOG_RATE_WINDOW = float(getenv("LOG_RATE_WINDOW", 1))
+LOG_MAX_LENGTH = int(getenv("LOG_MAX_LENGTH", 2000))
+
+TEXT_FORMAT = (
+    "<light-green>{time:YYYY-MM-DD--HH:mm:ss}</light-green> "
+    "| <level>{level: <5}</level> | "
+    "<light-cyan>{name}:{function}:{line} </light-cyan> - "
+    "{message}"
+)
+
+
+def parse_mapping(value: str) -> dict[str, str]:
+    """``"neo4j_driver=WARNING,neo4j_api=DEBUG"`` -> ``{"neo4j_driver": "WARNING", "neo4j_api": "DEBUG"}``."""
+    return {key.strip(): item.strip() for key, _, item in (part.partition("=") for part in value.split(",")) if item}
+
+
+def level_no(level: str | int) -> int:
+    return level if isinstance(level, int) else logger.level(level.upper()).no
+
+
+# Per module prefix, e.g. LOG_LEVELS="neo4j_driver=WARNING,neo4j_api.routes=DEBUG".
+LOG_LEVELS = {name: level_no(level) for name, level in parse_mapping(getenv("LOG_LEVELS", "")).items()}
+# Share of records kept per level, e.g. LOG_SAMPLING="DEBUG=0.1".
+LOG_SAMPLING = {level.upper(): float(ratio) for level, ratio in parse_mapping(getenv("LOG_SAMPLING", "")).items()}
+
+
+def truncate(text: str, limit: int = LOG_MAX_LENGTH) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}... ({len(text) - limit} characters truncated)"
+
+
+class LogFilter:
+    """Per-module levels, level sampling and a per call site rate limit.
+
+    At most ``rate_limit`` DEBUG or TRACE records per call site are let through per
+    ``window`` seconds; the first record of the next window reports how many were
+    suppressed. INFO and above, which includes the uvicorn access log, are never rate
+    limited, and errors are never sampled.
+    """
+
+    def __init__(
+        self,
+        level: str | int = LOG_LEVEL,
+        levels: dict[str, int] | None = None,
+        sampling: dict[str, float] | None = None,
+        rate_limit: int = LOG_RATE_LIMIT,
+        window: float = LOG_RATE_WINDOW,
+    ) -> None:
+        self.level = level_no(level)
+        # Longest prefix first, so "neo4j_api.routes" wins over "neo4j_api".
+        self.levels = sorted((levels or {}).items(), key=lambda item: -len(item[0]))
+        self.sampling = sampling or {}
+        self.rate_limit = rate_limit
+        self.window = window
+        self.module_levels: dict[str, int] = {}
+        self.sites: dict[tuple[str, int], list[float]] = {}
+        self.lock = Lock()
+
+    @property
+    def min_level(self) -> int:
+        return min([self.level, *(level for _, level in self.levels)])
+
+    def level_for(self, name: str) -> int:
+        if (level := self.module_levels.get(name)) is None:
+            level = next(
+                (level for prefix, level in self.levels if name == prefix or name.startswith(f"{prefix}.")),
+                self.level,
+            )
+            self.module_levels[name] = level
+        return level
+
+    def __call__(self, record: dict[str, Any]) -> bool:
+        level = record["level"]
+        if level.no < self.level_for(record["name"] or ""):
+            return False
+        if level.no >= logging.ERROR:
+            return True
+        if (ratio := self.sampling.get(level.name)) is not None and random.random() >= ratio:
+            return False
+        if self.rate_limit <= 0 or level.no >= logging.INFO:
+            return True
+        now = monotonic()
+        with self.lock:
+            site = self.sites.setdefault((record["file"].path, record["line"]), [now, 0, 0])
+            if now - site[0] >= self.window:
+                if site[2]:
+                    record["extra"]["suppressed"] = int(site[2])
+                site[:] = [now, 0, 0]
+            site[1] += 1
+            if site[1] > self.rate_limit:
+                site[2] += 1
+                return False
+        return True
+
+
+def serialize(record: dict[str, Any]) -> str:
+    document = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": truncate(record["message"]),
+    }
+    for key, value in record["extra"].items():
+        if not key.startswith("_"):
+            document[key] = value if isinstance(value, (int, float, bool)) or value is None else truncate(str(value))
+    if record["exception"] is not None:
+        exception = record["exception"]
+        document["exception"] = "".join(
+            traceback.format_exception(exception.type, exception.value, exception.traceback)
+        )
+    return json.dumps(document, ensure_ascii=False, default=str)
+
+
+def json_format(record: dict[str, Any]) -> str:
+    record["extra"]["_json"] = serialize(record)
+    return "{extra[_json]}\n"
+
 
 class InterceptHandler(logging.Handler):
     def emit(self, record: logging.LogRecord) -> None:
@@ -37,18 +178,18 @@ class InterceptHandler(logging.Handler):
         logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
-logger.remove(0)
+LOG_FILTER = LogFilter(LOG_LEVEL, LOG_LEVELS, LOG_SAMPLING)
+
+logger.remove()
 
 if getenv("LOG_HI", True):
     logger.add(
         sink=sys.stderr,
-        colorize=True,
+        colorize=LOG_FORMAT != "json",
         enqueue=True,
-        format=(
-            "<light-green>{time:YYYY-MM-DD--HH:mm:ss}</light-green> "
-            "| <level>{level: <5}</level> | "
-            "<light-cyan>{name}:{function}:{line} </light-cyan> - "
-            "{message}"
-        ),
+        # The sink level lets loguru skip formatting records below every configured level.
+        level=LOG_FILTER.min_level,
+        filter=LOG_FILTER,
+        format=json_format if LOG_FORMAT == "json" else TEXT_FORMAT,
     )
-logging.basicConfig(handlers=[InterceptHandler()], level=getenv("LOG_LEVEL", 0), force=True)
+logging.basicConfig(handlers=[InterceptHandler()], level=LOG_FILTER.min_level, force=True)
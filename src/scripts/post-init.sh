@@ -131,4 +131,34 @@ CALL gds.graph.project(
 );
 "
 
+# ------------------------------------------------------------
+# 4. Missing POI city/label as "", so every POI is in the
+#    keyset pagination index below
+# ------------------------------------------------------------
+execute_cypher "poi_city_label_not_null" "
+CALL apoc.periodic.iterate(
+    'MATCH (p:POI)
+    WHERE p.city IS NULL OR p.label IS NULL
+    RETURN p',
+    'SET p.city = coalesce(p.city, \"\"), p.label = coalesce(p.label, \"\")',
+    { batchSize: 2000, parallel: false }
+);
+"
+
+# ------------------------------------------------------------
+# 5. Composite index backing the keyset pagination of POIs
+# ------------------------------------------------------------
+execute_cypher "poi_city_label_id_index" "
+CREATE RANGE INDEX poi_city_label_id IF NOT EXISTS
+FOR (p:POI) ON (p.city, p.label, p.poiId);
+"
+
+# ------------------------------------------------------------
+# 6. Unique poiId, backs single and batch POI lookups
+# ------------------------------------------------------------
+execute_cypher "poi_poi_id_unique" "
+CREATE CONSTRAINT poi_poi_id IF NOT EXISTS
+FOR (p:POI) REQUIRE p.poiId IS UNIQUE;
+"
+
 echo "All post-import steps complete."
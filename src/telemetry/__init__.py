@@ -0,0 +1,3 @@
+from .metrics import CONTENT_TYPE, render
+
+__all__ = ["CONTENT_TYPE", "render"]
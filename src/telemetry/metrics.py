@@ -0,0 +1,288 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Every metric keeps one child per label combination. Children are cached, so the
+hot path is a dict lookup plus a float add (or a bisect for histograms), which
+keeps instrumentation in the low microseconds.
+"""
+
+from bisect import bisect_left
+from math import inf
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = Lock()
+        REGISTRY.register(self)
+
+    def labels(self, *values: str) -> object:
+        try:
+            return self._children[values]
+        except KeyError:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}.")
+            with self._lock:
+                return self._children.setdefault(values, self._new_child())
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from self._collect_child(values, child)
+
+    def _collect_child(self, values: tuple[str, ...], child: object) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def track_inprogress(self) -> "_InProgress":
+        return _InProgress(self)
+
+
+class _InProgress:
+    __slots__ = ("child",)
+
+    def __init__(self, child: _Value) -> None:
+        self.child = child
+
+    def __enter__(self) -> None:
+        self.child.value += 1
+
+    def __exit__(self, *exc: object) -> None:
+        self.child.value -= 1
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def labels(self, *values: str) -> _Value:  # type: ignore[override]
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _collect_child(self, values: tuple[str, ...], child: object) -> Iterator[str]:
+        yield f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"  # type: ignore
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def collect(self) -> Iterator[str]:
+        if self.callback is not None:
+            for values, value in self.callback().items():
+                self.labels(*values).set(value)
+        yield from super().collect()
+
+    def _collect_child(self, values: tuple[str, ...], child: object) -> Iterator[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"  # type: ignore
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self.child = child
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.child.observe(perf_counter() - self.start)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def labels(self, *values: str) -> _HistogramChild:  # type: ignore[override]
+        return super().labels(*values)  # type: ignore[return-value]
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def _collect_child(self, values: tuple[str, ...], child: object) -> Iterator[str]:
+        assert isinstance(child, _HistogramChild)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (inf,), child.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}"
+        yield f"{self.name}_sum{_format_labels(self.labelnames, values)} {_format_value(child.sum)}"
+        yield f"{self.name}_count{_format_labels(self.labelnames, values)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- API ----------------------------------------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route template.", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+CANCELLED_REQUESTS = Counter(
+    "http_requests_cancelled", "Requests cancelled by client disconnect or deadline.", ("route", "reason")
+)
+ADMISSION_ACTIVE = Gauge("admission_active", "Requests holding a slot of an admission cost class.", ("cost_class",))
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for a slot of an admission cost class.", ("cost_class",))
+ADMISSION_REJECTED = Counter(
+    "admission_rejected", "Requests refused by admission control by reason.", ("cost_class", "reason")
+)
+
+# --- Neo4j driver -------------------------------------------------------------------------------------------------
+
+QUERY_DURATION = Histogram("neo4j_query_duration_seconds", "Latency of Cypher queries by query name.", ("query",))
+QUERY_ROWS = Counter("neo4j_query_rows", "Records returned by Cypher queries by query name.", ("query",))
+QUERY_ERRORS = Counter("neo4j_query_errors", "Failed Cypher queries by query name.", ("query",))
+SLOW_QUERIES_TOTAL = Counter("neo4j_slow_queries", "Cypher queries above the slow query threshold.", ("query",))
+SESSIONS_ACTIVE = Gauge("neo4j_sessions_active", "Open sessions, each holding a pooled Bolt connection.", ("driver",))
+POOL_MAX_SIZE = Gauge("neo4j_pool_max_size", "Configured maximum size of the Bolt connection pool.", ("driver",))
+
+# --- Solver -------------------------------------------------------------------------------------------------------
+
+TSP_PHASE_DURATION = Histogram(
+    "tsp_phase_duration_seconds", "Time spent per TSP phase (matrix build or solve).", ("phase",)
+)
+
+# --- Request coalescing -------------------------------------------------------------------------------------------
+
+COALESCED_CALLS = Counter(
+    "singleflight_calls",
+    "Calls by single-flight group and role (leader ran the computation, follower shared its result).",
+    ("group", "role"),
+)
+LOADER_KEYS = Counter(
+    "batch_loader_keys",
+    "Keys requested from request-scoped batch loaders by loader and result (batched into a query or memoized).",
+    ("loader", "result"),
+)
+LOADER_BATCHES = Counter(
+    "batch_loader_batches", "Batch queries dispatched by request-scoped batch loaders.", ("loader",)
+)
+
+# --- Caches -------------------------------------------------------------------------------------------------------
+
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Cache lookups by cache and result (hit, stale or miss).", ("cache", "result")
+)
+CACHE_EVICTIONS = Counter("cache_evictions", "Entries evicted to stay within the cache size limit.", ("cache",))
+CACHE_BYTES = Gauge("cache_bytes", "Bytes currently held by size-bounded caches.", ("cache",))
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio",
+    "Share of cache lookups served from the cache.",
+    ("cache",),
+    callback=lambda: _cache_hit_ratios(),
+)
+
+
+def _cache_hit_ratios() -> dict[tuple[str, ...], float]:
+    totals: dict[str, list[float]] = {}
+    for (cache, result), child in list(CACHE_REQUESTS._children.items()):
+        hits_and_total = totals.setdefault(cache, [0.0, 0.0])
+        hits_and_total[1] += child.value  # type: ignore[attr-defined]
+        if result in ("hit", "stale"):
+            hits_and_total[0] += child.value  # type: ignore[attr-defined]
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,219 @@
+"""Minimal OpenTelemetry-compatible tracing.
+
+Spans carry W3C trace context (``traceparent``) across processes and are exported
+in the OTLP/JSON encoding, either appended to a file (one ``resourceSpans`` document
+per line, the format of the collector's file exporter) or posted to an OTLP/HTTP
+collector. Export runs on a background thread with a bounded queue; when it is
+full, spans are dropped rather than slowing down requests.
+
+    with start_span("tsp.solve", cities=12):
+        ...
+"""
+
+import json
+import random
+import secrets
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import environ
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import time_ns
+from typing import Any, Iterator
+from urllib.request import Request, urlopen
+
+from .metrics import Counter
+
+TRACING_EXPORTER = environ.get("TRACING_EXPORTER", "none")  # none, file or otlp
+TRACING_FILE = Path(environ.get("TRACING_FILE", "./logs/traces.jsonl"))
+TRACING_SAMPLE_RATIO = float(environ.get("TRACING_SAMPLE_RATIO", 1.0))
+TRACING_QUEUE_SIZE = int(environ.get("TRACING_QUEUE_SIZE", 2048))
+TRACING_BATCH_SIZE = 256
+TRACING_EXPORT_INTERVAL = float(environ.get("TRACING_EXPORT_INTERVAL", 2))
+OTLP_ENDPOINT = environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/") + "/v1/traces"
+SERVICE_NAME = environ.get("OTEL_SERVICE_NAME", "holiday-itinerary")
+
+SPANS_DROPPED = Counter("trace_spans_dropped", "Spans dropped because the export queue was full or export failed.")
+
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        sampled: bool,
+        kind: int = INTERNAL,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.status = STATUS_OK
+        self.message = ""
+        self.start = time_ns()
+        self.end = 0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, err: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(err).__name__}: {err}"
+
+    def finish(self) -> None:
+        self.end = time_ns()
+        if self.sampled:
+            EXPORTER.submit(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    def value(item: Any) -> dict[str, Any]:
+        if isinstance(item, bool):
+            return {"boolValue": item}
+        if isinstance(item, int):
+            return {"intValue": str(item)}
+        if isinstance(item, float):
+            return {"doubleValue": item}
+        return {"stringValue": str(item)}
+
+    return [{"key": key, "value": value(item)} for key, item in attributes.items() if item is not None]
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """``(trace_id, parent_span_id, sampled)`` of a version 00 ``traceparent`` header, ``None`` if invalid."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or parts[0] != "00" or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), (flags := int(parts[3], 16))
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def new_span(name: str, kind: int = INTERNAL, traceparent: str | None = None, **attributes: Any) -> Span:
+    """Child of the current span, of ``traceparent`` if given, or the root of a new trace."""
+    if (remote := parse_traceparent(traceparent)) is not None:
+        trace_id, parent_id, sampled = remote
+    elif (parent := _current_span.get()) is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = TRACING_EXPORTER != "none" and random.random() < TRACING_SAMPLE_RATIO
+    return Span(name, trace_id, parent_id, sampled, kind, attributes)
+
+
+@contextmanager
+def start_span(name: str, kind: int = INTERNAL, traceparent: str | None = None, **attributes: Any) -> Iterator[Span]:
+    """Run the block in a new span that is the current span for everything started inside it."""
+    span = new_span(name, kind, traceparent, **attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as err:
+        span.record_error(err)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish()
+
+
+class SpanExporter:
+    def __init__(self, kind: str = TRACING_EXPORTER) -> None:
+        self.kind = kind
+        self.queue: Queue[Span] = Queue(TRACING_QUEUE_SIZE)
+        self.thread: Thread | None = None
+        self.lock = Lock()
+        self.dropped = SPANS_DROPPED.labels()
+
+    def submit(self, span: Span) -> None:
+        if self.kind == "none":
+            return
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(span)
+        except Full:
+            self.dropped.inc()
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self.run, name="span-exporter", daemon=True)
+                self.thread.start()
+
+    def run(self) -> None:
+        while True:
+            try:
+                batch = [self.queue.get(timeout=TRACING_EXPORT_INTERVAL)]
+            except Empty:
+                continue
+            while len(batch) < TRACING_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            self.export(batch)
+
+    def export(self, spans: list[Span]) -> None:
+        document = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": otlp_attributes({"service.name": SERVICE_NAME})},
+                    "scopeSpans": [{"scope": {"name": "telemetry.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+                }
+            ]
+        }
+        try:
+            if self.kind == "file":
+                TRACING_FILE.parent.mkdir(parents=True, exist_ok=True)
+                with TRACING_FILE.open("a", encoding="utf-8") as file:
+                    file.write(json.dumps(document) + "\n")
+            elif self.kind == "otlp":
+                request = Request(
+                    OTLP_ENDPOINT, data=json.dumps(document).encode(), headers={"Content-Type": "application/json"}
+                )
+                with urlopen(request, timeout=5):
+                    pass
+        except OSError:
+            self.dropped.inc(len(spans))
+
+
+EXPORTER = SpanExporter()
@@ -0,0 +1,85 @@
+import json
+import logging
+
+from loguru import logger
+
+from logger.logger import LogFilter, json_format, level_no, truncate
+
+
+def collect(log_filter):
+    lines = []
+    handler = logger.add(lines.append, level=log_filter.min_level, filter=log_filter, format=json_format)
+    return lines, handler
+
+
+def test_per_module_levels():
+    log_filter = LogFilter("WARNING", {"tests.logger_tests": level_no("DEBUG")}, rate_limit=0)
+    assert log_filter.level_for("tests.logger_tests.logger_test") == level_no("DEBUG")
+    assert log_filter.level_for("neo4j_driver.base") == level_no("WARNING")
+    assert log_filter.min_level == level_no("DEBUG")
+
+
+def test_json_records_and_truncation():
+    lines, handler = collect(LogFilter("DEBUG", rate_limit=0))
+    try:
+        logger.bind(request_id="abc").debug("Matrix: {}", "x" * 5000)
+    finally:
+        logger.remove(handler)
+    record = json.loads(lines[0])
+    assert record["level"] == "DEBUG"
+    assert record["request_id"] == "abc"
+    assert record["message"] == truncate("Matrix: " + "x" * 5000)
+    assert record["message"].endswith("characters truncated)")
+
+
+def hot_path(i):
+    logger.debug("hot path {}", i)
+
+
+def test_rate_limit_reports_suppressed_records():
+    log_filter = LogFilter("DEBUG", rate_limit=2, window=60)
+    lines, handler = collect(log_filter)
+    try:
+        for i in range(5):
+            hot_path(i)
+        for site in log_filter.sites.values():
+            site[0] -= 60  # the window is over
+        hot_path(5)
+    finally:
+        logger.remove(handler)
+    records = [json.loads(line) for line in lines]
+    assert [record["message"] for record in records] == ["hot path 0", "hot path 1", "hot path 5"]
+    assert records[2]["suppressed"] == 3
+
+
+def test_info_and_access_log_are_never_rate_limited():
+    lines, handler = collect(LogFilter("DEBUG", rate_limit=1, window=60))
+    access = logging.getLogger("uvicorn.access")  # reaches loguru through the root InterceptHandler
+    try:
+        for i in range(3):
+            logger.info("info {}", i)
+            logger.warning("warning {}", i)
+            access.info("GET /health %d", i)
+    finally:
+        logger.remove(handler)
+    assert len(lines) == 9
+
+
+def test_rate_limit_is_off_by_default():
+    lines, handler = collect(LogFilter("DEBUG"))
+    try:
+        for i in range(50):
+            hot_path(i)
+    finally:
+        logger.remove(handler)
+    assert len(lines) == 50
+
+
+def test_errors_are_never_sampled():
+    lines, handler = collect(LogFilter("DEBUG", sampling={"DEBUG": 0.0, "ERROR": 0.0}, rate_limit=0))
+    try:
+        logger.debug("dropped")
+        logger.error("kept")
+    finally:
+        logger.remove(handler)
+    assert [json.loads(line)["message"] for line in lines] == ["kept"]
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.backend.neo4j_api.admission import SOLVER, TRAVERSAL, CostClass, run_admitted, tsp_cost
+
+
+def make_request(host="1.2.3.4", headers=None):
+    return SimpleNamespace(client=SimpleNamespace(host=host), headers=headers or {})
+
+
+def test_defaults_admit_everything_the_routes_accept(client, mock_driver):
+    mock_driver.get_roundtrip.return_value = {"paths": []}
+    poi_ids = "&".join(f"poi_ids={i}" for i in range(20))
+    assert client.get(f"/tsp/shortest-round-tour?{poi_ids}").status_code == 200
+    assert client.get("/travel/around/paris?distance=500&distance_tol=50&max_hops=10").status_code == 200
+
+
+def test_infeasible_tsp_is_refused(client, mock_driver, monkeypatch):
+    monkeypatch.setattr(SOLVER, "max_cost", 12**2 * 2**12)
+    poi_ids = "&".join(f"poi_ids={i}" for i in range(20))
+    response = client.get(f"/tsp/shortest-round-tour?{poi_ids}")
+    assert response.status_code == 422
+    assert "too expensive" in response.json()["detail"]
+    mock_driver.calculate_shortest_round_tour.assert_not_called()
+
+
+def test_infeasible_roundtrip_is_refused(client, mock_driver, monkeypatch):
+    monkeypatch.setattr(TRAVERSAL, "max_cost", 5**8)
+    response = client.get("/travel/around/paris?distance=500&distance_tol=50&max_hops=10")
+    assert response.status_code == 422
+    mock_driver.get_roundtrip.assert_not_called()
+
+
+def test_tsp_cost_counts_distinct_pois():
+    assert tsp_cost(["a", "b", "a"]) == 2**2 * 2**2
+
+
+def test_queue_full_and_per_client_limit():
+    cost_class = CostClass("test", slots=1, max_queue=1, max_cost=10)
+
+    async def hold(request, release):
+        async with cost_class.admit(request, 1):
+            await release.wait()
+
+    async def main():
+        release = asyncio.Event()
+        holders = [asyncio.ensure_future(hold(make_request(f"client-{i}"), release)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert cost_class.active == 1 and len(cost_class.waiters) == 1
+
+        with pytest.raises(HTTPException) as queue_full:
+            async with cost_class.admit(make_request("client-2"), 1):
+                pass
+        assert queue_full.value.status_code == 503
+        assert int(queue_full.value.headers["Retry-After"]) >= 1
+
+        release.set()
+        await asyncio.gather(*holders)
+        assert cost_class.active == 0 and not cost_class.waiters and not cost_class.clients
+
+    asyncio.run(main())
+
+
+def test_per_client_limit(monkeypatch):
+    monkeypatch.setattr("src.backend.neo4j_api.admission.ADMISSION_PER_CLIENT", 1)
+    cost_class = CostClass("test", slots=4, max_queue=4, max_cost=10)
+
+    async def main():
+        async with cost_class.admit(make_request(), 1):
+            with pytest.raises(HTTPException) as too_many:
+                async with cost_class.admit(make_request(), 1):
+                    pass
+        assert too_many.value.status_code == 429
+
+    asyncio.run(main())
+
+
+def test_per_client_limit_is_off_by_default():
+    cost_class = CostClass("test", slots=4, max_queue=4, max_cost=10)
+
+    async def main():
+        async with cost_class.admit(make_request(), 1), cost_class.admit(make_request(), 1):
+            async with cost_class.admit(make_request(), 1):
+                assert cost_class.active == 3
+
+    asyncio.run(main())
+
+
+def test_per_client_limit_counts_client_ids_not_addresses(monkeypatch):
+    monkeypatch.setattr("src.backend.neo4j_api.admission.ADMISSION_PER_CLIENT", 1)
+    cost_class = CostClass("test", slots=4, max_queue=4, max_cost=10)
+
+    async def main():
+        async with cost_class.admit(make_request(headers={"x-client-id": "session-a"}), 1):
+            async with cost_class.admit(make_request(headers={"x-client-id": "session-b"}), 1):
+                with pytest.raises(HTTPException) as too_many:
+                    async with cost_class.admit(make_request(headers={"x-client-id": "session-a"}), 1):
+                        pass
+        assert too_many.value.status_code == 429
+
+    asyncio.run(main())
+
+
+def test_identical_requests_share_one_slot():
+    cost_class = CostClass("test", slots=1, max_queue=0, max_cost=10)
+    calls = []
+
+    async def solve():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "tour"
+
+    async def main():
+        return await asyncio.gather(
+            *(run_admitted(cost_class, make_request(f"client-{i}"), 1, ("tour", "a", "b"), solve) for i in range(3))
+        )
+
+    assert asyncio.run(main()) == ["tour", "tour", "tour"]
+    assert len(calls) == 1
+
+
+def test_queue_timeout_gives_up_the_place(monkeypatch):
+    monkeypatch.setattr("src.backend.neo4j_api.admission.ADMISSION_QUEUE_TIMEOUT", 0.01)
+    cost_class = CostClass("test", slots=1, max_queue=4, max_cost=10)
+
+    async def main():
+        async with cost_class.admit(make_request("a"), 1):
+            with pytest.raises(HTTPException) as timed_out:
+                async with cost_class.admit(make_request("b"), 1):
+                    pass
+        assert timed_out.value.status_code == 503
+        assert cost_class.active == 0 and not cost_class.waiters
+
+    asyncio.run(main())
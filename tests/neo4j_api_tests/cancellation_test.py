@@ -0,0 +1,67 @@
+import asyncio
+
+from src.backend.neo4j_api.cancellation import CancellationMiddleware
+
+
+def slow_app(cancelled):
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    return app
+
+
+def run(app, headers=(), disconnect_after=None):
+    sent = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(disconnect_after if disconnect_after is not None else 10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/slow", "headers": list(headers)}
+    asyncio.run(asyncio.wait_for(CancellationMiddleware(app)(scope, receive, send), 2))
+    return sent
+
+
+def test_disconnect_cancels_the_handler():
+    cancelled = []
+    sent = run(slow_app(cancelled), disconnect_after=0.01)
+    assert cancelled == [True]
+    assert sent == []
+
+
+def test_deadline_cancels_the_handler_with_504():
+    cancelled = []
+    sent = run(slow_app(cancelled), headers=[(b"x-request-timeout", b"0.01")])
+    assert cancelled == [True]
+    assert sent[0]["status"] == 504
+
+
+def test_completed_request_is_not_cancelled(client, mock_driver):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    response = client.get("/poi/types", headers={"X-Request-Timeout": "5"})
+    assert response.status_code == 200
+    assert response.json() == {"types": ["Museum"]}
+
+
+def test_deadline_through_the_api(client, mock_driver):
+    async def slow_types():
+        await asyncio.sleep(1)
+
+    mock_driver.get_types.side_effect = slow_types
+    response = client.get("/poi/types", headers={"X-Request-Timeout": "0.05"})
+    assert response.status_code == 504
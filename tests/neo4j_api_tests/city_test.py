@@ -0,0 +1,24 @@
+import pytest  # noqa F401
+from neo4j_driver.poi import PoisWithoutCity
+
+
+def test_get_city_by_coordinates(client, mock_driver):
+    mock_driver.get_nearest_city_by_coordinates.return_value = {"city": {"cityId": "75056"}, "distance_km": 0.5}
+    response = client.get("/city/48.86/2.35")
+    assert response.status_code == 200
+    assert response.json() == {"city": {"cityId": "75056"}, "distance_km": 0.5}
+    mock_driver.get_nearest_city_by_coordinates.assert_called_once_with(48.86, 2.35)
+
+
+def test_get_city_by_coordinates_without_cities(client, mock_driver):
+    mock_driver.get_nearest_city_by_coordinates.return_value = None
+    response = client.get("/city/-48.86/-2.35")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No city found near (-48.86, -2.35)."
+
+
+def test_pois_without_city(client, mock_driver):
+    mock_driver.calculate_shortest_round_tour.side_effect = PoisWithoutCity(["p1"])
+    response = client.get("/tsp/shortest-round-tour?poi_ids=p1&poi_ids=p2")
+    assert response.status_code == 422
+    assert response.json() == {"detail": "No city found for poiIds: p1.", "without_city": ["p1"]}
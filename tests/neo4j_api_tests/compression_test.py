@@ -0,0 +1,46 @@
+import gzip
+from json import loads
+from unittest.mock import MagicMock
+
+from src.backend.neo4j_api.compression import choose_encoding
+
+POIS = [
+    {"poiId": f"poi-{i}", "label": "Musée", "city": "Paris", "types": ["Museum", "PointOfInterest"]} for i in range(100)
+]
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("") is None
+
+
+def test_large_response_is_gzipped(client, mock_driver):
+    mock_driver.get_filtered_pois.return_value = {"pois": POIS}
+    response = client.get("/poi/filter?locations=Paris&types=Museum", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == {"pois": POIS}
+
+
+def test_small_response_is_not_compressed(client, mock_driver):
+    response = client.get("/poi?poi_id=311be560-f8aa-3c3a-8d06-b24cb6809f57", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_stream_is_gzipped_per_chunk(client, mock_driver):
+    async def pois():
+        for poi in POIS:
+            yield poi
+
+    mock_driver.iter_filtered_pois = MagicMock(return_value=pois())
+    with client.stream(
+        "GET", "/poi/filter/stream?locations=Paris&types=Museum", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        body = gzip.decompress(b"".join(response.iter_raw()))
+    assert [loads(line) for line in body.splitlines()] == POIS
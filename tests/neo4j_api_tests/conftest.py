@@ -1,14 +1,20 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from src.backend.neo4j_api import app
+from src.backend.neo4j_api.response_cache import RESPONSE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    RESPONSE_CACHE.clear()
 
 
 @pytest.fixture
 def mock_driver(monkeypatch):
-    driver_mock = MagicMock()
+    driver_mock = AsyncMock()
     driver_mock.get_poi.return_value = {
         "id": "311be560-f8aa-3c3a-8d06-b24cb6809f57",
         "lat": 48.87621,
@@ -33,6 +39,7 @@ def mock_driver(monkeypatch):
             "0b155dd7-9f4b-3b69-a221-42b4ae3c0f4c",
         ],
         "total_distance": 13121.616547681424,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764], [2.3522, 48.8566]],
     }
     driver_mock.calculate_shortest_path_no_return.return_value = {
         "poi_order": [
@@ -41,6 +48,7 @@ def mock_driver(monkeypatch):
             "0b155dd7-9f4b-3b69-a221-42b4ae3c0f4c",
         ],
         "total_distance": 7610.976060550933,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764]],
     }
     driver_mock.calculate_shortest_path_fixed_dest.return_value = {
         "poi_order": [
@@ -49,8 +57,9 @@ def mock_driver(monkeypatch):
             "8e795fb1-0f36-34ca-ba08-1784a50cefdc",
         ],
         "total_distance": 8717.794314578783,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764], [5.3698, 43.2965]],
     }
-    monkeypatch.setattr("src.neo4j_api.main.Neo4jDriver", lambda: driver_mock)
+    monkeypatch.setattr("src.backend.neo4j_api.main.AsyncNeo4jDriver", lambda: driver_mock)
 
     app.state.driver = driver_mock
     return driver_mock
@@ -0,0 +1,52 @@
+from json import loads
+
+import pytest  # noqa F401
+from neo4j_driver.slow_queries import SLOW_QUERIES
+
+from src.backend.neo4j_api import profiling
+
+PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "dbHits": 0,
+    "rows": 12,
+    "args": {"Details": "poi"},
+    "children": [
+        {
+            "operatorType": "CartesianProduct@neo4j",
+            "dbHits": 40,
+            "rows": 12,
+            "args": {},
+            "children": [
+                {"operatorType": "NodeByLabelScan@neo4j", "dbHits": 2000, "rows": 1000, "args": {}, "children": []}
+            ],
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize("token, headers, status", [("", {}, 404), ("secret", {"X-Debug-Token": "nope"}, 403)])
+def test_slow_queries_need_the_debug_token(client, monkeypatch, token, headers, status):
+    monkeypatch.setattr(profiling, "DEBUG_TOKEN", token)
+
+    assert client.get("/debug/slow-queries", headers=headers).status_code == status
+
+
+def test_get_slow_queries(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "DEBUG_TOKEN", "secret")
+    monkeypatch.setattr(SLOW_QUERIES, "path", tmp_path / "slow_queries.jsonl")
+    monkeypatch.setattr(SLOW_QUERIES, "file_logger", None)
+    monkeypatch.setattr(SLOW_QUERIES, "offenders", {})
+    SLOW_QUERIES.record("poi.filter.radius", "MATCH (n:POI) RETURN n", 900.0, {"radius": 10}, PLAN)
+
+    response = client.get("/debug/slow-queries", headers={"X-Debug-Token": "secret"})
+    assert response.status_code == 200
+    offender = response.json()["queries"][0]
+    assert offender["query"] == "poi.filter.radius"
+    assert offender["max_ms"] == 900.0
+    assert offender["last"]["db_hits"] == 2040
+    assert offender["last"]["rows"] == 12
+    assert offender["last"]["flags"] == ["CartesianProduct", "NodeByLabelScan"]
+
+    logged = loads((tmp_path / "slow_queries.jsonl").read_text().splitlines()[0])
+    assert logged["query"] == "poi.filter.radius"
+    assert logged["params"] == {"radius": "10"}
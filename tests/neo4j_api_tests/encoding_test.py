@@ -0,0 +1,68 @@
+from json import loads
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.backend.neo4j_api.encoding import ARROW, JSON, MSGPACK, NDJSON, negotiate
+
+POIS = [
+    {"poiId": "311be560-f8aa-3c3a-8d06-b24cb6809f57", "city": "Paris", "latitude": 48.87, "homepage": None},
+    {"poiId": "f10d82ab-7b39-30d1-bad4-3e08d9670926", "city": "Paris", "latitude": 48.85, "homepage": None},
+]
+
+
+def test_negotiate():
+    assert negotiate("", [JSON, MSGPACK]) == JSON
+    assert negotiate("*/*", [JSON, MSGPACK]) == JSON
+    assert negotiate(f"{MSGPACK}, {JSON};q=0.5", [JSON, MSGPACK]) == MSGPACK
+    assert negotiate("application/*", [NDJSON, ARROW]) == NDJSON
+
+
+def test_not_acceptable(client, mock_driver):
+    mock_driver.get_cities.return_value = {"cities": []}
+    response = client.get("/city/all", headers={"Accept": "text/html"})
+    assert response.status_code == 406
+
+
+def test_filtered_pois_json(client, mock_driver):
+    mock_driver.get_filtered_pois.return_value = {"pois": POIS}
+    response = client.get("/poi/filter?locations=Paris&types=Museum", headers={"Accept": JSON})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == JSON
+    assert response.json() == {"pois": POIS}
+
+
+def test_filtered_pois_msgpack(client, mock_driver):
+    msgpack = pytest.importorskip("msgpack")
+    mock_driver.get_filtered_pois.return_value = {"pois": POIS}
+    response = client.get("/poi/filter?locations=Paris&types=Museum", headers={"Accept": MSGPACK})
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == {"pois": POIS}
+
+
+def test_export_arrow(client, mock_driver):
+    pa = pytest.importorskip("pyarrow")
+
+    async def pois():
+        for poi in POIS:
+            yield poi
+
+    mock_driver.iter_filtered_pois = MagicMock(return_value=pois())
+    response = client.get("/poi/export", headers={"Accept": ARROW})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.to_pylist() == POIS
+    assert table.schema.field("homepage").type == pa.string()
+    mock_driver.iter_filtered_pois.assert_called_once_with(None, None, 0)
+
+
+def test_export_defaults_to_ndjson(client, mock_driver):
+    async def pois():
+        for poi in POIS:
+            yield poi
+
+    mock_driver.iter_filtered_pois = MagicMock(return_value=pois())
+    response = client.get("/poi/export?locations=Paris")
+    assert response.headers["content-type"] == NDJSON
+    assert [loads(line) for line in response.text.splitlines()] == POIS
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    (tmp_path / "last_import.json").write_text(json.dumps({"import_version": "v1", "status": "finished"}))
+    monkeypatch.setattr("src.backend.neo4j_api.etag.SAVE_DIR", tmp_path)
+    return tmp_path
+
+
+def test_types_not_modified(client, mock_driver, save_dir):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    response = client.get("/poi/types")
+    assert response.status_code == 200
+    assert response.json() == {"types": ["Museum"]}
+    etag = response.headers["etag"]
+
+    response = client.get("/poi/types", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    mock_driver.get_types.assert_called_once()
+
+
+def test_etag_changes_with_import(client, mock_driver, save_dir):
+    mock_driver.get_cities.return_value = {"cities": [{"name": "Paris"}]}
+    etag = client.get("/city/all").headers["etag"]
+    assert client.get("/city/all", headers={"Accept": "application/json"}).headers["etag"] != etag
+
+    (save_dir / "last_import.json").write_text(json.dumps({"import_version": "v2", "status": "finished"}))
+    response = client.get("/city/all", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_no_etag_while_importing(client, mock_driver, save_dir):
+    mock_driver.get_poi_types_for_city.return_value = ["Museum"]
+    (save_dir / "import_in_progress.lock").touch()
+    response = client.get("/city/paris/poi_types", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert response.headers["cache-control"] == "no-store"
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from itertools import islice
+
+import pytest  # noqa F401
+from neo4j.exceptions import ServiceUnavailable
+from neo4j_driver.base import backoff_delays
+
+
+def test_health_before_neo4j_is_ready(client, mock_driver):
+    mock_driver.ready = False
+
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "neo4j": "starting"}
+
+
+def test_health_when_neo4j_is_ready(client, mock_driver):
+    mock_driver.ready = True
+
+    assert client.get("/health").json() == {"status": "ok", "neo4j": "ready"}
+
+
+def test_unavailable_database_is_503(client, mock_driver):
+    mock_driver.get_poi.side_effect = ServiceUnavailable("connection refused")
+
+    response = client.get("/poi?poi_id=311be560-f8aa-3c3a-8d06-b24cb6809f57")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_backoff_delays_double_up_to_the_maximum():
+    assert list(islice(backoff_delays(0.5, 5), 6)) == [0.5, 1, 2, 4, 5, 5]
+
+
+def test_app_import_does_not_load_the_dataset_import_pipeline():
+    code = (
+        "import sys, neo4j_api; print(sorted({'aiohttp', 'bs4', 'tqdm', 'dataset_import.handler'} & set(sys.modules)))"
+    )
+    env = os.environ | {"PYTHONPATH": os.pathsep.join(sys.path)}
+
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
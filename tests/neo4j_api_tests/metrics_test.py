@@ -0,0 +1,43 @@
+import pytest  # noqa F401
+
+from src.backend.neo4j_api import profiling
+
+
+def test_metrics(client, mock_driver):
+    client.get("/poi/nearby?poi_id=311be560-f8aa-3c3a-8d06-b24cb6809f56&radius=10")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/poi/nearby",status="200"}' in response.text
+    assert "http_requests_in_flight 1" in response.text
+
+
+def request_count(client, route):
+    prefix = f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}} '
+    lines = [line for line in client.get("/metrics").text.splitlines() if line.startswith(prefix)]
+    return int(float(lines[0].split()[-1])) if lines else 0
+
+
+def test_cache_hits_keep_their_route(client, mock_driver):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    before = request_count(client, "/poi/types")
+    client.get("/poi/types")
+    assert client.get("/poi/types").headers["x-cache"] == "HIT"
+    assert request_count(client, "/poi/types") == before + 2
+
+
+def test_prefixed_route_with_path_parameter(client, mock_driver):
+    mock_driver.get_city.return_value = {"cityId": "75056"}
+    before = request_count(client, "/city/{city_id}")
+    client.get("/city/75056")
+    assert request_count(client, "/city/{city_id}") == before + 1
+
+
+def test_profiled_requests_keep_their_route(client, mock_driver, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "DEBUG_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    before = request_count(client, "/poi/types")
+    response = client.get("/poi/types?profile=1", headers={"X-Debug-Token": "secret"})
+    assert "x-profile-id" in response.headers
+    assert request_count(client, "/poi/types") == before + 1
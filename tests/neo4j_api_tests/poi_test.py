@@ -1,4 +1,12 @@
+import asyncio
+from json import loads
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest  # noqa F401
+from neo4j_driver import pagination
+from neo4j_driver.async_poi import AsyncPOI
+from neo4j_driver.pagination import InvalidCursor, decode_cursor, encode_cursor
+from neo4j_driver.queries import FILTERED_POIS_COUNT_QUERY, QUERIES
 
 
 def test_get_poi(client, mock_driver):
@@ -9,7 +17,7 @@ def test_get_poi(client, mock_driver):
         "lat": 48.87621,
         "lon": 2.3392458,
     }
-    mock_driver.get_poi.assert_called_once_with("311be560-f8aa-3c3a-8d06-b24cb6809f57")
+    mock_driver.get_poi.assert_called_once_with("311be560-f8aa-3c3a-8d06-b24cb6809f57", None)
 
 
 def test_get_nearby_points(client, mock_driver):
@@ -23,3 +31,114 @@ def test_get_nearby_points(client, mock_driver):
         ]
     }
     mock_driver.get_nearby_points.assert_called_once_with("311be560-f8aa-3c3a-8d06-b24cb6809f56", 10)
+
+
+def test_stream_filtered_pois(client, mock_driver):
+    async def pois():
+        yield {"poiId": "311be560-f8aa-3c3a-8d06-b24cb6809f57", "city": "Paris"}
+        yield {"poiId": "f10d82ab-7b39-30d1-bad4-3e08d9670926", "city": "Paris"}
+
+    mock_driver.iter_filtered_pois = MagicMock(return_value=pois())
+    response = client.get("/poi/filter/stream?locations=Paris&types=Museum&radius=0")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [loads(line) for line in response.text.splitlines()] == [
+        {"poiId": "311be560-f8aa-3c3a-8d06-b24cb6809f57", "city": "Paris"},
+        {"poiId": "f10d82ab-7b39-30d1-bad4-3e08d9670926", "city": "Paris"},
+    ]
+    mock_driver.iter_filtered_pois.assert_called_once_with(["Paris"], ["Museum"], 0)
+
+
+def test_get_filtered_pois_page(client, mock_driver):
+    cursor = encode_cursor({"city": "Paris", "label": "Louvre", "poiId": "1"})
+    mock_driver.get_filtered_pois_page.return_value = {
+        "pois": [{"poiId": "2", "city": "Paris", "label": "Orsay"}],
+        "next_cursor": "abc",
+        "total": 120,
+    }
+    response = client.get(f"/poi/filter?locations=Paris&types=Museum&limit=1&cursor={cursor}&with_total=true")
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] == "abc"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["X-Total-Count"] == "120"
+    mock_driver.get_filtered_pois_page.assert_called_once_with(["Paris"], ["Museum"], 0, 1, cursor, True)
+    assert decode_cursor(cursor) == {"after_city": "Paris", "after_label": "Louvre", "after_id": "1"}
+
+
+def test_cursor_of_poi_without_city_and_label():
+    cursor = encode_cursor({"poiId": "1"})
+
+    assert decode_cursor(cursor) == {"after_city": "", "after_label": "", "after_id": "1"}
+
+
+@pytest.mark.parametrize("key", ['["Paris", "Louvre"]', '["Paris", 1, "1"]', '["Paris", "Louvre", null]'])
+def test_invalid_cursor(key):
+    cursor = pagination.urlsafe_b64encode(key.encode()).decode()
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "name", ["poi.filter.page", "poi.filter.page.radius", "poi.for_city.page", "poi.near_city.page"]
+)
+def test_pages_compare_and_order_the_indexed_properties(name):
+    # Expressions like coalesce(n.city, "") can not use the poi_city_label_id index for the seek or the order.
+    text = QUERIES[name].text
+
+    assert "coalesce" not in text
+    assert "n.city >= $after_city" in text
+    assert "ORDER BY n.city, n.label, n.poiId" in text
+
+
+def test_poi_count_is_cached_per_import_version(monkeypatch):
+    monkeypatch.setattr(pagination, "COUNT_CACHE", pagination.TTLCache("test", ttl=300))
+    versions = iter(["v1", "v1", None, None, "v2"])
+    monkeypatch.setattr(pagination, "get_import_version", lambda _: next(versions))
+    poi = AsyncPOI()
+    poi.execute_query = AsyncMock(side_effect=[[{"total": total}] for total in [120, 0, 5, 130]])
+
+    async def counts() -> list[int]:
+        return [await poi.count_pois(FILTERED_POIS_COUNT_QUERY, locations=["Paris"]) for _ in range(5)]
+
+    # v1 is cached, nothing is cached while an import runs, and v2 gets its own entry.
+    assert asyncio.run(counts()) == [120, 120, 0, 5, 130]
+    assert poi.execute_query.await_count == 4
+
+
+def test_get_filtered_pois_invalid_cursor(client, mock_driver):
+    mock_driver.get_filtered_pois_page.side_effect = InvalidCursor("Invalid cursor.")
+    response = client.get("/poi/filter?locations=Paris&types=Museum&cursor=nope")
+    assert response.status_code == 400
+
+
+def test_get_poi_fields(client, mock_driver):
+    response = client.get("/poi?poi_id=311be560-f8aa-3c3a-8d06-b24cb6809f57&fields=label,%20city")
+    assert response.status_code == 200
+    mock_driver.get_poi.assert_called_once_with("311be560-f8aa-3c3a-8d06-b24cb6809f57", ["label", "city"])
+
+
+def test_get_poi_unknown_fields(client, mock_driver):
+    response = client.get("/poi?poi_id=311be560-f8aa-3c3a-8d06-b24cb6809f57&fields=label,password")
+    assert response.status_code == 400
+    mock_driver.get_poi.assert_not_called()
+
+
+def test_get_pois_batch(client, mock_driver):
+    mock_driver.get_pois.return_value = [{"poiId": "311be560-f8aa-3c3a-8d06-b24cb6809f57"}, None]
+    response = client.post(
+        "/poi/batch?fields=label",
+        json={"poi_ids": ["311be560-f8aa-3c3a-8d06-b24cb6809f57", "unknown"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "pois": [{"poiId": "311be560-f8aa-3c3a-8d06-b24cb6809f57"}, None],
+        "missing": ["unknown"],
+    }
+    mock_driver.get_pois.assert_called_once_with(["311be560-f8aa-3c3a-8d06-b24cb6809f57", "unknown"], ["label"])
+
+
+def test_get_pois_batch_empty(client, mock_driver):
+    response = client.post("/poi/batch", json={"poi_ids": []})
+    assert response.status_code == 422
+    mock_driver.get_pois.assert_not_called()
@@ -0,0 +1,73 @@
+import time
+
+import pytest  # noqa F401
+
+from src.backend.neo4j_api import profiling
+
+TOKEN = {"X-Debug-Token": "secret"}
+
+
+@pytest.fixture
+def debug_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "DEBUG_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+
+
+@pytest.fixture
+def slow_types(mock_driver):
+    async def slow_types():
+        time.sleep(0.05)  # keep the event loop thread busy so the sampler sees this frame
+        return {"types": ["Museum"]}
+
+    mock_driver.get_types.side_effect = slow_types
+    return mock_driver
+
+
+def test_profiling_is_disabled_without_token(client, slow_types):
+    response = client.get("/poi/types?profile=1")
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert client.get("/debug/memory").status_code == 404
+
+
+def test_profiling_needs_the_token(client, slow_types, debug_token):
+    assert client.get("/poi/types?profile=1", headers={"X-Debug-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/profiles", headers={"X-Debug-Token": "wrong"}).status_code == 403
+
+
+def test_profiled_request(client, slow_types, debug_token):
+    response = client.get("/poi/types?profile=1", headers=TOKEN)
+    profile_id = response.headers["x-profile-id"]
+
+    assert response.json() == {"types": ["Museum"]}
+    assert "x-cache" not in response.headers  # profiled requests bypass the response cache
+    [meta] = client.get("/debug/profiles", headers=TOKEN).json()["profiles"]
+    assert meta["id"] == profile_id
+    assert meta["path"] == "/poi/types"
+    assert meta["samples"] > 0
+    folded = client.get(f"/debug/profiles/{profile_id}", headers=TOKEN).text
+    assert "slow_types" in folded
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+
+def test_profile_header(client, slow_types, debug_token):
+    response = client.get("/poi/types", headers=TOKEN | {"X-Profile": "1"})
+
+    assert "x-profile-id" in response.headers
+    assert client.get("/debug/profiles/not-a-profile", headers=TOKEN).status_code == 404
+
+
+def test_memory(client, debug_token):
+    assert client.get("/debug/memory", headers=TOKEN).json()["tracing"] is False
+
+    assert client.post("/debug/memory/tracing?frames=5", headers=TOKEN).json() == {"tracing": True, "frames": 5}
+    try:
+        memory = client.get("/debug/memory?limit=5", headers=TOKEN).json()
+        assert memory["tracing"] is True
+        assert 0 < len(memory["top"]) <= 5
+        assert memory["current_bytes"] > 0
+        growth = client.get("/debug/memory?limit=5&compare=true", headers=TOKEN).json()
+        assert "size_diff_bytes" in growth["top"][0]
+    finally:
+        assert client.delete("/debug/memory/tracing", headers=TOKEN).json() == {"tracing": False}
@@ -0,0 +1,41 @@
+import time
+
+from src.backend.neo4j_api.response_cache import RESPONSE_CACHE, CachedResponse, CachePolicy, ResponseLRU
+
+
+def test_cached_response(client, mock_driver):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    response = client.get("/poi/types")
+    assert response.headers["x-cache"] == "MISS"
+
+    mock_driver.get_types.return_value = {"types": ["Castle"]}
+    response = client.get("/poi/types")
+    assert response.headers["x-cache"] == "HIT"
+    assert response.json() == {"types": ["Museum"]}
+    mock_driver.get_types.assert_called_once()
+
+
+def test_uncached_route(client, mock_driver):
+    mock_driver.get_pois.return_value = []
+    response = client.post("/poi/batch", json={"poi_ids": ["a"]})
+    assert "x-cache" not in response.headers
+
+
+def test_stale_response(client, mock_driver):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    client.get("/poi/types")
+    key, entry = next(iter(RESPONSE_CACHE.entries.items()))
+    RESPONSE_CACHE.entries[key] = entry._replace(stored_at=time.monotonic() - 10, policy=CachePolicy(ttl=5, stale=60))
+
+    response = client.get("/poi/types")
+    assert response.headers["x-cache"] == "STALE"
+    assert response.json() == {"types": ["Museum"]}
+
+
+def test_lru_is_bounded_by_bytes():
+    cache = ResponseLRU(max_bytes=10)
+    policy = CachePolicy(ttl=60, stale=0)
+    for key in ("a", "b", "c"):
+        cache.set((key,), CachedResponse(time.monotonic(), policy, 200, [], b"12345"))
+    assert list(cache.entries) == [("b",), ("c",)]
+    assert cache.size == 10
@@ -0,0 +1,48 @@
+import json
+
+from telemetry import tracing
+from telemetry.tracing import SpanExporter, parse_traceparent, start_span
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_nested_spans_share_the_trace():
+    with start_span("outer", traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01") as outer:
+        with start_span("inner") as inner:
+            pass
+    assert outer.trace_id == inner.trace_id == TRACE_ID
+    assert outer.parent_id == PARENT_ID
+    assert inner.parent_id == outer.span_id
+    assert inner.end >= inner.start
+
+
+def test_request_continues_the_callers_trace(client, mock_driver):
+    mock_driver.get_types.return_value = {"types": ["Museum"]}
+    response = client.get(
+        "/poi/types", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01", "X-Request-ID": "abc123"}
+    )
+    assert response.headers["x-trace-id"] == TRACE_ID
+    assert response.headers["x-request-id"] == "abc123"
+
+
+def test_file_export_writes_otlp_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_FILE", tmp_path / "traces.jsonl")
+    with start_span("neo4j poi.get", tracing.CLIENT, traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01", rows=3) as span:
+        pass
+    SpanExporter("file").export([span])
+
+    document = json.loads((tmp_path / "traces.jsonl").read_text())
+    exported = document["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert exported["traceId"] == TRACE_ID
+    assert exported["parentSpanId"] == PARENT_ID
+    assert exported["kind"] == tracing.CLIENT
+    assert exported["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
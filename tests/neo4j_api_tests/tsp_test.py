@@ -16,6 +16,7 @@ def test_shortest_round_tour(client, mock_driver):
             "0b155dd7-9f4b-3b69-a221-42b4ae3c0f4c",
         ],
         "total_distance": 13121.616547681424,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764], [2.3522, 48.8566]],
     }
     mock_driver.calculate_shortest_round_tour.assert_called_once_with(
         [
@@ -41,6 +42,7 @@ def test_shortest_path_no_return(client, mock_driver):
             "0b155dd7-9f4b-3b69-a221-42b4ae3c0f4c",
         ],
         "total_distance": 7610.976060550933,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764]],
     }
     mock_driver.calculate_shortest_path_no_return.assert_called_once_with(
         [
@@ -67,9 +69,9 @@ def test_shortest_path_fixed_dest(client, mock_driver):
             "8e795fb1-0f36-34ca-ba08-1784a50cefdc",
         ],
         "total_distance": 8717.794314578783,
+        "route": [[2.3522, 48.8566], [4.8357, 45.764], [5.3698, 43.2965]],
     }
     mock_driver.calculate_shortest_path_fixed_dest.assert_called_once_with(
-        "8e795fb1-0f36-34ca-ba08-1784a50cefdc",
         [
             "6d640ca5-e6df-3506-bfed-007661e44551",
             "8e795fb1-0f36-34ca-ba08-1784a50cefdc",
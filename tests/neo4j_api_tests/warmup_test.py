@@ -0,0 +1,128 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest  # noqa F401
+from neo4j_driver import async_city
+from neo4j_driver.async_city import AsyncCity, popular_legs
+
+from src.backend.neo4j_api import app
+from src.backend.neo4j_api import warmup as warmup_module
+from src.backend.neo4j_api.response_cache import RESPONSE_CACHE
+from src.backend.neo4j_api.warmup import Warmup
+
+
+@pytest.fixture
+def warmup(monkeypatch, mock_driver):
+    mock_driver.ready = True
+    warmup = Warmup(app)
+    monkeypatch.setattr(app.state, "warmup", warmup, raising=False)
+    return warmup
+
+
+def test_not_ready_before_warmup(client, warmup):
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["neo4j"] == "ready"
+    assert response.json()["warmup"]["warmed"] is False
+
+
+def test_ready_after_warmup(client, warmup, mock_driver):
+    mock_driver.get_cities.return_value = {"cities": [{"cityId": "75056", "name": "Paris"}]}
+
+    asyncio.run(warmup.run())
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    mock_driver.warmup_queries.assert_awaited_once()
+    mock_driver.warmup_pages.assert_awaited_once()
+    mock_driver.load_city_table.assert_awaited_once()
+    mock_driver.warmup_city_legs.assert_awaited_once()
+    mock_driver.get_cities.assert_awaited_once()
+    assert [key[0] for key in RESPONSE_CACHE.entries] == ["/city/all"]
+
+
+def test_failing_step_does_not_block_readiness(client, warmup, mock_driver):
+    mock_driver.warmup_pages.side_effect = RuntimeError("page cache too small")
+    mock_driver.get_cities.return_value = {"cities": []}
+
+    asyncio.run(warmup.run())
+
+    assert client.get("/health/ready").status_code == 200
+    assert warmup.errors == {"pages": "page cache too small"}
+
+
+def run_start(warmup: Warmup, runs: int) -> list[str | None]:
+    """Run ``warmup.start`` until the warmup ran ``runs`` times, and return the versions it ran for."""
+    versions = []
+
+    async def run() -> None:
+        warmup.version = warmup_module.get_import_version(warmup_module.SAVE_DIR)
+        versions.append(warmup.version)
+        if len(versions) == runs:
+            raise asyncio.CancelledError
+
+    warmup.run = run
+
+    async def start() -> None:
+        with pytest.raises(asyncio.CancelledError):
+            await warmup.start()
+
+    asyncio.run(start())
+    return versions
+
+
+def test_start_retries_until_neo4j_is_online(monkeypatch, warmup, mock_driver):
+    mock_driver.ready = False
+
+    async def start() -> None:
+        mock_driver.ready = mock_driver.start.await_count == 3
+
+    mock_driver.start.side_effect = start
+    monkeypatch.setattr(warmup_module, "backoff_delays", lambda: iter([0, 0]))
+    monkeypatch.setattr(warmup_module, "get_import_version", lambda _: "v1")
+    monkeypatch.setattr(warmup_module, "restore_snapshots", lambda _: [])
+
+    assert run_start(warmup, 1) == ["v1"]
+    assert mock_driver.start.await_count == 3
+
+
+def test_start_skips_rerun_while_an_import_is_running(monkeypatch, warmup):
+    # Restore, first run, then three polls: two during an import and one after it.
+    versions = iter(["v1", "v1", None, None, "v2", "v2"])
+    monkeypatch.setattr(warmup_module, "get_import_version", lambda _: next(versions))
+    monkeypatch.setattr(warmup_module, "WARMUP_POLL_INTERVAL", 0)
+    monkeypatch.setattr(warmup_module, "restore_snapshots", lambda _: [])
+
+    assert run_start(warmup, 2) == ["v1", "v2"]
+
+
+def test_live(client):
+    assert client.get("/health/live").json() == {"status": "ok"}
+
+
+def test_unknown_step():
+    with pytest.raises(ValueError, match="Unknown warmup steps: caches"):
+        Warmup(app, ["plans", "caches"])
+
+
+def test_city_legs_are_cached_in_both_directions(monkeypatch):
+    monkeypatch.setattr(async_city, "LEG_REQUESTS", async_city.Counter())
+    async_city.LEG_CACHE.clear()
+    city = AsyncCity()
+    city.execute_query = AsyncMock(return_value=[{"distance": 465.0}])
+
+    async def legs() -> list[float]:
+        return [
+            await city.get_total_distance_between_cities("75056", "69123"),
+            await city.get_total_distance_between_cities("69123", "75056"),
+            await city.get_total_distance_between_cities("75056", "13055"),
+        ]
+
+    assert asyncio.run(legs()) == [465.0, 465.0, 465.0]
+    assert city.execute_query.await_count == 2
+    assert popular_legs(1) == [("69123", "75056")]
+
+    asyncio.run(city.warmup_city_legs([("75056", "69123")]))
+    assert list(async_city.LEG_CACHE.entries) == [("69123", "75056")]
@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from neo4j_driver.async_city import AsyncCity
+from neo4j_driver.async_poi import AsyncPOI
+from neo4j_driver.batch_loader import BatchLoader, get_loader, loader_scope
+from neo4j_driver.city import City
+from neo4j_driver.poi import PoisWithoutCity
+
+
+def test_keys_of_one_tick_are_loaded_in_one_deduplicated_batch():
+    batches = []
+
+    async def load_batch(keys: list[str]) -> list[str]:
+        batches.append(keys)
+        return [key.upper() for key in keys]
+
+    async def load_all() -> list[str]:
+        loader = BatchLoader("test", load_batch)
+        values = await asyncio.gather(*(loader.load(key) for key in ["a", "b", "a", "c"]))
+        values.append(await loader.load("b"))
+        return values
+
+    assert asyncio.run(load_all()) == ["A", "B", "A", "C", "B"]
+    assert batches == [["a", "b", "c"]]
+
+
+def test_a_failed_batch_fails_every_caller_and_is_not_memoized():
+    calls = []
+
+    async def load_batch(keys: list[str]) -> list[str]:
+        calls.append(keys)
+        if len(calls) == 1:
+            raise RuntimeError("Neo4j went away")
+        return keys
+
+    async def load_twice() -> tuple[list, str]:
+        loader = BatchLoader("test", load_batch)
+        failed = await asyncio.gather(loader.load("a"), loader.load("b"), return_exceptions=True)
+        return failed, await loader.load("a")
+
+    failed, retried = asyncio.run(load_twice())
+
+    assert [str(err) for err in failed] == ["Neo4j went away", "Neo4j went away"]
+    assert retried == "a"
+
+
+def test_loaders_are_shared_within_a_scope_only():
+    async def load_batch(keys: list[str]) -> list[str]:
+        return keys
+
+    with loader_scope():
+        scoped = get_loader("city", load_batch, ("name",))
+        assert get_loader("city", load_batch, ("name",)) is scoped
+        assert get_loader("city", load_batch) is not scoped
+        with loader_scope():
+            assert get_loader("city", load_batch, ("name",)) is scoped
+    assert get_loader("city", load_batch, ("name",)) is not scoped
+
+
+def test_gathered_get_city_calls_run_one_query():
+    city = AsyncCity()
+    city.execute_query = AsyncMock(
+        return_value=[{"c": {"cityId": "75056", "name": "Paris"}}, {"c": {"cityId": "69123", "name": "Lyon"}}]
+    )
+
+    async def get_cities() -> list[dict]:
+        with loader_scope():
+            found = await asyncio.gather(*(city.get_city(cid, ["name"]) for cid in ["75056", "69123", "00000"]))
+            return [*found, await city.get_city("75056", ["name"])]
+
+    paris, lyon, unknown, paris_again = asyncio.run(get_cities())
+
+    assert (paris["name"], lyon["name"], unknown) == ("Paris", "Lyon", {})
+    assert paris_again is paris
+    city.execute_query.assert_awaited_once()
+    assert city.execute_query.await_args.kwargs == {"city_ids": ["75056", "69123", "00000"]}
+
+
+def test_gathered_nearest_city_calls_run_one_query():
+    city = AsyncCity()
+    city.execute_query = AsyncMock(
+        return_value=[
+            {"i": 0, "city": {"cityId": "75056"}, "distance_km": 0.5},
+            {"i": 1, "city": {"cityId": "69123"}, "distance_km": 1.9},
+        ]
+    )
+
+    async def get_nearest() -> list[dict]:
+        return await asyncio.gather(
+            city.get_nearest_city_by_coordinates(48.86, 2.35), city.get_nearest_city_by_coordinates(45.75, 4.85)
+        )
+
+    with loader_scope():
+        paris, lyon = asyncio.run(get_nearest())
+
+    assert paris == {"city": {"cityId": "75056"}, "distance_km": 0.5}
+    assert lyon == {"city": {"cityId": "69123"}, "distance_km": 1.9}
+    assert city.execute_query.await_args.kwargs == {
+        "points": [{"latitude": 48.86, "longitude": 2.35}, {"latitude": 45.75, "longitude": 4.85}]
+    }
+
+
+def test_point_without_nearest_city_is_none():
+    city = AsyncCity()
+    city.execute_query = AsyncMock(return_value=[{"i": 0, "city": {"cityId": "75056"}, "distance_km": 0.5}])
+
+    nearest = asyncio.run(city.get_nearest_cities([(48.86, 2.35), (-48.86, -2.35)]))
+
+    assert nearest == [{"city": {"cityId": "75056"}, "distance_km": 0.5}, None]
+
+
+def test_pois_without_any_city_are_rejected():
+    city = AsyncCity()
+
+    @asynccontextmanager
+    async def session_scope():
+        yield
+
+    city.session_scope = session_scope
+    city.get_pois = AsyncMock(return_value=[{"poiId": "p1", "city": "Atlantis", "latitude": 0.0, "longitude": 0.0}])
+    city.get_city = AsyncMock(return_value={})
+    city.get_nearest_city_by_coordinates = AsyncMock(return_value=None)
+
+    with pytest.raises(PoisWithoutCity, match="p1"):
+        asyncio.run(city.get_city_pois(["p1"]))
+
+
+def test_sync_pois_without_any_city_are_rejected():
+    city = City()
+    city.session_scope = nullcontext
+    city.get_pois = MagicMock(return_value=[{"poiId": "p1", "city": "Atlantis", "latitude": 0.0, "longitude": 0.0}])
+    city.get_city = MagicMock(return_value={})
+    city.execute_query = MagicMock(return_value=[])
+
+    with pytest.raises(PoisWithoutCity, match="p1"):
+        city.get_city_pois(["p1"])
+
+
+@pytest.mark.parametrize("poi_id, expected", [("p1", {"poiId": "p1", "label": "Louvre"}), ("p2", {})])
+def test_get_poi_goes_through_the_poi_batch(poi_id, expected):
+    poi = AsyncPOI()
+    poi.execute_query = AsyncMock(return_value=[{"p": {"poiId": "p1", "label": "Louvre"}}])
+
+    assert asyncio.run(poi.get_poi(poi_id)) == expected
+    assert poi.execute_query.await_args.kwargs == {"poi_ids": [poi_id]}
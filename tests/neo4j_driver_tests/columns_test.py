@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from neo4j_driver.async_base import AsyncBase
+from neo4j_driver.columns import ColumnBuilder, row_count
+
+KEYS = ["cityId", "name", "latitude", "population"]
+RECORDS = [
+    ("75056", "Paris", 48.8566, 2133111),
+    ("69123", "Lyon", 45.7640, 522250),
+    ("13055", None, None, 873076),
+]
+
+
+def test_columns_are_typed_arrays_grown_past_their_capacity():
+    dtypes = {"latitude": np.float64, "population": np.int64, "cityId": str}
+
+    columns = ColumnBuilder(dtypes, KEYS, capacity=1).extend(RECORDS).finish()
+
+    assert list(columns) == ["latitude", "population", "cityId"]
+    np.testing.assert_array_equal(columns["latitude"], [48.8566, 45.7640, np.nan])
+    assert columns["population"].dtype == np.int64
+    assert columns["population"].tolist() == [2133111, 522250, 873076]
+    assert columns["cityId"].dtype.kind == "U"
+    assert columns["cityId"].tolist() == ["75056", "69123", "13055"]
+    assert row_count(columns) == 3
+
+
+def test_arrow_strings_keep_nulls():
+    columns = ColumnBuilder({"name": "arrow"}, KEYS).extend(RECORDS).finish()
+
+    assert columns["name"].type == pa.string()
+    assert columns["name"].to_pylist() == ["Paris", "Lyon", None]
+
+
+def test_empty_result():
+    columns = ColumnBuilder({"latitude": np.float64, "cityId": str}, KEYS).finish()
+
+    assert columns["latitude"].shape == (0,)
+    assert columns["cityId"].shape == (0,)
+    assert row_count(columns) == 0
+
+
+def test_null_in_integer_column_is_rejected():
+    with pytest.raises(ValueError, match="latitude"):
+        ColumnBuilder({"latitude": np.int64}, KEYS).extend(RECORDS)
+
+
+def test_column_not_returned_by_the_query():
+    with pytest.raises(KeyError, match="longitude"):
+        ColumnBuilder({"longitude": np.float64}, KEYS)
+
+
+class FakeResult:
+    def __init__(self, keys: list[str], records: list[tuple]) -> None:
+        self._keys = keys
+        self._records = iter(records)
+
+    def keys(self) -> list[str]:
+        return self._keys
+
+    def __aiter__(self) -> "FakeResult":
+        return self
+
+    async def __anext__(self) -> tuple:
+        try:
+            return next(self._records)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeTransaction:
+    def __init__(self) -> None:
+        self.runs: list[tuple[str, dict]] = []
+
+    async def run(self, query: str, **kwargs) -> FakeResult:
+        self.runs.append((query, kwargs))
+        return FakeResult(KEYS, RECORDS)
+
+
+def test_read_columns_streams_the_records_of_the_transaction():
+    tx = FakeTransaction()
+
+    columns = asyncio.run(
+        AsyncBase.read_columns(tx, "MATCH (c:City) RETURN ...", {"limit": 3}, {"population": np.int32})
+    )
+
+    assert tx.runs == [("MATCH (c:City) RETURN ...", {"limit": 3})]
+    assert columns["population"].dtype == np.int32
+    assert columns["population"].tolist() == [2133111, 522250, 873076]
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest  # noqa F401
+from neo4j_driver import async_city, shared_dataset
+from neo4j_driver.async_city import AsyncCity, nearest_city
+from neo4j_driver.shared_dataset import SNAPSHOT_FORMAT, SharedDataset, restore_snapshots
+
+CITIES = {
+    "cityId": np.array(["13055", "69123", "75056"]),
+    "latitude": np.array([43.2965, 45.7640, 48.8566]),
+    "longitude": np.array([5.3698, 4.8357, 2.3522]),
+}
+
+
+def test_one_worker_builds_the_others_attach(tmp_path):
+    workers = [SharedDataset("city_table", tmp_path) for _ in range(3)]
+    builds = []
+
+    async def build() -> dict[str, np.ndarray]:
+        builds.append(1)
+        await asyncio.sleep(0.1)
+        return CITIES
+
+    async def publish_all() -> None:
+        await asyncio.gather(*(worker.publish("v1", build) for worker in workers))
+
+    asyncio.run(publish_all())
+
+    assert len(builds) == 1
+    for worker in workers:
+        assert worker.current.version == "v1"
+        assert isinstance(worker.current.arrays["latitude"], np.memmap)
+        np.testing.assert_array_equal(worker.current.arrays["cityId"], CITIES["cityId"])
+
+
+def test_new_version_switches_over_and_removes_the_old_one(tmp_path):
+    old_worker, new_worker = SharedDataset("city_table", tmp_path), SharedDataset("city_table", tmp_path)
+    asyncio.run(old_worker.publish("v1", AsyncMock(return_value=CITIES)))
+    old_arrays = old_worker.current.arrays
+
+    moved = CITIES | {"latitude": CITIES["latitude"] + 1}
+    asyncio.run(new_worker.publish("v2", AsyncMock(return_value=moved)))
+
+    assert [path.name for path in (tmp_path / "city_table").iterdir() if path.is_dir()] == ["v2"]
+    # The old mapping stays readable until the worker attaches the new version.
+    np.testing.assert_array_equal(old_arrays["latitude"], CITIES["latitude"])
+    asyncio.run(old_worker.publish("v2", AsyncMock(side_effect=AssertionError("must not rebuild"))))
+    np.testing.assert_array_equal(old_worker.current.arrays["latitude"], moved["latitude"])
+
+
+def test_snapshot_manifest(tmp_path):
+    asyncio.run(SharedDataset("city_table", tmp_path).publish("v1", AsyncMock(return_value=CITIES)))
+
+    manifest = json.loads((tmp_path / "city_table" / "v1" / "manifest.json").read_text())
+    assert manifest["format"] == SNAPSHOT_FORMAT
+    assert manifest["import_version"] == "v1"
+    assert manifest["arrays"]["latitude"]["shape"] == [3]
+    assert len(manifest["arrays"]["latitude"]["sha256"]) == 64
+
+
+def test_restart_restores_the_snapshot(tmp_path, monkeypatch):
+    asyncio.run(SharedDataset("city_table", tmp_path).publish("v1", AsyncMock(return_value=CITIES)))
+    restarted = SharedDataset("city_table", tmp_path)
+    monkeypatch.setattr(shared_dataset, "DATASETS", {"city_table": restarted})
+
+    assert restore_snapshots("v2") == []
+    assert restore_snapshots("v1") == ["city_table"]
+    np.testing.assert_array_equal(restarted.current.arrays["longitude"], CITIES["longitude"])
+
+
+def test_damaged_snapshot_is_rebuilt(tmp_path):
+    asyncio.run(SharedDataset("city_table", tmp_path).publish("v1", AsyncMock(return_value=CITIES)))
+    path = tmp_path / "city_table" / "v1" / "latitude.npy"
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    restarted = SharedDataset("city_table", tmp_path)
+    assert not restarted.attach("v1")
+    build = AsyncMock(return_value=CITIES)
+    asyncio.run(restarted.publish("v1", build))
+
+    build.assert_awaited_once()
+    np.testing.assert_array_equal(restarted.current.arrays["latitude"], CITIES["latitude"])
+
+
+def test_nearest_city():
+    index, distance = nearest_city(CITIES, 45.75, 4.85)
+
+    assert CITIES["cityId"][index] == "69123"
+    assert distance == pytest.approx(1.9, abs=0.1)
+
+
+def test_nearest_city_uses_the_shared_table(tmp_path, monkeypatch):
+    table = SharedDataset("city_table", tmp_path)
+    monkeypatch.setattr(async_city, "CITY_TABLE", table)
+    city = AsyncCity()
+    city.execute_query_columns = AsyncMock(return_value=CITIES)
+    city.execute_query = AsyncMock(return_value=[{"c": {"cityId": "75056", "name": "Paris"}}])
+
+    async def load_and_find() -> dict:
+        await city.load_city_table("v1")
+        return await city.get_nearest_city_by_coordinates(48.86, 2.35)
+
+    result = asyncio.run(load_and_find())
+
+    assert result["city"] == {"cityId": "75056", "name": "Paris"}
+    assert result["distance_km"] == pytest.approx(0.5, abs=0.1)
+    assert city.execute_query.await_args.kwargs == {"city_ids": ["75056"]}
@@ -0,0 +1,172 @@
+import asyncio
+from contextvars import ContextVar
+
+import pytest
+
+from src.backend.neo4j_driver.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"calls": calls}
+
+    async def main():
+        return await asyncio.gather(*(flight.run("key", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight == {}
+
+
+def test_distinct_keys_and_sequential_calls_run_separately():
+    flight = SingleFlight("test")
+    calls: list[str] = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def main():
+        first = await asyncio.gather(flight.run("a", lambda: compute("a")), flight.run("b", lambda: compute("b")))
+        second = await flight.run("a", lambda: compute("a"))
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.run("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_followers():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_computation_outlives_the_leaders_scoped_state():
+    flight = SingleFlight("test")
+    scoped: ContextVar[dict | None] = ContextVar("scoped", default=None)
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        # The leader's scope is closed by now, the flight must not have picked it up.
+        return scoped.get()
+
+    async def leader_call():
+        session = {"open": True}
+        token = scoped.set(session)
+        try:
+            return await flight.run("key", compute)
+        finally:
+            session["open"] = False
+            scoped.reset(token)
+
+    async def main():
+        leader = asyncio.ensure_future(leader_call())
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) is None
+
+
+def test_computation_is_cancelled_with_its_last_caller():
+    flight = SingleFlight("test")
+    cancelled = []
+
+    async def compute():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        caller = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == [True]
+    assert flight.in_flight == {}
+
+
+def test_caller_after_cancellation_starts_a_fresh_flight():
+    flight = SingleFlight("test")
+    started = []
+
+    async def compute():
+        started.append(True)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            # Slow to unwind, the old flight is still running when the next caller arrives.
+            await asyncio.sleep(0.01)
+            raise
+        return "fresh"
+
+    async def main():
+        caller = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        fresh = asyncio.ensure_future(flight.run("key", compute))
+        await asyncio.sleep(0.02)
+        # The done callback of the cancelled flight must not forget the fresh one.
+        assert "key" in flight.in_flight
+        return await fresh
+
+    assert asyncio.run(main()) == "fresh"
+    assert started == [True, True]
+    assert flight.in_flight == {}
+
+
+def test_unhashable_key_is_not_coalesced():
+    flight = SingleFlight("test")
+
+    async def compute():
+        return "ok"
+
+    assert asyncio.run(flight.run(("q", [1, 2]), compute)) == "ok"
@@ -0,0 +1,28 @@
+import asyncio
+import multiprocessing
+
+import numpy as np
+from python_tsp.exact import solve_tsp_dynamic_programming
+
+from src.backend.neo4j_driver import solver
+
+
+def test_solver_process_matches_in_thread_result(monkeypatch):
+    monkeypatch.setattr(solver, "SOLVER_PROCESS_MIN_SIZE", 0)
+    weights = np.random.default_rng(0).random((6, 6)) * 100
+    assert asyncio.run(solver.solve_tsp(weights)) == solve_tsp_dynamic_programming(weights)
+
+
+def test_cancelled_solve_terminates_the_process(monkeypatch):
+    monkeypatch.setattr(solver, "SOLVER_PROCESS_MIN_SIZE", 0)
+    weights = np.random.default_rng(0).random((24, 24))
+
+    async def main():
+        task = asyncio.ensure_future(solver.solve_tsp(weights))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert not multiprocessing.active_children()